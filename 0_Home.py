@@ -1,22 +1,26 @@
 import streamlit as st
-import base64
-import requests
-import plotly.graph_objects as go
 import pandas as pd
-from indicators import calculate_indicators, find_support_resistance
-from model import train_model, predict_trade
-from config import DEFAULT_SYMBOL, DEFAULT_INTERVAL, DEFAULT_LIMIT
+from cache import get_cache
+from profiling import Profiler, end_run, run_spans, span, start_run, to_json, to_prometheus
+from config import (COMPACT_HISTORY, DEFAULT_SYMBOL, DEFAULT_INTERVAL, DEFAULT_LIMIT, LIVE_POLL_SECONDS,
+                    SCREENER_REFRESH_SECONDS, SCREENER_SIZE, SIGNAL_SERVICE_URL)
 from data_fetcher import fetch_crypto_data
-from pycoingecko import CoinGeckoAPI
-from data_fetcher import fetch_top_100_coins
+from data_fetcher import fetch_live_price
+from screener import get_screener
+from service_client import fetch_service_candles, fetch_signal
+from utils import encode_image
+from warmup import start_warm_up
 # Streamlit setup
 st.set_page_config(page_title="DeepTradeAI", layout="wide")
 
-# --- LOGO ENCODING ---
-def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode()
+# --- WARM-UP: once per server process, in the background so the first page isn't held up ---
+@st.cache_resource(show_spinner=False)
+def warm_up_once():
+    return start_warm_up()
 
+warm_up_once()
+
+# --- LOGO ENCODING (cached per process) ---
 logo_path = "logo.jpg"
 logo_base64 = encode_image(logo_path)
 
@@ -122,22 +126,29 @@ st.markdown(f"""
 # --- SIDEBAR SETTINGS ---
 with st.sidebar:
     st.title("⚙️ Settings")
-    cg = CoinGeckoAPI()
-
-    # --- Cache top 100 coins for 1 hour ---
-    @st.cache_data(ttl=3600)
-    def get_top_100_coins():
-        try:
-            data = cg.get_coins_markets(vs_currency="usd", order="market_cap_desc", per_page=100, page=1)
-            return {f"{coin['name']} ({coin['symbol'].upper()})": coin['id'] for coin in data}
-        except Exception as e:
+
+    # --- Coin list from the screener snapshot, largest market cap first ---
+    @st.cache_data(ttl=SCREENER_REFRESH_SECONDS)
+    def get_top_coins():
+        coins = get_screener().query(sort='market_cap')
+        if coins.empty:
             st.error("Failed to fetch coins list.")
             return {"Bitcoin (BTC)": "bitcoin"}
+        labels = {}
+        for coin_id, name, ticker in zip(coins['Coin'], coins['Name'], coins['Symbol']):
+            label = f"{name} ({ticker})"
+            labels[label if label not in labels else f"{label} · {coin_id}"] = coin_id
+        return labels
 
-    COIN_SYMBOLS = get_top_100_coins()
+    COIN_SYMBOLS = get_top_coins()
 
-    # --- Coin Dropdown ---
-    symbol_choice = st.selectbox("🔍 Select Coin From TOP 100 coins:", options=list(COIN_SYMBOLS.keys()), index=0)
+    # --- Coin Dropdown (a coin picked in the screener is selected here) ---
+    picked = st.session_state.pop("screener_pick", None)
+    picked_label = next((label for label, coin_id in COIN_SYMBOLS.items() if coin_id == picked), None)
+    if picked_label:
+        st.session_state.coin_choice = picked_label
+    symbol_choice = st.selectbox(f"🔍 Select Coin From TOP {len(COIN_SYMBOLS)} coins:", options=list(COIN_SYMBOLS.keys()),
+                                 key="coin_choice")
     symbol = COIN_SYMBOLS[symbol_choice]
 
     # --- Timeframe ---
@@ -147,14 +158,17 @@ with st.sidebar:
     show_fib = st.checkbox("📐 Show Fibonacci Levels", value=True)
     show_indicators = st.checkbox("📊 Show Technical Indicators", value=True)
     show_sr = st.checkbox("🔁 Show Support/Resistance", value=True)
+    chart_bars = st.select_slider("🕰️ Chart History (bars):", options=[100, 250, 500, 1000, 2000], value=100)
+    use_mtf = st.checkbox("🧭 Multi-Timeframe Features", value=False)
+    online_mode = st.checkbox("🧬 Online Learning", value=False)
+    live_mode = st.checkbox("📡 Live Stream", value=False)
+    alerts_on = st.checkbox("🔔 Level Alerts", value=False)
+    profile_run = st.checkbox("🧪 Profile this run", value=False)
 
-    # --- Live Price ---
-    def get_live_price(symbol_id):
-        try:
-            data = cg.get_price(ids=symbol_id, vs_currencies='usd')
-            return data[symbol_id]['usd']
-        except:
-            return None
+    # --- Live Price (shared between reruns for one poll interval) ---
+    @st.cache_data(ttl=LIVE_POLL_SECONDS, show_spinner=False)
+    def get_live_price(coin_id):
+        return fetch_live_price(coin_id)
 
     live_price = get_live_price(symbol)
 
@@ -178,88 +192,260 @@ with st.sidebar:
   
 
 
+# --- Cached pipeline: candles for a minute, analysis per (coin, interval, last candle) ---
+@st.cache_data(ttl=60, show_spinner=False)
+def load_candles(symbol_id, interval, limit=DEFAULT_LIMIT):
+    return fetch_crypto_data(symbol_id, interval, limit=limit)
+
+def analyse(df, tuned):
+    from indicators import calculate_indicators, find_support_resistance
+
+    df = calculate_indicators(df, tuned.get('indicators'))
+    support, resistance = find_support_resistance(df, window=tuned.get('sr_window', 20))
+    return df, support, resistance
+
+
+# --- Live chart: only this fragment reruns, appending new candles to the stored figure ---
+@st.fragment(run_every=LIVE_POLL_SECONDS)
+def render_live_chart(stream):
+    from live_stream import append_to_figure
+
+    fig = st.session_state.live_fig
+    rows = stream.drain()
+    check_alerts(stream.coin_id, stream.latest['price'])
+    if rows is not None:
+        append_to_figure(fig, rows, stream.levels)
+
+    latencies = sorted(stream.latencies_ms)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("📡 Live Signal", stream.latest['signal'] or "Waiting…",
+                f"{stream.latest['confidence'] * 100:.1f}%" if stream.latest['confidence'] else None)
+    col2.metric("⚡ Update Latency (p50)", f"{latencies[len(latencies) // 2]:.1f} ms" if latencies else "—")
+    col3.metric("🐢 Update Latency (max)", f"{latencies[-1]:.1f} ms" if latencies else "—")
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# --- Level alerts: the engine lives in the session; each crossing becomes a toast ---
+def check_alerts(coin_id, price):
+    engine = st.session_state.get("alert_engine")
+    if engine is None or price is None:
+        return
+    for alert in engine.on_price(coin_id, price):
+        st.toast(f"🔔 {alert['coin']} crossed {alert['level']} ({alert['level_price']:,.6g}) "
+                 f"{alert['direction']} at {alert['price']:,.6g}")
+
+
+# --- Diagnostics: per-stage timings of the last prediction run ---
+def render_diagnostics(run_id, profiler):
+    spans = run_spans(run_id)
+    with st.expander("🩺 Diagnostics", expanded=False):
+        if spans:
+            timings = pd.DataFrame(spans)[['stage', 'ms', 'thread']]
+            st.dataframe(timings, use_container_width=True, hide_index=True)
+            st.caption(f"Total: {timings['ms'].sum():.1f} ms across {len(timings)} spans")
+        col1, col2 = st.columns(2)
+        col1.download_button("⬇️ Spans (JSON)", to_json(spans), file_name="spans.json", mime="application/json")
+        col2.download_button("⬇️ Metrics (Prometheus)", to_prometheus(), file_name="metrics.prom", mime="text/plain")
+        if profiler.report:
+            st.code(profiler.report, language="text")
+
+
+# --- Market screener: filter/sort the snapshot; picking a row runs the prediction for that coin ---
+SCREENER_SORTS = {"Market Cap": 'market_cap', "Volume Spike": 'volume_spike', "24h Volume": 'volume',
+                  "24h Change": 'change_24h'}
+
+with st.expander(f"🔎 Market Screener (top {SCREENER_SIZE:,})", expanded=False):
+    col1, col2, col3, col4 = st.columns(4)
+    min_cap = col1.number_input("Min Market Cap ($M)", min_value=0.0, value=0.0, step=100.0)
+    min_spike = col2.number_input("Min Volume Spike (×)", min_value=0.0, value=0.0, step=0.5)
+    min_change = col3.number_input("Min 24h Change (%)", min_value=-100.0, value=-100.0, step=1.0)
+    sort_label = col4.selectbox("Sort By", list(SCREENER_SORTS))
+
+    where = []
+    if min_cap > 0:
+        where.append(('market_cap', '>=', min_cap * 1e6))
+    if min_spike > 0:
+        where.append(('volume_spike', '>=', min_spike))
+    if min_change > -100:
+        where.append(('change_24h', '>=', min_change))
+    screener = get_screener()
+    matches = screener.query(where, sort=SCREENER_SORTS[sort_label], limit=250)
+    event = st.dataframe(matches, use_container_width=True, hide_index=True, on_select="rerun",
+                         selection_mode="single-row", key="screener_table")
+    selected = event.selection.rows if event else []
+    if selected and matches['Coin'].iloc[selected[0]] != st.session_state.get("screener_handled"):
+        st.session_state.screener_handled = st.session_state.screener_pick = matches['Coin'].iloc[selected[0]]
+        st.session_state.run_prediction = True
+        st.rerun()
+    if screener.stats:
+        st.caption(f"{len(matches):,} of {len(screener.snapshot):,} coins · last refresh: "
+                   f"+{screener.stats['added']} new, {screener.stats['changed']} updated, "
+                   f"-{screener.stats['removed']} dropped in {screener.stats['fetch_ms']:.0f} ms")
+
 # --- Main Content ---
 if st.session_state.get("run_prediction", False):
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.subheader("🔮 Prediction Engine")
-
-    df = fetch_crypto_data(symbol, interval, limit=DEFAULT_LIMIT)
-    if df.empty:
-        st.error("❌ Failed to fetch data. Please check the symbol or try again.")
-    else:
-        df.columns = df.columns.str.strip()
-        df['Time'] = pd.to_datetime(df['Time'])
-        df = calculate_indicators(df)
-
-        support, resistance = find_support_resistance(df)
-        fib_levels = [0.236, 0.382, 0.5, 0.618, 0.786]
-        fib_range = resistance - support
-        fib_prices = [support + fib_range * level for level in fib_levels]
-
-        if live_price:
-            nearest_fib = min(fib_prices, key=lambda x: abs(x - live_price))
-            entry_level = nearest_fib
-            st.write(f"📌 Entry Level : ${entry_level:.2f}")
+    # Heavy modules (scikit-learn via model.py, plotly) load only once a prediction is requested
+    from chart_render import build_figure, payload_bytes
+    from live_stream import LiveStream
+    from explain_trade import format_reasons, reason_codes
+    from indicators import calculate_indicators, fibonacci_levels
+    from model import FEATURES, predict_latest, predict_trade
+    from model_store import get_model
+    from online_model import get_online_model
+    from mtf_features import add_mtf_features
+    from search import best_params, params_hash
+
+    # Indicator windows, S/R window and model settings tuned by search.py, when recorded
+    tuned = best_params(symbol, interval) or {}
+
+    run_id = start_run("prediction")
+    profiler = Profiler(enabled=profile_run).start()
+    # st.rerun() and errors leave through here too; the run tag must not leak onto later spans
+    try:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.subheader("🔮 Prediction Engine")
+
+        # With a signal service configured, this page only renders what the service computed
+        remote = None
+        if SIGNAL_SERVICE_URL:
+            df = fetch_service_candles(symbol, interval, DEFAULT_LIMIT)
+            remote = fetch_signal(symbol, interval, DEFAULT_LIMIT, mtf=use_mtf) if not df.empty else None
+            if remote is None:
+                df = pd.DataFrame()
         else:
-            entry_level = support + fib_range * 0.5
+            df = load_candles(symbol, interval)
 
-        model, scaler = train_model(df)
-        if model:
-            prediction, raw_entry, (stop_loss, take_profit) = predict_trade(df, model, scaler, support, resistance)
-            entry_price = entry_level
-            st.write(f"Prediction: {prediction}")
+        if df.empty:
+            st.error("❌ Failed to fetch data. Please check the symbol or try again.")
         else:
-            prediction, entry_price, stop_loss, take_profit = "No Signal", 0, 0, 0
+            df.columns = df.columns.str.strip()
+            df['Time'] = pd.to_datetime(df['Time'])
+            if remote:
+                support, resistance = remote['support'], remote['resistance']
+            else:
+                analysis_key = ("analysis", symbol, interval, str(df['Time'].iloc[-1]), params_hash(tuned))
+                df, support, resistance = get_cache().get_or_compute(analysis_key, lambda: analyse(df, tuned))
+            fib_levels = fibonacci_levels(support, resistance)
+            fib_prices = list(fib_levels.values())
+
+            if live_price:
+                nearest_fib = min(fib_prices, key=lambda x: abs(x - live_price))
+                entry_level = nearest_fib
+                st.write(f"📌 Entry Level : ${entry_level:.2f}")
+            else:
+                entry_level = fib_levels['Fib_0.5']
 
-        col1, col2, col3 = st.columns(3)
-        col1.metric("📍 Entry", format_price(entry_price))
-        col2.metric("🛑 Stop Loss", format_price(stop_loss))
-        col3.metric("🎯 Take Profit", format_price(take_profit))
+            features = FEATURES
+            model = scaler = confidence = None
+            if remote:
+                prediction, confidence = remote['signal'], remote['confidence']
+                entry_price = entry_level if remote['entry'] is not None else 0
+                stop_loss, take_profit = remote['stop_loss'] or 0, remote['take_profit'] or 0
+                st.write(f"Prediction: {prediction}")
+            else:
+                if use_mtf:
+                    df, features = add_mtf_features(df, symbol, interval, params=tuned.get('indicators'))
+                # Online mode updates a per-coin incremental learner instead of refitting a batch model
+                model, scaler = (get_online_model if online_mode else get_model)(symbol, interval, df, features)
+                if model:
+                    prediction, raw_entry, (stop_loss, take_profit) = predict_trade(df, model, scaler, support, resistance, features)
+                    _, confidence = predict_latest(model, scaler, df[features].iloc[-1].to_numpy())
+                    entry_price = entry_level
+                    st.write(f"Prediction: {prediction}")
+                else:
+                    prediction, entry_price, stop_loss, take_profit = "No Signal", 0, 0, 0
 
-        # --- CHART SECTION ---
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.subheader("📈 Chart Analysis")
-
-        last_100 = df.tail(100)
-        fig = go.Figure()
-        fig.add_trace(go.Candlestick(
-            x=last_100['Time'],
-            open=last_100['Open'],
-            high=last_100['High'],
-            low=last_100['Low'],
-            close=last_100['Close'],
-            name="Candles"
-        ))
-
-        if show_fib:
-            for level, fib_price in zip(['Fib_0.236', 'Fib_0.382', 'Fib_0.5', 'Fib_0.618', 'Fib_0.786'], fib_prices):
-                fig.add_trace(go.Scatter(
-                    x=last_100['Time'],
-                    y=[fib_price]*len(last_100),
-                    name=level,
-                    line=dict(dash='dot')
-                ))
-
-        if show_indicators:
-            if 'EMA_9' in df.columns:
-                fig.add_trace(go.Scatter(x=last_100['Time'], y=last_100['EMA_9'], name='EMA 9', line=dict(color='orange')))
-            if 'EMA_21' in df.columns:
-                fig.add_trace(go.Scatter(x=last_100['Time'], y=last_100['EMA_21'], name='EMA 21', line=dict(color='blue')))
-
-        if show_sr and support and resistance:
-            fig.add_hline(y=support, line_color="green", line_dash="dash", annotation_text="Support", annotation_position="bottom left")
-            fig.add_hline(y=resistance, line_color="red", line_dash="dash", annotation_text="Resistance", annotation_position="top left")
-
-        fig.update_layout(
-            template="plotly_dark",
-            xaxis_title="Time",
-            yaxis_title="Price",
-            margin=dict(l=20, r=20, t=30, b=20),
-            xaxis_rangeslider_visible=False,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("📍 Entry", format_price(entry_price))
+            col2.metric("🛑 Stop Loss", format_price(stop_loss))
+            col3.metric("🎯 Take Profit", format_price(take_profit))
+
+            # --- WHY THIS SIGNAL: reason codes for every bar, formatted only for the latest one ---
+            codes = reason_codes(df, support, resistance) if len(df) > 1 and 'EMA_9' in df.columns else None
+            if codes is not None:
+                with st.expander("🧠 Why this signal", expanded=False):
+                    for line in format_reasons(df, codes, -1, confidence, support, resistance):
+                        st.markdown(f"- {line}")
+
+            # --- LEVEL ALERTS: this coin's support, resistance and Fibonacci levels are watched ---
+            if alerts_on:
+                from alerts import AlertEngine, analysis_levels, default_sinks
+
+                if "alert_engine" not in st.session_state:
+                    st.session_state.alert_engine = AlertEngine(default_sinks())
+                st.session_state.alert_engine.book.set_levels(symbol, analysis_levels(support, resistance))
+                check_alerts(symbol, live_price)
+            else:
+                st.session_state.pop("alert_engine", None)
+
+            # --- CHART SECTION ---
+            st.markdown('<div class="card">', unsafe_allow_html=True)
+            st.subheader("📈 Chart Analysis")
+
+            # Longer histories come from the same candle store; the figure is downsampled to the plot width
+            if chart_bars > len(df):
+                if remote:
+                    chart_df = fetch_service_candles(symbol, interval, chart_bars)
+                elif COMPACT_HISTORY:
+                    from compact import CompactIndicators
+                    from data_fetcher import fetch_compact_data
+
+                    compact = CompactIndicators(fetch_compact_data(symbol, interval, chart_bars), tuned.get('indicators'))
+                    chart_df = compact.to_frame()
+                else:
+                    chart_df = calculate_indicators(load_candles(symbol, interval, chart_bars), tuned.get('indicators'))
+                chart_codes = reason_codes(chart_df, support, resistance) if len(chart_df) > 1 else None
+            else:
+                chart_df = df.tail(chart_bars)
+                chart_codes = None if codes is None else codes[-len(chart_df):]
+
+            if chart_df.empty:
+                st.info("No candles to chart for this range yet.")
+            else:
+                levels = []
+                if show_fib:
+                    levels += [{'y': fib_price, 'name': level} for level, fib_price in fib_levels.items()]
+                if show_sr and support and resistance:
+                    levels += [
+                        {'y': support, 'name': "Support", 'color': "green", 'dash': "dash", 'position': "bottom left"},
+                        {'y': resistance, 'name': "Resistance", 'color': "red", 'dash': "dash", 'position': "top left"},
+                    ]
+
+                # A box selection on the chart zooms in; that window is re-rendered at full detail
+                zoom = st.session_state.get("chart_zoom")
+                x_range = zoom[2:] if zoom and zoom[:2] == (symbol, interval) else None
+                fig, chart_stats = build_figure(chart_df, levels, chart_codes, show_indicators, x_range)
+                with span("render_chart"):
+                    if live_mode and model:
+                        stream_key = f"live_{symbol}_{interval}_{len(features)}_{online_mode}"
+                        for key in [k for k in st.session_state.keys() if k.startswith("live_") and k not in (stream_key, "live_fig")]:
+                            st.session_state.pop(key).stop()
+                        stream = st.session_state.get(stream_key)
+                        if stream is None or not stream.running:
+                            stream = LiveStream(symbol, interval, df, model, scaler, features,
+                                                indicator_params=tuned.get('indicators'), online=online_mode,
+                                                sr_window=tuned.get('sr_window', 20)).start()
+                            st.session_state[stream_key] = stream
+                            st.session_state.live_fig = fig
+                        render_live_chart(stream)
+                    else:
+                        event = st.plotly_chart(fig, use_container_width=True, key="chart", on_select="rerun",
+                                                selection_mode="box")
+                        boxes = event.selection.get("box") if event else None
+                        if boxes:
+                            x0, x1 = sorted(pd.Timestamp(x) for x in boxes[0]["x"])
+                            st.session_state.chart_zoom = (symbol, interval, x0, x1)
+                            st.rerun()
+                        if x_range and st.button("🔍 Reset Zoom"):
+                            st.session_state.pop("chart_zoom", None)
+                            st.rerun()
+                st.caption(f"🖼️ {chart_stats['bars']:,} bars drawn as {chart_stats['points']:,} points · "
+                           f"{payload_bytes(fig) / 1024:,.0f} KB payload · built in {chart_stats['build_ms']:.0f} ms")
+            st.markdown('</div>', unsafe_allow_html=True)
+    finally:
+        end_run()
+        profiler.stop()
+    render_diagnostics(run_id, profiler)
 
 # --- FOOTER ---
 st.markdown("""
@@ -0,0 +1,209 @@
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import requests
+
+from config import (ALERT_DEBOUNCE_SECONDS, ALERT_LOG_PATH, ALERT_WEBHOOK_URL, DEFAULT_INTERVAL, DEFAULT_LIMIT,
+                    LIVE_POLL_SECONDS, SCAN_FETCH_WORKERS)
+from data_fetcher import fetch_crypto_data, fetch_live_prices, fetch_top_100_coins
+from indicators import analysis_levels, calculate_indicators, find_support_resistance
+from search import best_params
+
+
+class LevelBook:
+    """Watched price levels for every coin, each coin's kept as a sorted array.
+
+    A price move from `previous` to `price` crossed exactly the levels in between, which
+    two searchsorted calls find in O(log n) however many levels the coin has.
+    """
+
+    def __init__(self):
+        # coin_id -> (sorted prices, names in the same order); replaced whole so readers never see a half update
+        self._levels = {}
+        self._lock = threading.Lock()
+
+    def set_levels(self, coin_id, levels):
+        """Replace a coin's levels with {name: price}; names are unique per coin."""
+        levels = {name: float(price) for name, price in levels.items() if price is not None and math.isfinite(price)}
+        prices = np.fromiter(levels.values(), dtype=float, count=len(levels))
+        order = np.argsort(prices, kind='stable')
+        with self._lock:
+            self._levels[coin_id] = (prices[order], np.array(list(levels), dtype=object)[order])
+
+    def add(self, coin_id, name, price):
+        """Add or move one level."""
+        with self._lock:
+            prices, names = self._levels.get(coin_id, (np.empty(0), np.empty(0, dtype=object)))
+            keep = names != name
+            prices, names = prices[keep], names[keep]
+            at = np.searchsorted(prices, price)
+            self._levels[coin_id] = (np.insert(prices, at, float(price)), np.insert(names, at, name))
+
+    def remove(self, coin_id, name=None):
+        """Drop one level, or every level of the coin when `name` is None."""
+        with self._lock:
+            if name is None or coin_id not in self._levels:
+                self._levels.pop(coin_id, None)
+                return
+            prices, names = self._levels[coin_id]
+            keep = names != name
+            self._levels[coin_id] = (prices[keep], names[keep])
+
+    def levels(self, coin_id):
+        prices, names = self._levels.get(coin_id, ((), ()))
+        return {name: float(price) for name, price in zip(names, prices)}
+
+    def crossed(self, coin_id, previous, price):
+        """[(name, level, direction)] for the levels between two consecutive prices, in the order met."""
+        book = self._levels.get(coin_id)
+        if book is None or price == previous:
+            return []
+        prices, names = book
+        if price > previous:
+            # Levels in (previous, price]
+            lo, hi = np.searchsorted(prices, [previous, price], side='right')
+            return [(names[i], prices[i], 'up') for i in range(lo, hi)]
+        # Levels in [price, previous)
+        lo, hi = np.searchsorted(prices, [price, previous], side='left')
+        return [(names[i], prices[i], 'down') for i in range(hi - 1, lo - 1, -1)]
+
+    def __len__(self):
+        return sum(len(prices) for prices, _ in self._levels.values())
+
+
+class AlertEngine:
+    """Turns price updates into level-cross alerts and hands them to the sinks.
+
+    A sink is any callable taking the alert dict. Each (coin, level) fires at most once per
+    debounce window, so a price chopping around a level doesn't flood the sinks.
+    """
+
+    def __init__(self, sinks=(), debounce_seconds=ALERT_DEBOUNCE_SECONDS, book=None):
+        self.book = book or LevelBook()
+        self.sinks = list(sinks)
+        self.debounce_seconds = debounce_seconds
+        self.stats = {'ticks': 0, 'alerts': 0, 'debounced': 0}
+        self._last_price = {}
+        self._last_fired = {}
+        self._lock = threading.Lock()
+
+    def on_price(self, coin_id, price, now=None):
+        """Check one price update; returns the alerts it raised."""
+        if price is None:
+            return []
+        now = time.time() if now is None else now
+        alerts = []
+        with self._lock:
+            self.stats['ticks'] += 1
+            previous = self._last_price.get(coin_id)
+            self._last_price[coin_id] = price
+            if previous is None:
+                return []
+            stamp = None
+            for name, level, direction in self.book.crossed(coin_id, previous, price):
+                key = (coin_id, name)
+                if now - self._last_fired.get(key, -math.inf) < self.debounce_seconds:
+                    self.stats['debounced'] += 1
+                    continue
+                self._last_fired[key] = now
+                stamp = stamp or datetime.fromtimestamp(now, timezone.utc).isoformat()
+                alerts.append({
+                    'coin': coin_id,
+                    'level': name,
+                    'level_price': float(level),
+                    'direction': direction,
+                    'price': float(price),
+                    'time': stamp,
+                })
+            self.stats['alerts'] += len(alerts)
+
+        for alert in alerts:
+            for sink in self.sinks:
+                try:
+                    sink(alert)
+                except Exception as e:
+                    print("❌ Alert sink failed:", e)
+        return alerts
+
+    def on_prices(self, prices, now=None):
+        """Check a {coin_id: price} batch, e.g. one simple/price response."""
+        now = time.time() if now is None else now
+        return [alert for coin_id, price in prices.items() for alert in self.on_price(coin_id, price, now)]
+
+
+class LogFileSink:
+    """Appends each alert as one JSON line."""
+
+    def __init__(self, path=ALERT_LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def __call__(self, alert):
+        with self._lock, open(self.path, "a") as f:
+            f.write(json.dumps(alert) + "\n")
+
+
+class WebhookSink:
+    """POSTs each alert as JSON to a webhook URL."""
+
+    def __init__(self, url=ALERT_WEBHOOK_URL, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def __call__(self, alert):
+        self.session.post(self.url, json=alert, timeout=self.timeout).raise_for_status()
+
+
+def default_sinks():
+    sinks = [LogFileSink()]
+    if ALERT_WEBHOOK_URL:
+        sinks.append(WebhookSink())
+    return sinks
+
+
+# Levels for one coin from its latest candles, using the tuned indicator settings when there are any
+def coin_levels(coin_id, interval=DEFAULT_INTERVAL, limit=DEFAULT_LIMIT):
+    df = fetch_crypto_data(coin_id, interval, limit=limit)
+    if df.empty:
+        return {}
+    tuned = best_params(coin_id, interval) or {}
+    df = calculate_indicators(df, tuned.get('indicators'))
+    return analysis_levels(*find_support_resistance(df, window=tuned.get('sr_window', 20)))
+
+
+# Watch the top-100 universe: build every coin's levels, then check one batched price poll per interval
+def watch_universe(engine, interval=DEFAULT_INTERVAL, poll_seconds=LIVE_POLL_SECONDS, fetch_workers=SCAN_FETCH_WORKERS,
+                   stop=None):
+    coin_ids = [coin['id'] for coin in fetch_top_100_coins()]
+    with ThreadPoolExecutor(max_workers=fetch_workers) as pool:
+        for coin_id, levels in zip(coin_ids, pool.map(lambda c: coin_levels(c, interval), coin_ids)):
+            engine.book.set_levels(coin_id, levels)
+    print(f"Watching {len(engine.book)} levels across {len(coin_ids)} coins")
+
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        for alert in engine.on_prices(fetch_live_prices(coin_ids)):
+            print(f"🔔 {alert['coin']} crossed {alert['level']} ({alert['level_price']:.6g}) "
+                  f"{alert['direction']} at {alert['price']:.6g}")
+        stop.wait(poll_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alert when top-100 prices cross support, resistance or Fibonacci levels.")
+    parser.add_argument("--interval", default=DEFAULT_INTERVAL)
+    parser.add_argument("--poll", type=float, default=LIVE_POLL_SECONDS)
+    args = parser.parse_args()
+    try:
+        watch_universe(AlertEngine(default_sinks()), args.interval, args.poll)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,161 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from explain_trade import REASONS, reason_codes, reason_flags
+from model import DEFAULT_BACKEND, FEATURES, train_model
+
+# Exit reasons in the trades table
+EXIT_STOP, EXIT_TARGET, EXIT_TIME = 'stop', 'target', 'time'
+
+
+# Support/resistance and SL/TP per bar, mirroring predict_trade with indicators.find_support_resistance
+def _trade_levels(df, signals, sr_window):
+    close = df['Close'].to_numpy()
+    support = df['Low'].rolling(sr_window).min().to_numpy()
+    resistance = df['High'].rolling(sr_window).max().to_numpy()
+    resistance = np.where(resistance <= close, close * 1.005, resistance)
+    support = np.where(support >= close, close * 0.995, support)
+
+    buy = signals == 1
+    have_levels = ~np.isnan(support) & ~np.isnan(resistance)
+    stop_loss = np.where(have_levels, np.where(buy, support, resistance), close * 0.98)
+    take_profit = np.where(have_levels, np.where(buy, resistance, support), close * 1.02)
+    return close, stop_loss, take_profit
+
+
+# First bar within `horizon` where SL or TP is touched, for every entry bar at once
+def _simulate_exits(df, signals, entry, stop_loss, take_profit, horizon):
+    high = df['High'].to_numpy()
+    low = df['Low'].to_numpy()
+    close = df['Close'].to_numpy()
+    n = len(df)
+
+    # Forward windows of bars i+1 .. i+horizon, padded with NaN past the end
+    pad = np.full(horizon, np.nan)
+    future_high = sliding_window_view(np.r_[high[1:], pad], horizon)[:n]
+    future_low = sliding_window_view(np.r_[low[1:], pad], horizon)[:n]
+
+    buy = (signals == 1)[:, None]
+    sl, tp = stop_loss[:, None], take_profit[:, None]
+    stop_hit = np.where(buy, future_low <= sl, future_high >= sl)
+    target_hit = np.where(buy, future_high >= tp, future_low <= tp)
+
+    first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), horizon)
+    first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), horizon)
+    # When both are touched in the same bar, assume the stop filled first
+    stopped = (first_stop <= first_target) & (first_stop < horizon)
+    targeted = ~stopped & (first_target < horizon)
+
+    time_exit_index = np.minimum(np.arange(n) + horizon, n - 1)
+    exit_price = np.where(stopped, stop_loss, np.where(targeted, take_profit, close[time_exit_index]))
+    exit_bar = np.where(stopped, first_stop + 1, np.where(targeted, first_target + 1, time_exit_index - np.arange(n)))
+    reason = np.where(stopped, EXIT_STOP, np.where(targeted, EXIT_TARGET, EXIT_TIME))
+
+    direction = np.where(signals == 1, 1.0, -1.0)
+    returns = direction * (exit_price - entry) / entry
+    return exit_price, exit_bar, reason, returns
+
+
+def _summarize(trades, bars, elapsed, retrains):
+    returns = trades['Return'].to_numpy()
+    equity = np.cumsum(returns)
+    drawdown = (np.maximum.accumulate(np.r_[0.0, equity]) - np.r_[0.0, equity]).max() if len(equity) else 0.0
+    return {
+        'trades': len(trades),
+        'pnl': float(returns.sum()),
+        'hit_rate': float((returns > 0).mean()) if len(returns) else 0.0,
+        'max_drawdown': float(drawdown),
+        'retrains': retrains,
+        'bars': bars,
+        'seconds': elapsed,
+        'bars_per_sec': bars / elapsed if elapsed else float('inf'),
+    }
+
+
+def walk_forward(df, train_window=200, retrain_every=24, expanding=False, horizon=24, sr_window=20,
+                 backend=DEFAULT_BACKEND, trainer=train_model):
+    """Walk-forward backtest of the predict_trade strategy over an indicator frame.
+
+    Retrains every `retrain_every` bars on the preceding `train_window` bars (or all prior bars
+    when `expanding`), scores each segment in one model call, and takes every bar's signal as a
+    unit-size trade closed at SL, TP or after `horizon` bars. Returns (summary, trades).
+    """
+    start = time.perf_counter()
+    df = df.reset_index(drop=True)
+    n = len(df)
+    X = df[FEATURES].fillna(0)
+
+    signals = np.full(n, -1)
+    retrains = 0
+    for t in range(train_window, n, retrain_every):
+        lo = 0 if expanding else t - train_window
+        model, scaler = trainer(df.iloc[lo:t].copy(), backend)
+        if model is None:
+            continue
+        retrains += 1
+        segment = slice(t, min(t + retrain_every, n))
+        signals[segment] = model.predict(scaler.transform(X.iloc[segment]))
+
+    traded = signals >= 0
+    entry, stop_loss, take_profit = _trade_levels(df, signals, sr_window)
+    exit_price, exit_bar, reason, returns = _simulate_exits(df, signals, entry, stop_loss, take_profit, horizon)
+    reasons = reason_codes(df, df['Low'].rolling(sr_window).min().to_numpy(), df['High'].rolling(sr_window).max().to_numpy())
+
+    trades = pd.DataFrame({
+        'Time': df['Time'] if 'Time' in df.columns else df.index,
+        'Signal': np.where(signals == 1, 'Buy', 'Sell'),
+        'Entry': entry,
+        'Stop_Loss': stop_loss,
+        'Take_Profit': take_profit,
+        'Exit': exit_price,
+        'Bars_Held': exit_bar,
+        'Exit_Reason': reason,
+        'Return': returns,
+        'Reasons': reasons,
+    })[traded].reset_index(drop=True)
+
+    return _summarize(trades, int(traded.sum()), time.perf_counter() - start, retrains), trades
+
+
+def pnl_by_reason(trades):
+    """Trades, P&L and hit rate of the trades entered while each reason code was active."""
+    flags = reason_flags(trades['Reasons'].to_numpy(), index=trades.index)
+    rows = []
+    for name in REASONS:
+        returns = trades.loc[flags[name], 'Return']
+        rows.append({
+            'reason': name,
+            'trades': len(returns),
+            'pnl': float(returns.sum()),
+            'hit_rate': float((returns > 0).mean()) if len(returns) else 0.0,
+        })
+    return pd.DataFrame(rows).sort_values('pnl', ascending=False).reset_index(drop=True)
+
+
+# Worker processes receive the indicator frame once through the initializer, not per task
+_shared_frame = None
+
+
+def _init_worker(df):
+    global _shared_frame
+    _shared_frame = df
+
+
+def _run_params(params):
+    summary, _ = walk_forward(_shared_frame, **params)
+    return {**params, **summary}
+
+
+def run_grid(df, param_grid, processes=None):
+    """Run walk_forward for every combination in `param_grid` (name -> list of values) in a process pool."""
+    names = list(param_grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), initializer=_init_worker, initargs=(df,)) as pool:
+        rows = list(pool.map(_run_params, combos))
+    return pd.DataFrame(rows).sort_values('pnl', ascending=False).reset_index(drop=True)
@@ -0,0 +1,144 @@
+"""Record CoinGecko responses once, then soak-test the full pipeline against the recording.
+
+    python -m benchmarks.replay_soak record --archive soak.jsonl.gz            # live CoinGecko
+    python -m benchmarks.replay_soak record --archive soak.jsonl.gz --stub     # offline stub
+    python -m benchmarks.replay_soak replay --archive soak.jsonl.gz --speed 10
+
+Both modes run the same session from empty temporary stores: the coin list, then `--rounds`
+rounds of one batched price poll plus fetch -> indicators -> model -> signal for every
+coin/interval, `--poll` seconds apart. Replay serves the recorded responses (latencies and
+the poll spacing divided by --speed, 0 for no delay), so pass the same coins, intervals and
+rounds as the recording. Reports pipeline throughput and per-stage latency percentiles.
+"""
+import argparse
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import coingecko_client
+from benchmarks.stub_coingecko import StubCoinGecko, serve, use_temp_stores
+from config import DEFAULT_LIMIT, SCAN_FETCH_WORKERS
+from recording import RecordingClient, ReplayClient, ResponseArchive
+
+STAGES = ['fetch', 'indicators', 'model', 'signal', 'total']
+
+
+def _pipeline(coin_id, interval, limit, timings):
+    from data_fetcher import fetch_crypto_data
+    from indicators import calculate_indicators, find_support_resistance
+    from model import predict_trade
+    from model_store import get_model
+
+    started = time.perf_counter()
+    df = fetch_crypto_data(coin_id, interval, limit=limit)
+    fetched = time.perf_counter()
+    timings['fetch'].append(fetched - started)
+    if df.empty:
+        return
+    frame = calculate_indicators(df)
+    support, resistance = find_support_resistance(frame)
+    computed = time.perf_counter()
+    timings['indicators'].append(computed - fetched)
+    model, scaler = get_model(coin_id, interval, frame)
+    modelled = time.perf_counter()
+    timings['model'].append(modelled - computed)
+    if model is not None:
+        predict_trade(frame, model, scaler, support, resistance)
+    done = time.perf_counter()
+    timings['signal'].append(done - modelled)
+    timings['total'].append(done - started)
+
+
+def run_session(coins, intervals, rounds, poll_seconds, limit=DEFAULT_LIMIT, workers=SCAN_FETCH_WORKERS):
+    """Run the soak session; returns (wall seconds, {stage: [seconds]})."""
+    from data_fetcher import fetch_live_prices, fetch_top_100_coins
+
+    timings = defaultdict(list)
+    jobs = [(coin_id, interval) for coin_id in coins for interval in intervals]
+    started = time.perf_counter()
+    fetch_top_100_coins()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for round_number in range(rounds):
+            round_started = time.perf_counter()
+            fetch_live_prices(coins)
+            list(pool.map(lambda job: _pipeline(*job, limit, timings), jobs))
+            if round_number < rounds - 1:
+                time.sleep(max(poll_seconds - (time.perf_counter() - round_started), 0))
+    return time.perf_counter() - started, timings
+
+
+def report(wall, timings):
+    pipelines = len(timings['total'])
+    print(f"{pipelines} pipelines in {wall:.2f}s -> {pipelines / wall:.1f} pipelines/s")
+    print(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage in STAGES:
+        if timings[stage]:
+            ms = np.array(timings[stage]) * 1000
+            print(f"{stage:<12}{np.percentile(ms, 50):10.1f}{np.percentile(ms, 95):10.1f}"
+                  f"{np.percentile(ms, 99):10.1f}{ms.max():10.1f}")
+
+
+def _start_stub(latency):
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="stub-coingecko", daemon=True).start()
+    _, port = asyncio.run_coroutine_threadsafe(serve(StubCoinGecko(latency).app(), 0), loop).result()
+    return f"http://127.0.0.1:{port}"
+
+
+def record(args):
+    client_kwargs = {}
+    if args.stub:
+        client_kwargs = dict(base_url=_start_stub(args.stub_latency), calls_per_minute=60_000, burst=100)
+    archive = ResponseArchive(args.archive)
+    coingecko_client._shared = coingecko_client.SyncCoinGecko(RecordingClient, archive=archive, **client_kwargs)
+    use_temp_stores(prefix="soak-record-")
+    try:
+        report(*run_session(args.coins, args.intervals, args.rounds, args.poll, args.limit, args.workers))
+    finally:
+        coingecko_client._shared.close()
+    print(f"Recorded to {args.archive}")
+
+
+def replay(args):
+    archive = ResponseArchive(args.archive)
+    coingecko_client._shared = coingecko_client.SyncCoinGecko(ReplayClient, archive=archive, speed=args.speed)
+    use_temp_stores(prefix="soak-replay-")
+    client = coingecko_client._shared.client
+    recorded_span = max((entry['at'] for entries in client.responses.values() for entry in entries), default=0)
+    poll = args.poll / args.speed if args.speed > 0 else 0
+    try:
+        wall, timings = run_session(args.coins, args.intervals, args.rounds, poll, args.limit, args.workers)
+    finally:
+        coingecko_client._shared.close()
+    report(wall, timings)
+    print(f"recorded span {recorded_span:.1f}s replayed in {wall:.1f}s ({recorded_span / wall:.1f}x real time)")
+    print(f"responses served {client.served}, missing from archive {client.missing}")
+    return 1 if client.missing else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--archive", default="soak.jsonl.gz")
+    parser.add_argument("--coins", nargs="+", default=["bitcoin", "ethereum", "solana"])
+    parser.add_argument("--intervals", nargs="+", default=["15m", "1h"])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--poll", type=float, default=10.0, help="seconds between rounds when recording")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--workers", type=int, default=SCAN_FETCH_WORKERS)
+    parser.add_argument("--speed", type=float, default=10.0, help="replay speed-up; 0 serves without delay")
+    parser.add_argument("--stub", action="store_true", help="record from the offline stub instead of CoinGecko")
+    parser.add_argument("--stub-latency", type=float, default=0.05)
+    args = parser.parse_args(argv)
+    if args.mode == "record":
+        record(args)
+        return 0
+    return replay(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
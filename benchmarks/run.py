@@ -0,0 +1,205 @@
+"""Offline benchmarks for the hot paths, on synthetic candles.
+
+    python -m benchmarks.run                          # all benches, default sizes
+    python -m benchmarks.run --sizes 100 10000 --only calculate_indicators
+    python -m benchmarks.run --save-baseline          # record benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json   # flag regressions
+
+Results are written as JSON to benchmarks/results/. Exits non-zero when a comparison
+against a baseline finds a regression.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import alerts
+import chart_render
+import indicators
+import model
+import online_model
+from benchmarks.synthetic import make_candles
+from explain_trade import explain_trade, reason_codes
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+# Each bench: setup(candles, indicator_frame) -> zero-arg callable, plus the largest size worth running
+def _calculate_indicators(candles, frame):
+    return lambda: indicators.calculate_indicators(candles.copy())
+
+
+def _indicators_support_resistance(candles, frame):
+    return lambda: indicators.find_support_resistance(frame)
+
+
+def _model_support_resistance(candles, frame):
+    return lambda: model.find_support_resistance(frame)
+
+
+def _train_model(candles, frame):
+    return lambda: model.train_model(frame.copy())
+
+
+def _predict_trade(candles, frame):
+    fitted, scaler = model.train_model(frame.tail(5_000).copy())
+    support, resistance = indicators.find_support_resistance(frame)
+    return lambda: model.predict_trade(frame, fitted, scaler, support, resistance)
+
+
+def _predict_trades_batch(candles, frame):
+    fitted, scaler = model.train_model(frame.tail(5_000).copy())
+    support, resistance = indicators.find_support_resistance(frame)
+    return lambda: model.predict_trades_batch(frame, fitted, scaler, support, resistance)
+
+
+def _get_nearest_level(candles, frame):
+    support, _ = model.find_support_resistance(frame)
+    price = float(frame['Close'].iloc[-1])
+    return lambda: model.get_nearest_level(price, support, direction="support")
+
+
+def _explain_trade(candles, frame):
+    return lambda: explain_trade(frame, 1, 0.75)
+
+
+def _reason_codes(candles, frame):
+    support, resistance = indicators.find_support_resistance(frame)
+    return lambda: reason_codes(frame, support, resistance)
+
+
+def _build_figure(candles, frame):
+    levels = [{'y': float(frame['Close'].iloc[-1]) * (1 + i / 100), 'name': f"Level {i}"} for i in range(5)]
+    codes = reason_codes(frame)
+    return lambda: chart_render.build_figure(frame, levels, codes)
+
+
+# One candle of incremental learning; cost is per candle, independent of history length
+def _online_learn(candles, frame):
+    learner = online_model.OnlineLearner(len(model.FEATURES))
+    rows = frame[model.FEATURES].dropna().tail(1_000)
+    pairs = list(zip(rows.to_numpy(dtype=float), frame.loc[rows.index, 'Close'].to_numpy(dtype=float)))
+    candle = itertools.cycle(pairs)
+    return lambda: learner.learn(*next(candle))
+
+
+# Replays the closes as ticks against 1,000 levels spread over the series' range
+def _alert_ticks(candles, frame):
+    closes = frame['Close'].to_numpy(dtype=float)
+    book = alerts.LevelBook()
+    book.set_levels('coin', {f"L{i}": price for i, price in enumerate(np.linspace(closes.min(), closes.max(), 1_000))})
+
+    def replay():
+        engine = alerts.AlertEngine(debounce_seconds=0, book=book)
+        for price in closes:
+            engine.on_price('coin', price, now=0.0)
+    return replay
+
+
+BENCHES = {
+    "calculate_indicators": (_calculate_indicators, None),
+    "indicators.find_support_resistance": (_indicators_support_resistance, None),
+    "model.find_support_resistance": (_model_support_resistance, None),
+    "train_model": (_train_model, 100_000),
+    "predict_trade": (_predict_trade, None),
+    "predict_trades_batch": (_predict_trades_batch, None),
+    "get_nearest_level": (_get_nearest_level, None),
+    "explain_trade": (_explain_trade, None),
+    "reason_codes": (_reason_codes, None),
+    "build_figure": (_build_figure, 1_000_000),
+    "online_learn": (_online_learn, 10_000),
+    "alert_ticks": (_alert_ticks, 1_000_000),
+}
+
+
+def measure(fn, repeat):
+    """Best per-call seconds over `repeat` rounds, each long enough (~0.2s) to be stable."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number, number
+
+
+def run(sizes, names, repeat, seed=0):
+    results = []
+    for rows in sizes:
+        candles = make_candles(rows, seed=seed)
+        frame = indicators.calculate_indicators(candles.copy())
+        for name in names:
+            setup, max_rows = BENCHES[name]
+            if max_rows is not None and rows > max_rows:
+                continue
+            if name.startswith("predict_trade") and rows < 60:
+                continue  # train_model needs 50+ complete rows
+            seconds, number = measure(setup(candles, frame), repeat)
+            results.append({"bench": name, "rows": rows, "seconds": seconds, "loops": number})
+            print(f"{name:<36} {rows:>10,} rows  {seconds * 1000:12.3f} ms")
+    return results
+
+
+def environment():
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Rows that got slower than `threshold` x the baseline for the same bench and size."""
+    previous = {(r["bench"], r["rows"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        before = previous.get((r["bench"], r["rows"]))
+        if before and r["seconds"] / before > threshold:
+            regressions.append({**r, "baseline": before, "ratio": r["seconds"] / before})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHES), default=list(BENCHES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write {BASELINE_PATH}")
+    args = parser.parse_args(argv)
+
+    report = {"environment": environment(), "results": run(args.sizes, args.only, args.repeat, args.seed)}
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['bench']} @ {r['rows']:,} rows: "
+                  f"{r['baseline'] * 1000:.3f} ms -> {r['seconds'] * 1000:.3f} ms ({r['ratio']:.2f}x)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
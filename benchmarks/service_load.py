@@ -0,0 +1,87 @@
+"""Load test for the signal service against a stubbed CoinGecko, fully offline.
+
+    python -m benchmarks.service_load                       # 200 requests, 50 at a time
+    python -m benchmarks.service_load --requests 1000 --concurrency 100 --coins 5
+
+Starts a stub CoinGecko and the signal service in-process (stores and caches go to a
+temporary directory), fires concurrent /signal and /candles requests, and reports
+latency percentiles, how many requests were deduplicated and how many upstream calls hit
+the stub.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import numpy as np
+from aiohttp import ClientSession
+
+import coingecko_client
+from benchmarks.stub_coingecko import StubCoinGecko, serve, use_stub
+from signal_service import SignalService
+
+
+async def _load(base_url, paths, concurrency):
+    latencies = []
+    statuses = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with ClientSession() as session:
+        async def one(path):
+            async with semaphore:
+                start = time.perf_counter()
+                async with session.get(base_url + path) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(path) for path in paths))
+        return time.perf_counter() - start, np.array(latencies), statuses
+
+
+async def run(requests, concurrency, coins, intervals, workers, latency):
+    stub = StubCoinGecko(latency)
+    stub_runner, stub_port = await serve(stub.app(), 0)
+    use_stub(stub_port, prefix="service-load-")
+
+    service = SignalService(workers)
+    service_runner, service_port = await serve(service.app(), 0)
+
+    coin_ids = [f"coin-{i}" for i in range(coins)]
+    rng = np.random.default_rng(0)
+    paths = [f"/{rng.choice(['signal', 'candles'])}/{rng.choice(coin_ids)}/{rng.choice(intervals)}"
+             for _ in range(requests)]
+    try:
+        wall, latencies, statuses = await _load(f"http://127.0.0.1:{service_port}", paths, concurrency)
+    finally:
+        await service_runner.cleanup()
+        await stub_runner.cleanup()
+        coingecko_client._shared.close()
+
+    print(f"{requests} requests ({concurrency} concurrent) over {coins} coins x {len(intervals)} intervals "
+          f"in {wall:.2f}s -> {requests / wall:.1f} req/s")
+    print(f"latency ms: p50 {np.percentile(latencies, 50):.1f}  p95 {np.percentile(latencies, 95):.1f}  "
+          f"max {latencies.max():.1f}")
+    print(f"status codes: {dict(statuses)}")
+    print(f"service: {service.stats}")
+    print(f"upstream calls: {dict(stub.calls)}")
+    return statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--coins", type=int, default=3)
+    parser.add_argument("--intervals", nargs="+", default=["15m", "1h", "4h"])
+    parser.add_argument("--workers", type=int, default=4, help="service compute threads")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="seconds the stub waits per call")
+    args = parser.parse_args(argv)
+    statuses = asyncio.run(run(args.requests, args.concurrency, args.coins, args.intervals, args.workers,
+                               args.stub_latency))
+    return 0 if set(statuses) == {200} else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""Cold-start and rerun latency of the Streamlit app, offline.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5
+
+Import cost is measured in fresh interpreters for the modules the page loads up front and
+the ones only the prediction path needs. When Streamlit is installed, 0_Home.py is also run
+headless (streamlit.testing AppTest) against a stub CoinGecko: first run, rerun, first
+prediction and a repeated prediction.
+"""
+import argparse
+import ast
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def page_imports(path=os.path.join(ROOT, "0_Home.py")):
+    """(modules 0_Home.py imports on every run, modules it imports only inside functions), read
+    from its source so the lists follow the page; streamlit itself is left out."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    top_level = {id(node) for node in tree.body}
+    page, deferred = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            if name.split(".")[0] != "streamlit" and name not in page and name not in deferred:
+                (page if id(node) in top_level else deferred).append(name)
+    return page, deferred
+
+
+PAGE_MODULES, PREDICTION_MODULES = page_imports()
+
+
+def cold_import_ms(modules, repeat):
+    """Best wall time to import `modules` in a fresh interpreter, in ms."""
+    code = ("import time; start = time.perf_counter()\n"
+            + "".join(f"import {m}\n" for m in modules)
+            + "print((time.perf_counter() - start) * 1000)")
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+                             env={**os.environ, "PYTHONPATH": ROOT})
+        runs.append(float(out.stdout.strip()))
+    return min(runs)
+
+
+def _start_stub():
+    from benchmarks.stub_coingecko import StubCoinGecko, serve, use_stub
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="stub-coingecko", daemon=True).start()
+    _, port = asyncio.run_coroutine_threadsafe(serve(StubCoinGecko(latency=0.05).app(), 0), loop).result()
+    use_stub(port, prefix="startup-")
+
+
+def _timed_run(app):
+    start = time.perf_counter()
+    app.run(timeout=120)
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return (time.perf_counter() - start) * 1000
+
+
+def app_runs(repeat):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+
+    os.chdir(ROOT)
+    _start_stub()
+    app = AppTest.from_file(os.path.join(ROOT, "0_Home.py"))
+    results = {"first run": _timed_run(app)}
+    results["rerun"] = min(_timed_run(app) for _ in range(repeat))
+    app.sidebar.button[0].click()
+    results["first prediction"] = _timed_run(app)
+    results["prediction rerun"] = min(_timed_run(app) for _ in range(repeat))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    page = cold_import_ms(PAGE_MODULES, args.repeat)
+    prediction = cold_import_ms(PAGE_MODULES + PREDICTION_MODULES, args.repeat)
+    print(f"{'page imports (cold)':<28} {page:10.1f} ms")
+    print(f"{'+ prediction imports (cold)':<28} {prediction:10.1f} ms")
+
+    runs = app_runs(args.repeat)
+    if runs is None:
+        print("streamlit is not installed; skipping the app runs")
+        return 0
+    for name, ms in runs.items():
+        print(f"{name:<28} {ms:10.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
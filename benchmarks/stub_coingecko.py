@@ -0,0 +1,117 @@
+"""Offline stand-in for the CoinGecko API, for benchmarks and load tests."""
+import asyncio
+import math
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+from aiohttp import web
+
+import cache
+import coingecko_client
+import config
+import data_fetcher
+from candle_store import CandleStore
+
+HOUR_MS = 3_600_000
+FIVE_MINUTES_MS = 300_000
+
+
+class StubCoinGecko:
+    """Serves deterministic coin lists, charts and prices for any coin id and counts the calls."""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = Counter()
+
+    @staticmethod
+    def _price(coin_id, times):
+        seed = sum(map(ord, coin_id))
+        t = np.asarray(times, dtype=float) / HOUR_MS
+        return 50 + seed % 100 + 5 * np.sin(t / 7 + seed) + 2 * np.sin(t / 1.3)
+
+    def _chart(self, coin_id, start_ms, end_ms):
+        # Like CoinGecko: 5-minute points for spans up to a day, hourly beyond that
+        step = FIVE_MINUTES_MS if end_ms - start_ms <= 24 * HOUR_MS else HOUR_MS
+        times = np.arange(math.ceil(start_ms / step) * step, end_ms + 1, step)
+        prices = self._price(coin_id, times)
+        return web.json_response({
+            'prices': [[int(t), float(p)] for t, p in zip(times, prices)],
+            'total_volumes': [[int(t), 1e9 + float(p) * 1e6] for t, p in zip(times, prices)],
+        })
+
+    async def market_chart(self, request):
+        self.calls['market_chart'] += 1
+        await asyncio.sleep(self.latency)
+        now = int(time.time() * 1000)
+        return self._chart(request.match_info['coin'], now - int(float(request.query['days']) * 24 * HOUR_MS), now)
+
+    async def market_chart_range(self, request):
+        self.calls['market_chart_range'] += 1
+        await asyncio.sleep(self.latency)
+        return self._chart(request.match_info['coin'], int(request.query['from']) * 1000, int(request.query['to']) * 1000)
+
+    async def coins_markets(self, request):
+        self.calls['coins_markets'] += 1
+        await asyncio.sleep(self.latency)
+        per_page = int(request.query.get('per_page', 100))
+        offset = (int(request.query.get('page', 1)) - 1) * per_page
+        now = int(time.time() * 1000)
+        coins = []
+        for rank in range(offset + 1, offset + per_page + 1):
+            coin_id = f"coin-{rank}"
+            price = float(self._price(coin_id, [now])[0])
+            coins.append({'id': coin_id, 'symbol': f"c{rank}", 'name': f"Coin {rank}", 'market_cap_rank': rank,
+                          'current_price': price, 'market_cap': 1e12 / rank, 'total_volume': 1e10 / rank,
+                          'price_change_percentage_24h': math.sin(rank + now / 3_600_000) * 10,
+                          'last_updated': time.strftime('%Y-%m-%dT%H:%M:00Z', time.gmtime(now / 1000))})
+        return web.json_response(coins)
+
+    async def price(self, request):
+        self.calls['simple_price'] += 1
+        await asyncio.sleep(self.latency)
+        vs = request.query.get('vs_currencies', 'usd')
+        now = int(time.time() * 1000)
+        return web.json_response({coin: {vs: float(self._price(coin, [now])[0])}
+                                  for coin in request.query['ids'].split(',')})
+
+    def app(self):
+        app = web.Application()
+        app.add_routes([
+            web.get('/coins/{coin}/market_chart', self.market_chart),
+            web.get('/coins/{coin}/market_chart/range', self.market_chart_range),
+            web.get('/coins/markets', self.coins_markets),
+            web.get('/simple/price', self.price),
+        ])
+        return app
+
+
+# Point the whole pipeline at a stub on `port` and at throwaway stores; returns their root
+def use_stub(port, prefix="stub-coingecko-"):
+    coingecko_client._shared = coingecko_client.SyncCoinGecko(
+        base_url=f"http://127.0.0.1:{port}", calls_per_minute=60_000, burst=100)
+    return use_temp_stores(prefix)
+
+
+# Point the candle store, cache and model store at a fresh temporary directory
+def use_temp_stores(prefix="stub-coingecko-"):
+    root = tempfile.mkdtemp(prefix=prefix)
+    data_fetcher.candle_store = CandleStore(f"{root}/candles")
+    cache._shared = cache.LayeredCache(root=f"{root}/cache")
+    # Don't import model_store (and scikit-learn) just for this; redirect its default if it isn't loaded yet
+    if 'model_store' in sys.modules:
+        model_store = sys.modules['model_store']
+        model_store._default_store = model_store.ModelStore(root=f"{root}/models")
+    else:
+        config.MODEL_STORE_DIR = f"{root}/models"
+    return root
+
+
+async def serve(app, port):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', port)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+
+# Deterministic OHLCV candles: a log-normal random walk with intrabar range and volume
+def make_candles(rows, seed=0, start="2024-01-01", freq="1min", price=100.0, volatility=0.002):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0, volatility, rows)
+    close = price * np.exp(np.cumsum(returns))
+    open_ = np.r_[price, close[:-1]]
+    wick = np.abs(rng.normal(0.0, volatility / 2, (2, rows))) * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+    # Volume rises with the size of the move, like real markets
+    volume = rng.lognormal(mean=3.0, sigma=0.5, size=rows) * (1 + 50 * np.abs(returns))
+
+    return pd.DataFrame({
+        "Time": pd.date_range(start, periods=rows, freq=freq),
+        "Open": open_,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": volume,
+    })
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from config import CACHE_DIR, CACHE_MAX_DISK_ENTRIES, CACHE_MAX_ENTRIES, CACHE_TTL
+
+
+class LayeredCache:
+    """Two-tier TTL/LRU cache: an in-process dict first, then pickles on disk shared by all workers.
+
+    Values are shared between callers in the same process, so treat them as read-only.
+    """
+
+    def __init__(self, root=CACHE_DIR, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES,
+                 max_disk_entries=CACHE_MAX_DISK_ENTRIES):
+        self.root = root
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, hashlib.sha1(repr(key).encode()).hexdigest() + ".pkl")
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry
+
+    def _set_memory(self, key, value, expires):
+        with self._lock:
+            self._memory[key] = (expires, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _get_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, expires, value = pickle.load(f)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            # A torn or foreign file is a miss; the next set() overwrites it
+            return None
+        if stored_key != key or expires < time.time():
+            return None
+        os.utime(path)  # mtime doubles as the disk tier's LRU clock
+        return expires, value
+
+    def _set_disk(self, key, value, expires):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((key, expires, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = [e for e in os.scandir(self.root) if e.name.endswith(".pkl")]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def get(self, key, default=None):
+        entry = self._get_memory(key)
+        if entry is None:
+            entry = self._get_disk(key)
+            if entry is None:
+                return default
+            self._set_memory(key, entry[1], entry[0])
+        return entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        self._set_memory(key, value, expires)
+        self._set_disk(key, value, expires)
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+
+_shared = None
+
+
+def get_cache():
+    """Process-wide cache instance."""
+    global _shared
+    if _shared is None:
+        _shared = LayeredCache()
+    return _shared
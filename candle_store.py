@@ -0,0 +1,75 @@
+import os
+import threading
+
+import numpy as np
+
+from config import CANDLE_STORE_DIR
+
+# One append-only binary file per column, so reads can memory-map and slice without copying
+COLUMNS = {'Time': np.int64, 'Close': np.float64, 'Volume': np.float64}
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class CandleStore:
+    """Local columnar store of raw CoinGecko candles, one directory per coin/interval."""
+
+    def __init__(self, root=CANDLE_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _dir(self, coin_id, interval):
+        return os.path.join(self.root, coin_id, interval)
+
+    def _column_path(self, coin_id, interval, column):
+        return os.path.join(self._dir(coin_id, interval), f"{column}.bin")
+
+    def _map(self, coin_id, interval):
+        columns = {}
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(coin_id, interval, name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size == 0:
+                return {n: np.empty(0, dtype=d) for n, d in COLUMNS.items()}
+            columns[name] = np.memmap(path, dtype=dtype, mode='r')
+        # Time is written last, so its length is the number of fully written rows
+        rows = min(len(col) for col in columns.values())
+        return {name: col[:rows] for name, col in columns.items()}
+
+    def last_timestamp(self, coin_id, interval):
+        times = self._map(coin_id, interval)['Time']
+        return int(times[-1]) if len(times) else None
+
+    def append(self, coin_id, interval, times, closes, volumes):
+        """Append rows newer than the last stored timestamp; returns the number written."""
+        times = np.asarray(times, dtype=np.int64)
+        with self._lock:
+            last = self.last_timestamp(coin_id, interval)
+            keep = times > last if last is not None else np.ones(len(times), dtype=bool)
+            if not keep.any():
+                return 0
+            os.makedirs(self._dir(coin_id, interval), exist_ok=True)
+            values = {'Close': closes, 'Volume': volumes, 'Time': times}
+            for name in ('Close', 'Volume', 'Time'):
+                column = np.asarray(values[name], dtype=COLUMNS[name])[keep]
+                with open(self._column_path(coin_id, interval, name), 'ab') as f:
+                    f.write(column.tobytes())
+            return int(keep.sum())
+
+    def read(self, coin_id, interval, start=None, end=None, limit=None):
+        """Zero-copy column slices for start <= Time < end (ms), optionally only the last `limit` rows."""
+        columns = self._map(coin_id, interval)
+        times = columns['Time']
+        lo = np.searchsorted(times, start, side='left') if start is not None else 0
+        hi = np.searchsorted(times, end, side='left') if end is not None else len(times)
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return {name: col[lo:hi] for name, col in columns.items()}
+
+    def days(self, coin_id, interval):
+        """Day partitions (UTC midnight, ms) present in the store and their row offsets."""
+        times = self._map(coin_id, interval)['Time']
+        if len(times) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        day_keys = times // DAY_MS * DAY_MS
+        starts = np.flatnonzero(np.r_[True, day_keys[1:] != day_keys[:-1]])
+        return day_keys[starts], starts
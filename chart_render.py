@@ -0,0 +1,148 @@
+import math
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from config import CHART_PX_PER_CANDLE, CHART_WIDTH_PX
+from explain_trade import BEARISH_CROSS, BOLLINGER_BREAKDOWN, BOLLINGER_BREAKOUT, BULLISH_CROSS
+
+# Indicator lines drawn over the candles: trace name -> (column, color)
+LINES = {'EMA 9': ('EMA_9', 'orange'), 'EMA 21': ('EMA_21', 'blue')}
+
+LAYOUT = dict(
+    template="plotly_dark",
+    xaxis_title="Time",
+    yaxis_title="Price",
+    margin=dict(l=20, r=20, t=30, b=20),
+    xaxis_rangeslider_visible=False,
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+)
+
+# Reason-code markers: (code, trace name, marker symbol, color, price column)
+MARKERS = [
+    (BULLISH_CROSS, 'Bullish Cross', 'triangle-up', 'lime', 'Low'),
+    (BEARISH_CROSS, 'Bearish Cross', 'triangle-down', 'red', 'High'),
+    (BOLLINGER_BREAKOUT, 'BB Breakout', 'star', 'gold', 'High'),
+    (BOLLINGER_BREAKDOWN, 'BB Breakdown', 'star', 'magenta', 'Low'),
+]
+
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points Largest-Triangle-Three-Buckets keeps from (x, y)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_line(x, y, threshold):
+    """LTTB over the non-NaN part of a series; returns the (x, y) to draw."""
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    keep = valid[lttb(np.asarray(x).astype('datetime64[ns]').astype(np.int64)[valid], y[valid], threshold)]
+    return np.asarray(x)[keep], y[keep]
+
+
+# Candles per bucket so that `n` candles fit in `max_candles`
+def bucket_size(n, max_candles):
+    return math.ceil(n / max_candles) if n > max_candles else 1
+
+
+def bucket_candles(df, max_candles):
+    """Merge consecutive candles into at most `max_candles` OHLC buckets (open first, high max,
+    low min, close last), aligned so the latest bucket ends on the latest candle."""
+    n = len(df)
+    size = bucket_size(n, max_candles)
+    if size == 1:
+        return df
+    starts = np.r_[0, np.arange(n % size or size, n, size)]
+    ends = np.r_[starts[1:], n] - 1
+    return df.iloc[starts][['Time']].assign(
+        Open=df['Open'].to_numpy()[starts],
+        High=np.maximum.reduceat(df['High'].to_numpy(), starts),
+        Low=np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        Close=df['Close'].to_numpy()[ends],
+    ).reset_index(drop=True)
+
+
+def build_figure(df, levels=(), codes=None, show_lines=True, x_range=None, width_px=CHART_WIDTH_PX):
+    """Candlestick chart sized to the plot's pixel width.
+
+    Candles are bucketed to about one per CHART_PX_PER_CANDLE pixels and indicator lines are
+    LTTB-downsampled to the width, so the payload stays flat however long the history is;
+    zooming (`x_range`) re-renders only that window at full detail. Constant `levels`
+    (dicts of y, name, color, dash, position) are drawn as shapes named after the level, not
+    traces. The bucket size is kept in `layout.meta` so live updates can bucket the same way.
+    An empty frame (or zoom window) gives an empty figure. Returns (figure, stats).
+    """
+    started = time.perf_counter()
+    if x_range is not None and not df.empty:
+        visible = ((df['Time'] >= x_range[0]) & (df['Time'] <= x_range[1])).to_numpy()
+        df = df[visible]
+        codes = None if codes is None else np.asarray(codes)[visible]
+
+    if df.empty:
+        fig = go.Figure(layout=LAYOUT)
+        return fig, {'bars': 0, 'points': 0, 'build_ms': (time.perf_counter() - started) * 1000}
+
+    max_candles = max(width_px // CHART_PX_PER_CANDLE, 10)
+    candles = bucket_candles(df, max_candles)
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(
+        x=candles['Time'],
+        open=candles['Open'],
+        high=candles['High'],
+        low=candles['Low'],
+        close=candles['Close'],
+        name="Candles"
+    ))
+    points = len(candles)
+
+    if show_lines:
+        for name, (column, color) in LINES.items():
+            if column in df.columns:
+                x, y = downsample_line(df['Time'], df[column], width_px)
+                fig.add_trace(go.Scatter(x=x, y=y, name=name, line=dict(color=color)))
+                points += len(x)
+        if codes is not None:
+            for bit, name, marker, color, price in MARKERS:
+                hits = df[(codes & bit) != 0]
+                if not hits.empty:
+                    fig.add_trace(go.Scatter(x=hits['Time'], y=hits[price], name=name, mode='markers',
+                                             marker=dict(symbol=marker, size=11, color=color)))
+                    points += len(hits)
+
+    for level in levels:
+        fig.add_hline(y=level['y'], name=level['name'], line_color=level.get('color'), line_dash=level.get('dash', 'dot'),
+                      annotation_text=level['name'], annotation_position=level.get('position', 'top left'))
+
+    fig.update_layout(LAYOUT, meta={'bucket': bucket_size(len(df), max_candles)})
+    stats = {
+        'bars': len(df),
+        'points': points,
+        'build_ms': (time.perf_counter() - started) * 1000,
+    }
+    return fig, stats
+
+
+# Serialized figure size, i.e. what is sent to the browser
+def payload_bytes(fig):
+    return len(fig.to_json())
@@ -0,0 +1,185 @@
+import asyncio
+import random
+import threading
+import time
+
+import aiohttp
+
+from config import (COINGECKO_BASE_URL, COINGECKO_BURST, COINGECKO_CALLS_PER_MINUTE, COINGECKO_MAX_RETRIES,
+                    COINGECKO_RECORD_PATH, COINGECKO_REPLAY_PATH, COINGECKO_REPLAY_SPEED)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CoinGeckoError(Exception):
+    """Raised when a CoinGecko request still fails after all retries."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CoinGeckoClient:
+    """Shared-session CoinGecko client with rate limiting, retry/backoff and request coalescing."""
+
+    def __init__(self, base_url=COINGECKO_BASE_URL, calls_per_minute=COINGECKO_CALLS_PER_MINUTE,
+                 burst=COINGECKO_BURST, max_retries=COINGECKO_MAX_RETRIES, backoff_base=1.0,
+                 backoff_cap=30.0, pool_size=20, timeout=15):
+        self.base_url = base_url.rstrip('/')
+        self.bucket = TokenBucket(calls_per_minute / 60.0, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+        self._inflight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        # Full jitter keeps retrying callers from synchronising on the same instant
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def _fetch(self, path, params):
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            retry_after = None
+            try:
+                async with self._get_session().get(url, params=params) as response:
+                    if response.status < 400:
+                        return await response.json()
+                    if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                        raise CoinGeckoError(f"{response.status} from {path}", status=response.status)
+                    retry_after = response.headers.get('Retry-After')
+            # Connection drops, timeouts, truncated payloads and non-JSON bodies (e.g. a proxy's HTML
+            # error page) are all treated as transient; ValueError covers json.JSONDecodeError
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                if attempt == self.max_retries:
+                    raise CoinGeckoError(f"{path} failed: {e!r}") from e
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    async def get(self, path, params=None):
+        """GET a JSON endpoint; concurrent identical requests share one in-flight call."""
+        params = {k: str(v).lower() if isinstance(v, bool) else str(v) for k, v in (params or {}).items()}
+        key = (path, tuple(sorted(params.items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(path, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def coins_markets(self, vs_currency='usd', order='market_cap_desc', per_page=100, page=1):
+        return await self.get('coins/markets', {
+            'vs_currency': vs_currency, 'order': order, 'per_page': per_page, 'page': page, 'sparkline': False
+        })
+
+    async def market_chart(self, coin_id, vs_currency='usd', days='1'):
+        return await self.get(f'coins/{coin_id}/market_chart', {'vs_currency': vs_currency, 'days': days})
+
+    async def market_chart_range(self, coin_id, vs_currency, from_timestamp, to_timestamp):
+        return await self.get(f'coins/{coin_id}/market_chart/range', {
+            'vs_currency': vs_currency, 'from': from_timestamp, 'to': to_timestamp
+        })
+
+    async def price(self, ids, vs_currencies='usd'):
+        ids = ids if isinstance(ids, str) else ','.join(ids)
+        return await self.get('simple/price', {'ids': ids, 'vs_currencies': vs_currencies})
+
+
+class SyncCoinGecko:
+    """Runs one CoinGeckoClient on a background event loop so synchronous code (Streamlit,
+    thread pools) shares its connection pool, rate limit and in-flight requests."""
+
+    def __init__(self, client_class=None, **client_kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="coingecko-loop", daemon=True)
+        self._thread.start()
+        self.client = self.run(self._make_client(client_class or CoinGeckoClient, client_kwargs))
+
+    @staticmethod
+    async def _make_client(client_class, kwargs):
+        return client_class(**kwargs)
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        self.run(self.client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def coins_markets(self, **kwargs):
+        return self.run(self.client.coins_markets(**kwargs))
+
+    def market_chart(self, coin_id, **kwargs):
+        return self.run(self.client.market_chart(coin_id, **kwargs))
+
+    def market_chart_range(self, coin_id, vs_currency, from_timestamp, to_timestamp):
+        return self.run(self.client.market_chart_range(coin_id, vs_currency, from_timestamp, to_timestamp))
+
+    def price(self, ids, vs_currencies='usd'):
+        return self.run(self.client.price(ids, vs_currencies))
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide synchronous CoinGecko client; records or replays responses when configured."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            if COINGECKO_REPLAY_PATH:
+                from recording import ReplayClient
+                _shared = SyncCoinGecko(ReplayClient, archive=COINGECKO_REPLAY_PATH, speed=COINGECKO_REPLAY_SPEED)
+            elif COINGECKO_RECORD_PATH:
+                from recording import RecordingClient
+                _shared = SyncCoinGecko(RecordingClient, archive=COINGECKO_RECORD_PATH)
+            else:
+                _shared = SyncCoinGecko()
+        return _shared
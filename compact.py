@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from indicators import EMA_FAST, EMA_SLOW, FIB_LEVELS, indicator_params
+
+PRICE_DTYPE = np.float32
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+INDICATOR_COLUMNS = ['SMA', 'MACD', 'ATR', 'Bollinger_Upper', 'Bollinger_Lower', 'VWAP',
+                     'EMA_9', 'EMA_21', 'Fibo_High', 'Fibo_Low']
+
+
+# True OHLCV bars of the sampled price path: each bar opens at the previous bar's close.
+# `rule` is a pandas offset (e.g. '1h'); None keeps one bar per point.
+def bars_from_points(times, close, volume, rule=None):
+    points = pd.DataFrame({'Close': close, 'Volume': volume}, index=pd.to_datetime(times, unit='ms'))
+    if rule is None:
+        bars = points.assign(High=points['Close'], Low=points['Close'])
+    else:
+        grouped = points.resample(rule, label='left', closed='left')
+        bars = pd.DataFrame({
+            'High': grouped['Close'].max(),
+            'Low': grouped['Close'].min(),
+            'Close': grouped['Close'].last(),
+            # total_volumes is CoinGecko's rolling 24h volume, a level rather than a flow, so take the bar-close value
+            'Volume': grouped['Volume'].last(),
+        }).dropna(subset=['Close'])
+        first = grouped['Close'].first().reindex(bars.index)
+    bars['Open'] = bars['Close'].shift(1)
+    bars['Open'] = bars['Open'].fillna(points['Close'].iloc[0] if rule is None else first)
+    bars['High'] = bars[['High', 'Open']].max(axis=1)
+    bars['Low'] = bars[['Low', 'Open']].min(axis=1)
+    bars = bars.rename_axis('Time').reset_index()
+    return bars[['Time', 'Open', 'High', 'Low', 'Close', 'Volume']]
+
+
+class CompactCandles:
+    """OHLCV held as contiguous float32 arrays with int64 millisecond timestamps."""
+
+    def __init__(self, time, open, high, low, close, volume):
+        self.time = np.ascontiguousarray(time, dtype=np.int64)
+        self.columns = {
+            name: np.ascontiguousarray(values, dtype=PRICE_DTYPE)
+            for name, values in zip(OHLCV, (open, high, low, close, volume))
+        }
+
+    @classmethod
+    def from_close_volume(cls, time, close, volume, rule=None):
+        """Bars from raw price/volume points, built exactly like the candle-store path (see bars_from_points)."""
+        return cls.from_frame(bars_from_points(time, close, volume, rule))
+
+    @classmethod
+    def from_frame(cls, df):
+        time = df['Time'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        return cls(time, *(df[c].to_numpy() for c in OHLCV))
+
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, name):
+        return self.time if name == 'Time' else self.columns[name]
+
+    @property
+    def nbytes(self):
+        return self.time.nbytes + sum(a.nbytes for a in self.columns.values())
+
+    def tail(self, n):
+        """The last `n` candles, copied so the longer arrays can be freed."""
+        rows = slice(max(len(self) - n, 0), None)
+        return CompactCandles(self.time[rows].copy(), *(self.columns[c][rows].copy() for c in OHLCV))
+
+    def to_frame(self, rows=slice(None)):
+        df = pd.DataFrame({'Time': pd.to_datetime(self.time[rows], unit='ms')})
+        for name in OHLCV:
+            df[name] = self.columns[name][rows]
+        return df
+
+
+class CompactIndicators:
+    """calculate_indicators output (with the same `params`) as float32 arrays; Fib_ levels are derived on access."""
+
+    def __init__(self, candles, params=None):
+        self.candles = candles
+        p = indicator_params(params)
+        close = pd.Series(candles['Close'], dtype=np.float64)
+        high = pd.Series(candles['High'], dtype=np.float64)
+        low = pd.Series(candles['Low'], dtype=np.float64)
+        volume = pd.Series(candles['Volume'], dtype=np.float64)
+
+        # Each column is computed in float64 and stored as float32, so only one wide temporary lives at a time
+        def keep(series):
+            return series.to_numpy(dtype=PRICE_DTYPE)
+
+        sma = close.rolling(window=p['sma'], min_periods=1).mean()
+        rolling_std = close.rolling(p['bollinger']).std()
+        self.columns = {
+            'SMA': keep(sma),
+            'MACD': keep(close.ewm(span=p['macd_fast'], adjust=False).mean()
+                         - close.ewm(span=p['macd_slow'], adjust=False).mean()),
+            'ATR': keep((high - low).rolling(p['atr']).mean()),
+            'Bollinger_Upper': keep(sma + 2 * rolling_std),
+            'Bollinger_Lower': keep(sma - 2 * rolling_std),
+            'VWAP': keep((close * volume).cumsum() / volume.cumsum()),
+            'EMA_9': keep(close.ewm(span=EMA_FAST, adjust=False).mean()),
+            'EMA_21': keep(close.ewm(span=EMA_SLOW, adjust=False).mean()),
+            'Fibo_High': keep(high.rolling(p['fibo_lookback']).max()),
+            'Fibo_Low': keep(low.rolling(p['fibo_lookback']).min()),
+        }
+
+    def __len__(self):
+        return len(self.candles)
+
+    def fib(self, level, rows=slice(None)):
+        fibo_high = self.columns['Fibo_High'][rows]
+        return fibo_high - (fibo_high - self.columns['Fibo_Low'][rows]) * PRICE_DTYPE(level)
+
+    def __getitem__(self, name):
+        if name.startswith('Fib_'):
+            return self.fib(float(name[4:]))
+        if name in self.columns:
+            return self.columns[name]
+        return self.candles[name]
+
+    @property
+    def nbytes(self):
+        return self.candles.nbytes + sum(a.nbytes for a in self.columns.values())
+
+    def to_frame(self, rows=slice(None), fib=True):
+        """Materialize a pandas frame (e.g. the charted tail) with calculate_indicators' columns."""
+        df = self.candles.to_frame(rows)
+        for name in INDICATOR_COLUMNS:
+            df[name] = self.columns[name][rows]
+        if fib:
+            for level in FIB_LEVELS:
+                df[f'Fib_{level}'] = self.fib(level, rows)
+        return df
+
+    def tail(self, n):
+        return self.to_frame(slice(max(len(self) - n, 0), None))
+
+
+# Bytes held by today's float64 frame vs the compact arrays for `rows` synthetic candles
+def memory_benchmark(rows=1_000_000, seed=0):
+    from indicators import calculate_indicators
+
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=rows))
+    time = np.arange(rows, dtype=np.int64) * 60_000
+    volume = rng.random(rows) * 1000
+    candles = CompactCandles.from_close_volume(time, close, volume)
+
+    df = calculate_indicators(candles.to_frame().astype({c: np.float64 for c in OHLCV}))
+    compact = CompactIndicators(candles)
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+    return {
+        'rows': rows,
+        'frame_bytes': frame_bytes,
+        'compact_bytes': compact.nbytes,
+        'ratio': frame_bytes / compact.nbytes,
+    }
+
+
+if __name__ == "__main__":
+    for size in (100_000, 1_000_000):
+        result = memory_benchmark(size)
+        print(f"{result['rows']:>9,} rows: pandas {result['frame_bytes'] / 1e6:8.1f} MB, "
+              f"compact {result['compact_bytes'] / 1e6:8.1f} MB ({result['ratio']:.1f}x smaller)")
@@ -1,6 +1,86 @@
 # config.py
+import os
 
 DEFAULT_SYMBOL = "BTC"
 DEFAULT_INTERVAL = "1h"
 DEFAULT_LIMIT = 100
+
+# Trained models are cached on disk and reused until this many new candles arrive
+MODEL_STORE_DIR = ".model_store"
+MODEL_STALE_CANDLES = 5
+# Force a model backend per interval ('random_forest', 'hist_gradient_boosting', 'logistic');
+# intervals not listed use the best recorded by `python model_backends.py`
+MODEL_BACKEND_BY_INTERVAL = {}
+# Online-learning mode: per-coin incremental learners, updated with every closed candle
+ONLINE_MODEL_DIR = os.path.join(MODEL_STORE_DIR, "online")
+ONLINE_LEARNING_RATE = 0.01
+
+# Raw CoinGecko candles are kept locally and only the missing tail is fetched
+CANDLE_STORE_DIR = ".candle_store"
+
+# CoinGecko client: point COINGECKO_BASE_URL at a local stub server for offline testing
+COINGECKO_BASE_URL = os.environ.get("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
+COINGECKO_CALLS_PER_MINUTE = 30
+COINGECKO_BURST = 5
+COINGECKO_MAX_RETRIES = 4
+# Record every CoinGecko response to a gzipped archive, or serve them back from one (see recording.py);
+# replay speed scales the recorded latencies, 0 serves without delay
+COINGECKO_RECORD_PATH = os.environ.get("COINGECKO_RECORD", "")
+COINGECKO_REPLAY_PATH = os.environ.get("COINGECKO_REPLAY", "")
+COINGECKO_REPLAY_SPEED = float(os.environ.get("COINGECKO_REPLAY_SPEED", "1"))
+
+# Higher timeframes whose indicators are added as model features for each base interval
+MTF_TIMEFRAMES = {
+    '1m': ['15m', '1h'],
+    '5m': ['1h', '4h'],
+    '15m': ['1h', '4h'],
+    '30m': ['4h', '1d'],
+    '1h': ['4h', '1d'],
+    '4h': ['1d'],
+    '1d': [],
+}
+
+# Layered result cache (memory, then disk shared between Streamlit workers)
+CACHE_DIR = ".cache"
+CACHE_TTL = 3600
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_DISK_ENTRIES = 2048
+
+# Live streaming: seconds between incremental candle polls
+LIVE_POLL_SECONDS = 10
+
+# Chart rendering: plot width in pixels and pixels per candle before candles are bucketed
+CHART_WIDTH_PX = 1200
+CHART_PX_PER_CANDLE = 4
+# Opt-in: load long chart histories as float32 arrays (compact.py), converting to pandas only for the chart
+COMPACT_HISTORY = os.environ.get("COMPACT_HISTORY", "") == "1"
+
+# Timing spans kept for the diagnostics panel
+PROFILE_BUFFER_SIZE = 2000
+
+# Universe scan: concurrent fetches, throttled by the client's rate limiter
+SCAN_FETCH_WORKERS = 8
+
+# Market screener: how many coins by market cap it covers, how often it refreshes, and the
+# half-life of the per-coin volume baseline that volume spikes are measured against
+SCREENER_SIZE = 1000
+SCREENER_REFRESH_SECONDS = 300
+SCREENER_VOLUME_HALFLIFE_HOURS = 24
+
+# Parameter search results; the best config per coin/interval is used for indicators and training
+SEARCH_DB_PATH = os.path.join(".search", "results.sqlite")
+
+# Warm-up at server start: (coin id, interval) pairs whose candles and models are prefetched
+WARMUP_PAIRS = [("bitcoin", "1h")]
+
+# Headless signal service (`python signal_service.py`); set SIGNAL_SERVICE_URL to make the UI a thin client
+SIGNAL_SERVICE_HOST = "127.0.0.1"
+SIGNAL_SERVICE_PORT = 8765
+SIGNAL_SERVICE_WORKERS = 4
+SIGNAL_SERVICE_URL = os.environ.get("SIGNAL_SERVICE_URL", "")
+
+# Price-level alerts: a level re-fires only after the debounce window; set ALERT_WEBHOOK_URL to post alerts
+ALERT_DEBOUNCE_SECONDS = 300
+ALERT_LOG_PATH = os.path.join(".alerts", "alerts.jsonl")
+ALERT_WEBHOOK_URL = os.environ.get("ALERT_WEBHOOK_URL", "")
 # config.py
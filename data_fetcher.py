@@ -1,65 +1,215 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-from datetime import datetime
-from pycoingecko import CoinGeckoAPI
-import requests
 
-cg = CoinGeckoAPI()
+from cache import get_cache
+from candle_store import CandleStore, DAY_MS
+from compact import CompactCandles, bars_from_points
+from coingecko_client import CoinGeckoError, get_client
+from profiling import timed
+
+# --- FETCH TOP N COINS ---
+# CoinGecko serves at most 250 coins per page; the pages are fetched concurrently and the
+# shared client rate-limits them. Returns [] if any page fails, so callers never see gaps.
+MARKETS_PAGE_SIZE = 250
+
+def fetch_top_coins(n, vs_currency='usd'):
+    if n < 1:
+        return []
+    per_page = min(n, MARKETS_PAGE_SIZE)
+    pages = range(1, math.ceil(n / per_page) + 1)
+
+    def fetch_page(page):
+        return get_client().coins_markets(vs_currency=vs_currency, order='market_cap_desc', per_page=per_page, page=page)
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(pages)) as pool:
+            coins = [coin for page in pool.map(fetch_page, pages) for coin in page]
+    except CoinGeckoError as e:
+        print(f"Error fetching top {n} coins: {e}")
+        return []
+    return coins[:n]
 
 # --- FETCH TOP 100 COINS ---
+# Kept in the shared cache for an hour so warm-up and every worker reuse one fetch
+TOP_COINS_TTL = 3600
+
 def fetch_top_100_coins(vs_currency='usd'):
-    url = 'https://api.coingecko.com/api/v3/coins/markets'
-    params = {
-        'vs_currency': vs_currency,
-        'order': 'market_cap_desc',
-        'per_page': 100,
-        'page': 1,
-        'sparkline': False
-    }
+    key = ("top_100_coins", vs_currency)
+    coins = get_cache().get(key)
+    if coins is not None:
+        return coins
+    coins = fetch_top_coins(100, vs_currency)
+    if coins:
+        get_cache().set(key, coins, ttl=TOP_COINS_TTL)
+    return coins
+
+# --- LIVE PRICE ---
+def fetch_live_price(coin_id, vs_currency='usd'):
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching top 100 coins: {e}")
-        return []
+        return get_client().price(coin_id, vs_currencies=vs_currency)[coin_id][vs_currency]
+    except (CoinGeckoError, KeyError):
+        return None
+
+# One simple/price request for many coins; returns {coin_id: price} for the coins that have one
+def fetch_live_prices(coin_ids, vs_currency='usd'):
+    try:
+        quotes = get_client().price(list(coin_ids), vs_currencies=vs_currency)
+    except CoinGeckoError as e:
+        print(f"Error fetching live prices: {e}")
+        return {}
+    return {coin_id: quote[vs_currency] for coin_id, quote in quotes.items() if vs_currency in quote}
+
+# --- HISTORICAL DATA ---
+# Every timeframe is resampled locally from one base series of CoinGecko points per coin:
+# hourly points for older history, 5-minute points (CoinGecko's finest) for the latest day
+# and everything fetched incrementally after that.
+BASE_INTERVAL = 'base'
+BASE_HISTORY_DAYS = 90
+BASE_SPACING_MS = 5 * 60 * 1000
+BASE_POLL_MS = 60 * 1000
+INTERVAL_RULES = {
+    '1m': None,  # finer than the base series; one bar per base point
+    '5m': '5min',
+    '15m': '15min',
+    '30m': '30min',
+    '1h': '1h',
+    '4h': '4h',
+    '1d': '1D'
+}
+
+candle_store = CandleStore()
+_resampled = {}
+_last_checked = {}
+
+
+# Keep only points at least one base step apart, so overlapping or denser responses
+# don't densify the base series
+def _thin_points(times, last_time, spacing):
+    keep = []
+    previous = last_time
+    for i, t in enumerate(times):
+        if previous is None or t - previous >= spacing * 0.9:
+            keep.append(i)
+            previous = t
+    return keep
+
+
+def _append_points(key, data):
+    prices = data.get('prices', [])
+    volumes = data.get('total_volumes', [])
+    if not prices or not volumes:
+        return
+    times = [int(p[0]) for p in prices]
+    keep = _thin_points(times, candle_store.last_timestamp(key, BASE_INTERVAL), BASE_SPACING_MS)
+    candle_store.append(
+        key, BASE_INTERVAL,
+        [times[i] for i in keep],
+        [prices[i][1] for i in keep],
+        [volumes[i][1] for i in keep],
+    )
+
+
+@timed('fetch_network')
+def _update_store(coin_id, vs_currency):
+    key = f"{coin_id}-{vs_currency}"
+    last = candle_store.last_timestamp(key, BASE_INTERVAL)
+    now_ms = int(time.time() * 1000)
+
+    if last is None:
+        # Hourly history first, then the last day at 5-minute resolution
+        history_start = (now_ms - BASE_HISTORY_DAYS * DAY_MS) // 1000
+        _append_points(key, get_client().market_chart_range(coin_id, vs_currency, history_start, (now_ms - DAY_MS) // 1000))
+        _append_points(key, get_client().market_chart(coin_id, vs_currency=vs_currency, days='1'))
+    elif now_ms - last >= BASE_SPACING_MS and now_ms - _last_checked.get(key, 0) >= BASE_POLL_MS:
+        # Throttled, since CoinGecko may not have published the next point yet
+        _last_checked[key] = now_ms
+        _append_points(key, get_client().market_chart_range(coin_id, vs_currency, last // 1000 + 1, now_ms // 1000))
+
+
+# Bars for `interval` from the base series, cached per (coin, interval) until a new base point lands
+def resample_candles(coin_id, interval, limit, vs_currency='usd'):
+    if interval not in INTERVAL_RULES:
+        raise ValueError(f"Unsupported interval: {interval}")
+    key = f"{coin_id}-{vs_currency}"
+    last = candle_store.last_timestamp(key, BASE_INTERVAL)
+    if last is None:
+        return pd.DataFrame()
+
+    cache_key = (key, interval)
+    cached = _resampled.get(cache_key)
+    if cached is not None and cached[0] == last and cached[1] >= limit:
+        return cached[2].tail(limit).reset_index(drop=True)
+
+    columns = _read_base(key, interval, limit, last)
+    bars = bars_from_points(columns['Time'], columns['Close'], columns['Volume'], INTERVAL_RULES[interval])
+    _resampled[cache_key] = (last, limit, bars)
+    return bars.tail(limit).reset_index(drop=True)
+
+
+# Base points covering the latest `limit` bars of `interval`
+def _read_base(key, interval, limit, last):
+    rule = INTERVAL_RULES[interval]
+    if rule is None:
+        return candle_store.read(key, BASE_INTERVAL, limit=limit + 1)
+    # One extra bar so the first returned bar opens at a real previous close
+    bar_ms = int(pd.Timedelta(rule).total_seconds() * 1000)
+    return candle_store.read(key, BASE_INTERVAL, start=(last // bar_ms - limit) * bar_ms)
+
 
 # --- FETCH HISTORICAL DATA FOR A GIVEN COIN ---
+@timed()
 def fetch_crypto_data(coin_id='bitcoin', interval='1h', limit=100, vs_currency='usd'):
     try:
-        interval_map = {
-            '1m': '1',
-            '5m': '1',
-            '15m': '1',
-            '30m': '1',
-            '1h': '7',
-            '4h': '14',
-            '1d': '30'
-        }
-
-        if interval not in interval_map:
+        if interval not in INTERVAL_RULES:
             raise ValueError(f"Unsupported interval: {interval}")
+        _update_store(coin_id, vs_currency)
+        return resample_candles(coin_id, interval, limit, vs_currency)
 
-        days = interval_map[interval]
-        data = cg.get_coin_market_chart_by_id(id=coin_id, vs_currency=vs_currency, days=days)
+    except Exception as e:
+        print("❌ Error fetching data from CoinGecko:", e)
+        return pd.DataFrame()
 
-        prices = data.get('prices', [])
-        volumes = data.get('total_volumes', [])
 
-        if not prices or not volumes:
-            return pd.DataFrame()
+# --- COMPACT (float32) HISTORY FOR LONG WINDOWS ---
+# Built straight from the store's base points, skipping the float64 frame and its resample cache entry
+def fetch_compact_data(coin_id='bitcoin', interval='1h', limit=100, vs_currency='usd'):
+    try:
+        if interval not in INTERVAL_RULES:
+            raise ValueError(f"Unsupported interval: {interval}")
+        _update_store(coin_id, vs_currency)
+        key = f"{coin_id}-{vs_currency}"
+        last = candle_store.last_timestamp(key, BASE_INTERVAL)
+        if last is None:
+            return CompactCandles(*([],) * 6)
+        columns = _read_base(key, interval, limit, last)
+        return CompactCandles.from_close_volume(columns['Time'], columns['Close'], columns['Volume'],
+                                                INTERVAL_RULES[interval]).tail(limit)
+
+    except Exception as e:
+        print("❌ Error fetching data from CoinGecko:", e)
+        return CompactCandles(*([],) * 6)
 
-        df = pd.DataFrame(prices, columns=["Time", "Close"])
-        df["Volume"] = [v[1] for v in volumes]
-        df["Time"] = pd.to_datetime(df["Time"], unit='ms')
-        df["Close"] = df["Close"].astype(float)
-        df["Volume"] = df["Volume"].astype(float)
 
-        df["Open"] = df["Close"].shift(1).fillna(method='bfill')
-        df["High"] = df["Close"].rolling(window=3, min_periods=1).max()
-        df["Low"] = df["Close"].rolling(window=3, min_periods=1).min()
+# --- NEW CLOSED CANDLES SINCE A TIMESTAMP (live streaming) ---
+def fetch_candles_since(coin_id, interval, since, vs_currency='usd'):
+    try:
+        if interval not in INTERVAL_RULES:
+            raise ValueError(f"Unsupported interval: {interval}")
+        _update_store(coin_id, vs_currency)
 
-        df = df.dropna().tail(limit).reset_index(drop=True)
-        return df[["Time", "Open", "High", "Low", "Close", "Volume"]]
+        rule = INTERVAL_RULES[interval]
+        bar = pd.Timedelta(rule) if rule else pd.Timedelta(milliseconds=BASE_SPACING_MS)
+        since = pd.Timestamp(since)
+        # Enough bars to reach back past `since`, plus the one whose close opens the first new bar
+        limit = max(int((pd.Timestamp.now(tz='UTC').tz_localize(None) - since) / bar) + 2, 2)
+        bars = resample_candles(coin_id, interval, limit, vs_currency)
+        # A resampled last bar is still forming; base points (no rule) are each already closed
+        if rule:
+            bars = bars.iloc[:-1]
+        return bars[bars['Time'] > since].reset_index(drop=True)
 
     except Exception as e:
         print("❌ Error fetching data from CoinGecko:", e)
@@ -1,40 +1,115 @@
-def explain_trade(df, prediction, confidence):
+import numpy as np
+import pandas as pd
+
+# Per-bar reason codes, one bit each, so a whole history fits in one small integer column
+BULLISH_CROSS = 1 << 0
+BEARISH_CROSS = 1 << 1
+MACD_BULLISH = 1 << 2
+BOLLINGER_BREAKOUT = 1 << 3
+BOLLINGER_BREAKDOWN = 1 << 4
+ABOVE_VWAP = 1 << 5
+NEAR_SUPPORT = 1 << 6
+NEAR_RESISTANCE = 1 << 7
+
+REASONS = {
+    'bullish_cross': BULLISH_CROSS,
+    'bearish_cross': BEARISH_CROSS,
+    'macd_bullish': MACD_BULLISH,
+    'bollinger_breakout': BOLLINGER_BREAKOUT,
+    'bollinger_breakdown': BOLLINGER_BREAKDOWN,
+    'above_vwap': ABOVE_VWAP,
+    'near_support': NEAR_SUPPORT,
+    'near_resistance': NEAR_RESISTANCE,
+}
+
+# Relative distance from a level that counts as "near" it
+NEAR_LEVEL_TOLERANCE = 0.01
+
+
+def _levels(df, levels, column):
+    if levels is None:
+        return df[column].to_numpy(dtype=float) if column in df.columns else None
+    return np.broadcast_to(np.asarray(levels, dtype=float), len(df))
+
+
+def reason_codes(df, support=None, resistance=None, tolerance=NEAR_LEVEL_TOLERANCE):
+    """Reason bitmask for every bar of an indicator frame, as a uint16 array.
+
+    `support`/`resistance` may be scalars or per-bar arrays; by default the frame's
+    Support/Resistance columns are used when present.
+    """
+    close = df['Close'].to_numpy(dtype=float)
+    ema_fast = df['EMA_9'].to_numpy(dtype=float)
+    ema_slow = df['EMA_21'].to_numpy(dtype=float)
+    prev_fast = np.r_[np.nan, ema_fast[:-1]]
+    prev_slow = np.r_[np.nan, ema_slow[:-1]]
+
+    codes = np.zeros(len(df), dtype=np.uint16)
+    codes |= np.where((ema_fast > ema_slow) & (prev_fast < prev_slow), BULLISH_CROSS, 0).astype(np.uint16)
+    codes |= np.where((ema_fast < ema_slow) & (prev_fast > prev_slow), BEARISH_CROSS, 0).astype(np.uint16)
+    codes |= np.where(df['MACD'].to_numpy(dtype=float) > 0, MACD_BULLISH, 0).astype(np.uint16)
+    codes |= np.where(close > df['Bollinger_Upper'].to_numpy(dtype=float), BOLLINGER_BREAKOUT, 0).astype(np.uint16)
+    codes |= np.where(close < df['Bollinger_Lower'].to_numpy(dtype=float), BOLLINGER_BREAKDOWN, 0).astype(np.uint16)
+    codes |= np.where(close > df['VWAP'].to_numpy(dtype=float), ABOVE_VWAP, 0).astype(np.uint16)
+
+    support = _levels(df, support, 'Support')
+    resistance = _levels(df, resistance, 'Resistance')
+    if support is not None and resistance is not None:
+        near_support = np.abs(close - support) / close < tolerance
+        near_resistance = ~near_support & (np.abs(close - resistance) / close < tolerance)
+        codes |= np.where(near_support, NEAR_SUPPORT, 0).astype(np.uint16)
+        codes |= np.where(near_resistance, NEAR_RESISTANCE, 0).astype(np.uint16)
+    return codes
+
+
+def reason_flags(codes, index=None):
+    """One boolean column per reason, e.g. for grouping backtest trades."""
+    codes = np.asarray(codes)
+    return pd.DataFrame({name: (codes & bit) != 0 for name, bit in REASONS.items()}, index=index)
+
+
+def format_reasons(df, codes, i, confidence=None, support=None, resistance=None):
+    """Markdown lines for bar `i` (positional) of a frame and its reason codes."""
+    row = df.iloc[i]
+    code = int(codes[i])
     explanation = []
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
 
     # Confidence
-    explanation.append(f"Model confidence: **{confidence*100:.2f}%**")
+    if confidence is not None:
+        explanation.append(f"Model confidence: **{confidence*100:.2f}%**")
 
     # EMA Crossover
-    if last['EMA_9'] > last['EMA_21'] and prev['EMA_9'] < prev['EMA_21']:
+    if code & BULLISH_CROSS:
         explanation.append("📈 **Bullish EMA Crossover** detected (EMA 9 crossed above EMA 21)")
-    elif last['EMA_9'] < last['EMA_21'] and prev['EMA_9'] > prev['EMA_21']:
+    elif code & BEARISH_CROSS:
         explanation.append("📉 **Bearish EMA Crossover** detected (EMA 9 crossed below EMA 21)")
 
     # MACD
-    explanation.append(f"MACD value: `{last['MACD']:.4f}` - " +
-        ("Bullish" if last['MACD'] > 0 else "Bearish"))
+    explanation.append(f"MACD value: `{row['MACD']:.4f}` - " +
+        ("Bullish" if code & MACD_BULLISH else "Bearish"))
 
     # Bollinger Bands
-    if last['Close'] > last['Bollinger_Upper']:
+    if code & BOLLINGER_BREAKOUT:
         explanation.append("🚀 Price broke **above** upper Bollinger Band → possible breakout")
-    elif last['Close'] < last['Bollinger_Lower']:
+    elif code & BOLLINGER_BREAKDOWN:
         explanation.append("⚠️ Price fell **below** lower Bollinger Band → possible breakdown")
 
     # VWAP position
-    if last['Close'] > last['VWAP']:
+    if code & ABOVE_VWAP:
         explanation.append("💡 Price is **above VWAP** (bullish)")
     else:
         explanation.append("🔻 Price is **below VWAP** (bearish)")
 
     # Support/Resistance
-    if 'Support' in df.columns and 'Resistance' in df.columns:
-        support = last['Support']
-        resistance = last['Resistance']
-        if abs(last['Close'] - support) / last['Close'] < 0.01:
-            explanation.append(f"🛡️ Price is **near support** (${support:.2f})")
-        elif abs(last['Close'] - resistance) / last['Close'] < 0.01:
-            explanation.append(f"🔼 Price is **near resistance** (${resistance:.2f})")
+    if code & NEAR_SUPPORT:
+        explanation.append(f"🛡️ Price is **near support** (${_levels(df, support, 'Support')[i]:.2f})")
+    elif code & NEAR_RESISTANCE:
+        explanation.append(f"🔼 Price is **near resistance** (${_levels(df, resistance, 'Resistance')[i]:.2f})")
 
     return explanation
+
+
+# Explanation for the latest bar; only the last two rows are needed for the crossover check
+def explain_trade(df, prediction, confidence):
+    tail = df.iloc[-2:]
+    return format_reasons(tail, reason_codes(tail), -1, confidence)
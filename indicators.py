@@ -1,20 +1,48 @@
+import math
+from collections import deque
+
 import pandas as pd
 
-def calculate_indicators(df):
+from profiling import timed
+
+SMA_WINDOW = 5
+MACD_FAST, MACD_SLOW = 8, 21
+ATR_WINDOW = 7
+BOLLINGER_WINDOW = 5
+EMA_FAST, EMA_SLOW = 9, 21
+FIBO_LOOKBACK = 50
+FIB_LEVELS = [0.236, 0.382, 0.5, 0.618, 0.786]
+
+# Tunable windows (see search.py); calculate_indicators and IndicatorState accept overrides of any of them
+INDICATOR_PARAMS = {
+    'sma': SMA_WINDOW,
+    'macd_fast': MACD_FAST,
+    'macd_slow': MACD_SLOW,
+    'atr': ATR_WINDOW,
+    'bollinger': BOLLINGER_WINDOW,
+    'fibo_lookback': FIBO_LOOKBACK,
+}
+
+def indicator_params(params=None):
+    return {**INDICATOR_PARAMS, **(params or {})}
+
+@timed()
+def calculate_indicators(df, params=None):
     if df.empty:
         return df
+    p = indicator_params(params)
 
     # Faster SMA
-    df['SMA'] = df['Close'].rolling(window=5, min_periods=1).mean()
+    df['SMA'] = df['Close'].rolling(window=p['sma'], min_periods=1).mean()
 
     # Faster MACD (shorten fast EMA)
-    df['MACD'] = df['Close'].ewm(span=8, adjust=False).mean() - df['Close'].ewm(span=21, adjust=False).mean()
+    df['MACD'] = df['Close'].ewm(span=p['macd_fast'], adjust=False).mean() - df['Close'].ewm(span=p['macd_slow'], adjust=False).mean()
 
     # ATR with shorter window
-    df['ATR'] = (df['High'] - df['Low']).rolling(7).mean()
+    df['ATR'] = (df['High'] - df['Low']).rolling(p['atr']).mean()
 
     # Bollinger Bands
-    rolling_std = df['Close'].rolling(5).std()
+    rolling_std = df['Close'].rolling(p['bollinger']).std()
     df['Bollinger_Upper'] = df['SMA'] + (2 * rolling_std)
     df['Bollinger_Lower'] = df['SMA'] - (2 * rolling_std)
 
@@ -22,18 +50,57 @@ def calculate_indicators(df):
     df['VWAP'] = (df['Close'] * df['Volume']).cumsum() / df['Volume'].cumsum()
 
     # EMA
-    df['EMA_9'] = df['Close'].ewm(span=9, adjust=False).mean()
-    df['EMA_21'] = df['Close'].ewm(span=21, adjust=False).mean()
+    df['EMA_9'] = df['Close'].ewm(span=EMA_FAST, adjust=False).mean()
+    df['EMA_21'] = df['Close'].ewm(span=EMA_SLOW, adjust=False).mean()
 
     # Fibonacci Levels
-    lookback = 50
-    df['Fibo_High'] = df['High'].rolling(lookback).max()
-    df['Fibo_Low'] = df['Low'].rolling(lookback).min()
-    for level in [0.236, 0.382, 0.5, 0.618, 0.786]:
+    df['Fibo_High'] = df['High'].rolling(p['fibo_lookback']).max()
+    df['Fibo_Low'] = df['Low'].rolling(p['fibo_lookback']).min()
+    for level in FIB_LEVELS:
         df[f'Fib_{level}'] = df['Fibo_High'] - ((df['Fibo_High'] - df['Fibo_Low']) * level)
 
     return df
 
+def calculate_indicators_panel(panel, by='Coin', params=None):
+    """calculate_indicators over a stacked (coin x time) frame in one grouped pass, with the same `params`."""
+    if panel.empty:
+        return panel
+    p = indicator_params(params)
+
+    keys = panel[by]
+
+    # Grouped rolling/ewm results come back indexed by (coin, row); drop the coin level to realign
+    def rolling(series, window, **kwargs):
+        return series.groupby(keys, sort=False).rolling(window, **kwargs)
+
+    def realign(result):
+        return result.reset_index(level=0, drop=True)
+
+    def ewm(span):
+        return realign(panel['Close'].groupby(keys, sort=False).ewm(span=span, adjust=False).mean())
+
+    panel['SMA'] = realign(rolling(panel['Close'], p['sma'], min_periods=1).mean())
+    panel['MACD'] = ewm(p['macd_fast']) - ewm(p['macd_slow'])
+    panel['ATR'] = realign(rolling(panel['High'] - panel['Low'], p['atr']).mean())
+
+    rolling_std = realign(rolling(panel['Close'], p['bollinger']).std())
+    panel['Bollinger_Upper'] = panel['SMA'] + (2 * rolling_std)
+    panel['Bollinger_Lower'] = panel['SMA'] - (2 * rolling_std)
+
+    pv = (panel['Close'] * panel['Volume']).groupby(keys, sort=False).cumsum()
+    panel['VWAP'] = pv / panel['Volume'].groupby(keys, sort=False).cumsum()
+
+    panel['EMA_9'] = ewm(EMA_FAST)
+    panel['EMA_21'] = ewm(EMA_SLOW)
+
+    panel['Fibo_High'] = realign(rolling(panel['High'], p['fibo_lookback']).max())
+    panel['Fibo_Low'] = realign(rolling(panel['Low'], p['fibo_lookback']).min())
+    for level in FIB_LEVELS:
+        panel[f'Fib_{level}'] = panel['Fibo_High'] - ((panel['Fibo_High'] - panel['Fibo_Low']) * level)
+
+    return panel
+
+@timed('support_resistance')
 def find_support_resistance(df, window=20):
     """Find recent support and resistance levels from the last N candles."""
     if df.empty or len(df) < window:
@@ -43,3 +110,122 @@ def find_support_resistance(df, window=20):
     support = recent['Low'].min()
     resistance = recent['High'].max()
     return support, resistance
+
+def fibonacci_levels(support, resistance):
+    """Fibonacci retracement prices between support and resistance, keyed 'Fib_<ratio>'."""
+    fib_range = resistance - support
+    return {f"Fib_{level}": support + fib_range * level for level in FIB_LEVELS}
+
+# Support, resistance and the Fibonacci retracements between them, as {name: price}
+def analysis_levels(support, resistance):
+    if support is None or resistance is None:
+        return {}
+    return {'Support': support, 'Resistance': resistance, **fibonacci_levels(support, resistance)}
+
+class IndicatorState:
+    """Running indicator state that updates in O(1) per candle, matching calculate_indicators."""
+
+    def __init__(self, params=None):
+        self.params = indicator_params(params)
+        self.count = 0
+        p = self.params
+        self.ema = {p['macd_fast']: None, p['macd_slow']: None, EMA_FAST: None, EMA_SLOW: None}
+        self.closes = deque(maxlen=max(p['sma'], p['bollinger']))
+        self.ranges = deque(maxlen=p['atr'])
+        self.pv_sum = 0.0
+        self.volume_sum = 0.0
+        # Monotonic deques of (candle index, value) for the Fibonacci lookback max/min
+        self.highs = deque()
+        self.lows = deque()
+
+    @classmethod
+    def from_frame(cls, df, params=None):
+        state = cls(params)
+        state.update_batch(df)
+        return state
+
+    def update(self, candle):
+        """Consume one candle (mapping with Open/High/Low/Close/Volume) and return its indicator row."""
+        close, high, low, volume = (float(candle[k]) for k in ('Close', 'High', 'Low', 'Volume'))
+        p = self.params
+        index = self.count
+        self.count += 1
+
+        for span, value in self.ema.items():
+            alpha = 2 / (span + 1)
+            self.ema[span] = close if value is None else value + alpha * (close - value)
+
+        self.closes.append(close)
+        self.ranges.append(high - low)
+        self.pv_sum += close * volume
+        self.volume_sum += volume
+
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((index, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((index, low))
+        oldest = index - p['fibo_lookback'] + 1
+        if self.highs[0][0] < oldest:
+            self.highs.popleft()
+        if self.lows[0][0] < oldest:
+            self.lows.popleft()
+
+        row = {k: candle[k] for k in candle.keys()}
+        sma_window = list(self.closes)[-p['sma']:]
+        row['SMA'] = sum(sma_window) / len(sma_window)
+        row['MACD'] = self.ema[p['macd_fast']] - self.ema[p['macd_slow']]
+        row['ATR'] = sum(self.ranges) / p['atr'] if len(self.ranges) == p['atr'] else math.nan
+
+        band_window = list(self.closes)[-p['bollinger']:]
+        if len(band_window) == p['bollinger']:
+            mean = sum(band_window) / p['bollinger']
+            std = math.sqrt(sum((c - mean) ** 2 for c in band_window) / (p['bollinger'] - 1))
+        else:
+            std = math.nan
+        row['Bollinger_Upper'] = row['SMA'] + (2 * std)
+        row['Bollinger_Lower'] = row['SMA'] - (2 * std)
+
+        row['VWAP'] = self.pv_sum / self.volume_sum if self.volume_sum else math.nan
+        row['EMA_9'] = self.ema[EMA_FAST]
+        row['EMA_21'] = self.ema[EMA_SLOW]
+
+        if self.count >= p['fibo_lookback']:
+            row['Fibo_High'], row['Fibo_Low'] = self.highs[0][1], self.lows[0][1]
+        else:
+            row['Fibo_High'] = row['Fibo_Low'] = math.nan
+        for level in FIB_LEVELS:
+            row[f'Fib_{level}'] = row['Fibo_High'] - ((row['Fibo_High'] - row['Fibo_Low']) * level)
+        return row
+
+    def update_batch(self, df):
+        """Consume a small batch of candles and return their indicator rows as a DataFrame."""
+        rows = [self.update(candle) for candle in df.to_dict('records')]
+        return pd.DataFrame(rows, index=df.index, columns=None if rows else df.columns)
+
+    def to_dict(self):
+        return {
+            'params': self.params,
+            'count': self.count,
+            'ema': {str(span): value for span, value in self.ema.items()},
+            'closes': list(self.closes),
+            'ranges': list(self.ranges),
+            'pv_sum': self.pv_sum,
+            'volume_sum': self.volume_sum,
+            'highs': [list(item) for item in self.highs],
+            'lows': [list(item) for item in self.lows],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data.get('params'))
+        state.count = data['count']
+        state.ema = {int(span): value for span, value in data['ema'].items()}
+        state.closes.extend(data['closes'])
+        state.ranges.extend(data['ranges'])
+        state.pv_sum = data['pv_sum']
+        state.volume_sum = data['volume_sum']
+        state.highs.extend(tuple(item) for item in data['highs'])
+        state.lows.extend(tuple(item) for item in data['lows'])
+        return state
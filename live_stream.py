@@ -0,0 +1,168 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+from config import LIVE_POLL_SECONDS
+from data_fetcher import fetch_candles_since, fetch_live_price
+from chart_render import LINES
+from indicators import IndicatorState, analysis_levels
+from model import FEATURES
+from mtf_features import add_mtf_features
+from online_model import get_online_model
+
+OHLCV = ['Time', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class LiveStream:
+    """Background poller that extends an indicator frame candle by candle and re-scores it.
+
+    `df` ends with the forming candle, as fetched. Each poll pulls only closed candles newer than
+    the last one seen, runs them through an IndicatorState, scores the new rows with the cached
+    model and queues a delta for the chart.
+    With `online`, the new candles first update the coin's online learner, which then scores them.
+    `levels` follows support, resistance and the Fibonacci levels over the last `sr_window` candles.
+    """
+
+    def __init__(self, coin_id, interval, df, model, scaler, features=FEATURES, poll_seconds=LIVE_POLL_SECONDS,
+                 indicator_params=None, online=False, sr_window=20):
+        self.coin_id = coin_id
+        self.interval = interval
+        self.model = model
+        self.scaler = scaler
+        self.features = features
+        self.online = online
+        self.poll_seconds = poll_seconds
+        self.indicator_params = indicator_params
+        # df's last candle is still forming; seed from the closed ones so its closed version is streamed
+        closed = df.iloc[:-1]
+        self.state = IndicatorState.from_frame(closed[OHLCV], indicator_params)
+        self.last_time = closed['Time'].iloc[-1]
+        self.lows = deque(closed['Low'].tail(sr_window), maxlen=sr_window)
+        self.highs = deque(closed['High'].tail(sr_window), maxlen=sr_window)
+        self.levels = self._levels()
+        self.deltas = queue.Queue()
+        self.latencies_ms = deque(maxlen=200)
+        self.latest = {'price': None, 'signal': None, 'confidence': None}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"live-{coin_id}-{interval}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def _levels(self):
+        if len(self.lows) < self.lows.maxlen:
+            return {}
+        return analysis_levels(min(self.lows), max(self.highs))
+
+    def _score(self, rows):
+        if self.model is None:
+            return [None] * len(rows), [None] * len(rows)
+        scaled = self.scaler.transform(rows[self.features].fillna(0))
+        proba = self.model.predict_proba(scaled)
+        labels = self.model.classes_[proba.argmax(axis=1)]
+        return ["Buy" if label == 1 else "Sell" for label in labels], proba.max(axis=1).tolist()
+
+    def poll(self):
+        """One fetch -> indicators -> score step; returns the queued delta or None."""
+        price = fetch_live_price(self.coin_id)
+        new = fetch_candles_since(self.coin_id, self.interval, self.last_time)
+        arrived = time.perf_counter()
+        if price is not None:
+            self.latest['price'] = price
+        if new.empty:
+            return None
+
+        rows = self.state.update_batch(new)
+        if self.features != FEATURES:
+            rows, _ = add_mtf_features(rows, self.coin_id, self.interval, params=self.indicator_params)
+        if self.online:
+            self.model, self.scaler = get_online_model(self.coin_id, self.interval, rows, self.features,
+                                                       forming=False)
+        signals, confidences = self._score(rows)
+        rows['Signal'] = signals
+        rows['Confidence'] = confidences
+        self.last_time = rows['Time'].iloc[-1]
+        self.lows.extend(rows['Low'])
+        self.highs.extend(rows['High'])
+        self.levels = self._levels()
+
+        latency_ms = (time.perf_counter() - arrived) * 1000
+        self.latencies_ms.append(latency_ms)
+        self.latest.update(signal=signals[-1], confidence=confidences[-1])
+        delta = {'rows': rows, 'latency_ms': latency_ms, 'arrived': arrived}
+        self.deltas.put(delta)
+        return delta
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print("❌ Live stream poll failed:", e)
+            self._stop.wait(self.poll_seconds)
+
+    def drain(self):
+        """All deltas queued since the last call, merged into one frame (or None)."""
+        frames = []
+        while True:
+            try:
+                frames.append(self.deltas.get_nowait()['rows'])
+            except queue.Empty:
+                break
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+
+# Extend the chart in place with new rows instead of rebuilding the figure. Rows are merged into
+# candle buckets of the size the figure was built with, the indicator lines get one point per
+# bucket, and the level shapes (and their labels) move to `levels`, {name: price}.
+def append_to_figure(fig, rows, levels=None):
+    meta = dict(fig.layout.meta or {})
+    size = meta.get('bucket', 1)
+    filled = meta.get('filled', size)
+    candles = next(trace for trace in fig.data if trace.type == 'candlestick')
+    x, open_, high, low, close = (list(values) for values in
+                                  (candles.x, candles.open, candles.high, candles.low, candles.close))
+    lines = {trace.name: (trace, list(trace.x), list(trace.y)) for trace in fig.data if trace.name in LINES}
+
+    for row in rows.to_dict('records'):
+        if filled < size:
+            # Same bucket: high max, low min, close last; the lines' last point moves to this row
+            high[-1], low[-1], close[-1] = max(high[-1], row['High']), min(low[-1], row['Low']), row['Close']
+            filled += 1
+            for name, (_, line_x, line_y) in lines.items():
+                line_x[-1], line_y[-1] = row['Time'], row[LINES[name][0]]
+        else:
+            x.append(row['Time'])
+            open_.append(row['Open'])
+            high.append(row['High'])
+            low.append(row['Low'])
+            close.append(row['Close'])
+            filled = 1
+            for name, (_, line_x, line_y) in lines.items():
+                line_x.append(row['Time'])
+                line_y.append(row[LINES[name][0]])
+
+    candles.update(x=x, open=open_, high=high, low=low, close=close)
+    for trace, line_x, line_y in lines.values():
+        trace.update(x=line_x, y=line_y)
+    fig.layout.meta = {**meta, 'bucket': size, 'filled': filled}
+
+    if levels:
+        for shape in fig.layout.shapes:
+            if shape.name in levels:
+                shape.update(y0=levels[shape.name], y1=levels[shape.name])
+        for annotation in fig.layout.annotations:
+            if annotation.text in levels:
+                annotation.y = levels[annotation.text]
+    return fig
@@ -1,59 +1,138 @@
+import time
+
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
+from profiling import timed
+
+FEATURES = ['SMA', 'MACD', 'ATR', 'VWAP', 'Bollinger_Upper', 'Bollinger_Lower', 'EMA_9', 'EMA_21']
+
+# Model backends train_model can fit; RandomForest trains on every core
+BACKENDS = {
+    'random_forest': lambda: RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1),
+    'hist_gradient_boosting': lambda: HistGradientBoostingClassifier(random_state=42),
+    'logistic': lambda: LogisticRegression(max_iter=1000),
+}
+DEFAULT_BACKEND = 'random_forest'
+# Fewest usable candles train_model fits on
+MIN_TRAIN_ROWS = 50
+
+# Rolling min/max over trailing windows of `size` along the last axis (van Herk/Gil-Werman, O(n))
+def _rolling_extreme(values, size, op):
+    n = values.shape[-1]
+    n_blocks = -(-n // size)
+    pad = n_blocks * size - n
+    fill = np.inf if op is np.minimum else -np.inf
+    padded = np.concatenate([values, np.full(values.shape[:-1] + (pad,), fill)], axis=-1)
+    blocks = padded.reshape(values.shape[:-1] + (n_blocks, size))
+    prefix = op.accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = op.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    # window [s, s + size - 1] -> suffix of its first block, prefix of its last block
+    return op(suffix[..., :n - size + 1], prefix[..., size - 1:n])
+
+# Merge sorted levels whose relative distance is within `tolerance` into their mean
+def _cluster_levels(levels, tolerance):
+    if tolerance <= 0 or len(levels) < 2:
+        return levels
+    levels = np.asarray(levels)
+    breaks = np.flatnonzero(np.diff(levels) / np.abs(levels[:-1]) > tolerance) + 1
+    return [float(group.mean()) for group in np.split(levels, breaks)]
+
+# Swing lows/highs for one series (1D) or many symbols at once (2D: symbols x time)
+def find_swing_points(low, high, window=20, tolerance=0.0):
+    low = np.asarray(low, dtype=float)
+    high = np.asarray(high, dtype=float)
+    single = low.ndim == 1
+    low, high = np.atleast_2d(low), np.atleast_2d(high)
+
+    n = low.shape[-1]
+    results = []
+    if n - window <= window:
+        results = [([], []) for _ in range(low.shape[0])]
+        return results[0] if single else results
+
+    # A candle is a swing point if it beats every candle within `window - 1` bars on both sides
+    k = window - 1
+    centre = slice(window, n - window)
+    if k == 0:
+        is_support = np.ones((low.shape[0], n - 2 * window), dtype=bool)
+        is_resistance = is_support
+    else:
+        low_min = _rolling_extreme(low, k, np.minimum)
+        high_max = _rolling_extreme(high, k, np.maximum)
+        is_support = (low[:, centre] < low_min[:, window - k:n - window - k]) & \
+                     (low[:, centre] < low_min[:, window + 1:n - window + 1])
+        is_resistance = (high[:, centre] > high_max[:, window - k:n - window - k]) & \
+                        (high[:, centre] > high_max[:, window + 1:n - window + 1])
+
+    for row in range(low.shape[0]):
+        support = np.unique(low[row, centre][is_support[row]]).tolist()
+        resistance = np.unique(high[row, centre][is_resistance[row]]).tolist()
+        results.append((_cluster_levels(support, tolerance), _cluster_levels(resistance, tolerance)))
+    return results[0] if single else results
+
 # Detect local support and resistance levels
-def find_support_resistance(df, window=20):
-    support = []
-    resistance = []
-    for i in range(window, len(df) - window):
-        is_support = all(df['Low'][i] < df['Low'][i - j] and df['Low'][i] < df['Low'][i + j] for j in range(1, window))
-        is_resistance = all(df['High'][i] > df['High'][i - j] and df['High'][i] > df['High'][i + j] for j in range(1, window))
-        if is_support:
-            support.append(df['Low'][i])
-        if is_resistance:
-            resistance.append(df['High'][i])
-    return sorted(set(support)), sorted(set(resistance))
+@timed('swing_points')
+def find_support_resistance(df, window=20, tolerance=0.0):
+    return find_swing_points(df['Low'].to_numpy(), df['High'].to_numpy(), window, tolerance)
 
 # Exponential Moving Average
 def calculate_ema(df, window=9):
     return df['Close'].ewm(span=window, adjust=False).mean()
 
+# Nearest level strictly below (support) or above (resistance) each price; NaN where none exists
+def nearest_levels(prices, levels, direction="support"):
+    levels = np.sort(np.asarray(levels, dtype=float))
+    prices = np.asarray(prices, dtype=float)
+    if len(levels) == 0:
+        return np.full(prices.shape, np.nan)
+    if direction == "support":
+        idx = np.searchsorted(levels, prices, side='left') - 1
+        found = idx >= 0
+    else:
+        idx = np.searchsorted(levels, prices, side='right')
+        found = idx < len(levels)
+    return np.where(found, levels[np.clip(idx, 0, len(levels) - 1)], np.nan)
+
 # Nearest level from current price
 def get_nearest_level(price, levels, direction="support"):
     if levels is None or not isinstance(levels, (list, np.ndarray)) or len(levels) == 0:
         return price  # fallback if levels list is empty or invalid
 
-    levels = sorted(levels)
-    if direction == "support":
-        levels_below = [lvl for lvl in levels if lvl < price]
-        return levels_below[-1] if levels_below else price
-    else:
-        levels_above = [lvl for lvl in levels if lvl > price]
-        return levels_above[0] if levels_above else price * 1.005  # fallback 0.5% higher
+    level = nearest_levels(price, levels, direction)
+    if np.isnan(level):
+        return price if direction == "support" else price * 1.005  # fallback 0.5% higher
+    return float(level)
 
-# Train the model
-def train_model(df):
-    if df.empty or len(df) < 50:
-        return None, None
+# Balanced, scaled train/test split used by train_model
+def _training_split(df, features=FEATURES):
+    if df.empty or len(df) < MIN_TRAIN_ROWS:
+        return None
 
-    df = df.dropna()
+    # Only the features and the label's source matter; a long unused window (e.g. the Fibonacci
+    # lookback) must not wipe out the frame
+    df = df.dropna(subset=[c for c in features if c in df.columns] + ['Close'])
+    if len(df) < MIN_TRAIN_ROWS:
+        return None
 
     # Indicators
     df['EMA_9'] = calculate_ema(df, 9)
     df['EMA_21'] = calculate_ema(df, 21)
 
-    features = ['SMA', 'MACD', 'ATR', 'VWAP', 'Bollinger_Upper', 'Bollinger_Lower', 'EMA_9', 'EMA_21']
     if not all(f in df.columns for f in features):
-        return None, None
+        return None
 
     # Target label
     df['Target'] = (df['Close'].shift(-1) > df['Close']).astype(int)
 
     # Balance dataset
     min_count = df['Target'].value_counts().min()
+    if df['Target'].nunique() < 2 or min_count < 2:
+        return None
     df_buy = df[df['Target'] == 1].sample(min_count, random_state=42)
     df_sell = df[df['Target'] == 0].sample(min_count, random_state=42)
     df_balanced = pd.concat([df_buy, df_sell]).sample(frac=1, random_state=42)
@@ -65,14 +144,94 @@ def train_model(df):
     X_scaled = scaler.fit_transform(X)
 
     X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+    return scaler, X_train, X_test, y_train, y_test
 
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
+def _fit(backend, X_train, y_train, params=None):
+    model = BACKENDS[backend]()
+    if params:
+        model.set_params(**params)
     model.fit(X_train, y_train)
+    # Parallel prediction only adds thread start-up cost for the few rows we score at a time
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=None)
+    return model
+
+# Train the model; `params` override the backend's estimator hyperparameters (e.g. from search.py)
+@timed()
+def train_model(df, backend=DEFAULT_BACKEND, features=FEATURES, params=None):
+    split = _training_split(df, features)
+    if split is None:
+        return None, None
+    scaler, X_train, X_test, y_train, y_test = split
+
+    model = _fit(backend, X_train, y_train, params)
 
     return model, scaler
 
+# Fast path for one feature row: scale with plain NumPy, skipping DataFrame construction and validation
+def predict_latest(model, scaler, row):
+    x = (np.nan_to_num(np.asarray(row, dtype=float)).reshape(1, -1) - scaler.mean_) / scaler.scale_
+    proba = model.predict_proba(x)[0]
+    best = proba.argmax()
+    return model.classes_[best], float(proba[best])
+
+# Training time, single-row inference latency and held-out accuracy for each backend
+def evaluate_backends(df, backends=None, latency_runs=50, features=FEATURES):
+    split = _training_split(df, features)
+    if split is None:
+        return []
+    scaler, X_train, X_test, y_train, y_test = split
+    row = scaler.inverse_transform(X_test[:1])[0]
+
+    results = []
+    for backend in backends or BACKENDS:
+        start = time.perf_counter()
+        model = _fit(backend, X_train, y_train)
+        train_seconds = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(latency_runs):
+            start = time.perf_counter()
+            predict_latest(model, scaler, row)
+            latencies.append(time.perf_counter() - start)
+
+        results.append({
+            'backend': backend,
+            'train_seconds': train_seconds,
+            'inference_ms': float(np.median(latencies) * 1000),
+            'accuracy': float(model.score(X_test, y_test)) if len(y_test) else float('nan'),
+            'rows': len(X_train) + len(X_test),
+        })
+    return results
+
+# Entry/SL/TP against level lists (e.g. find_support_resistance's swing points). A buy enters at the
+# nearest support below the price and a sell at the nearest resistance above it (get_nearest_level). With several
+# levels, SL/TP can't both be "the" support and resistance as in the scalar case (the stop would sit
+# on the entry), so the stop goes to the next level beyond the entry and the target to the nearest
+# level on the other side of the price; missing levels fall back to 2% either side of the entry.
+def _trade_from_levels(buy, price, support, resistance):
+    def nearest(value, levels, direction):
+        level = nearest_levels(value, levels, direction)
+        return None if np.isnan(level) else float(level)
+
+    below = nearest(price, support, "support")
+    above = nearest(price, resistance, "resistance")
+    if buy:
+        entry = min(get_nearest_level(price, support, "support"), price)
+        stop_loss = nearest(entry, support, "support")
+        take_profit = above
+        fallback_stop, fallback_target = entry * 0.98, entry * 1.02
+    else:
+        entry = max(get_nearest_level(price, resistance, "resistance"), price)
+        stop_loss = nearest(entry, resistance, "resistance")
+        take_profit = below
+        fallback_stop, fallback_target = entry * 1.02, entry * 0.98
+    return (("Buy" if buy else "Sell"), entry,
+            (fallback_stop if stop_loss is None else stop_loss, fallback_target if take_profit is None else take_profit))
+
 # Predict signal + entry + SL/TP
-def predict_trade(df, model, scaler, support, resistance):
+@timed()
+def predict_trade(df, model, scaler, support, resistance, features=FEATURES, prediction=None):
     if df.empty or 'Close' not in df.columns:
         return "No Data", None, None
 
@@ -83,18 +242,21 @@ def predict_trade(df, model, scaler, support, resistance):
         df['EMA_21'] = calculate_ema(df, 21)
 
     # Feature columns
-    feature_columns = ['SMA', 'MACD', 'ATR', 'VWAP', 'Bollinger_Upper', 'Bollinger_Lower', 'EMA_9', 'EMA_21']
+    feature_columns = features
     for col in feature_columns:
         if col not in df.columns:
             df[col] = 0  # fallback
 
-    # Prepare latest data
-    latest_data = df[feature_columns].tail(1).fillna(0)
-    scaled_input = scaler.transform(latest_data)
-    prediction = model.predict(scaled_input)[0]
+    # Prepare latest data (callers that already scored the row with predict_latest pass its label)
+    if prediction is None:
+        prediction, _ = predict_latest(model, scaler, df[feature_columns].iloc[-1].to_numpy())
 
     current_price = df['Close'].iloc[-1]
 
+    if isinstance(support, (list, np.ndarray)) or isinstance(resistance, (list, np.ndarray)):
+        return _trade_from_levels(prediction == 1, current_price,
+                                  [] if support is None else support, [] if resistance is None else resistance)
+
     # Validate resistance/support
     if resistance is not None and resistance <= current_price:
         resistance = current_price * 1.005  # fallback 0.5% higher
@@ -129,3 +291,61 @@ def predict_trade(df, model, scaler, support, resistance):
         take_profit = entry_price * 1.02
 
     return ("Buy" if prediction == 1 else "Sell"), entry_price, (stop_loss, take_profit)
+
+# Signals + entry + SL/TP for every row in one model call
+def predict_trades_batch(df, model, scaler, support=None, resistance=None, features=FEATURES):
+    """Vectorized predict_trade over all rows of `df`.
+
+    `support`/`resistance` may be scalars or level arrays such as find_support_resistance's
+    lists, which are searched per row with np.searchsorted; either way each row gets what
+    predict_trade returns for it (see _trade_from_levels for the level-array rule).
+    Returns a frame of Signal, Confidence, Entry, Stop_Loss, Take_Profit.
+    """
+    columns = ['Signal', 'Confidence', 'Entry', 'Stop_Loss', 'Take_Profit']
+    if df.empty or 'Close' not in df.columns:
+        return pd.DataFrame(columns=columns)
+
+    X = df.reindex(columns=features)
+    if 'EMA_9' not in df.columns:
+        X['EMA_9'] = calculate_ema(df, 9)
+    if 'EMA_21' not in df.columns:
+        X['EMA_21'] = calculate_ema(df, 21)
+    proba = model.predict_proba(scaler.transform(X.fillna(0)))
+    buy = model.classes_[proba.argmax(axis=1)] == 1
+    price = df['Close'].to_numpy(dtype=float)
+
+    if isinstance(support, (list, np.ndarray)) or isinstance(resistance, (list, np.ndarray)):
+        support = [] if support is None else support
+        resistance = [] if resistance is None else resistance
+        # Buys enter at the support below, sells at the resistance above (get_nearest_level)
+        below = nearest_levels(price, support, "support")
+        above = nearest_levels(price, resistance, "resistance")
+        # get_nearest_level's fallbacks: the price itself with no levels, 0.5% up with none above
+        no_resistance = price * 1.005 if len(resistance) else price
+        entry = np.where(buy, np.fmin(np.where(np.isnan(below), price, below), price),
+                         np.fmax(np.where(np.isnan(above), no_resistance, above), price))
+        # Stops sit at the next level beyond the entry, targets at the nearest level on the other side
+        next_below = nearest_levels(entry, support, "support")
+        next_above = nearest_levels(entry, resistance, "resistance")
+        stop_loss = np.where(buy, np.where(np.isnan(next_below), entry * 0.98, next_below),
+                             np.where(np.isnan(next_above), entry * 1.02, next_above))
+        take_profit = np.where(buy, np.where(np.isnan(above), entry * 1.02, above),
+                               np.where(np.isnan(below), entry * 0.98, below))
+    else:
+        entry = price
+        if support is not None and resistance is not None:
+            resistance = np.where(resistance <= price, price * 1.005, resistance)
+            support = np.where(support >= price, price * 0.995, support)
+            stop_loss = np.where(buy, support, resistance)
+            take_profit = np.where(buy, resistance, support)
+        else:
+            stop_loss = entry * 0.98
+            take_profit = entry * 1.02
+
+    return pd.DataFrame({
+        'Signal': np.where(buy, "Buy", "Sell"),
+        'Confidence': proba.max(axis=1),
+        'Entry': entry,
+        'Stop_Loss': stop_loss,
+        'Take_Profit': take_profit,
+    }, index=df.index)
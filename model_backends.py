@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+import time
+
+from config import MODEL_BACKEND_BY_INTERVAL, MODEL_STORE_DIR
+from model import DEFAULT_BACKEND, evaluate_backends
+
+STATS_PATH = os.path.join(MODEL_STORE_DIR, "backend_stats.json")
+
+
+def load_backend_stats(path=STATS_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Evaluate every backend on this interval's data and keep the results per interval
+def record_backend_stats(interval, df, path=STATS_PATH):
+    results = evaluate_backends(df)
+    stats = load_backend_stats(path)
+    stats[interval] = {'recorded': time.strftime("%Y-%m-%dT%H:%M:%S"), 'results': results}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(stats, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return results
+
+
+def backend_for_interval(interval, max_inference_ms=None, path=STATS_PATH):
+    """Configured backend for `interval`, else the most accurate recorded one, else the default."""
+    if interval in MODEL_BACKEND_BY_INTERVAL:
+        return MODEL_BACKEND_BY_INTERVAL[interval]
+    results = load_backend_stats(path).get(interval, {}).get('results', [])
+    if max_inference_ms is not None:
+        results = [r for r in results if r['inference_ms'] <= max_inference_ms]
+    if not results:
+        return DEFAULT_BACKEND
+    return max(results, key=lambda r: r['accuracy'])['backend']
+
+
+if __name__ == "__main__":
+    from data_fetcher import fetch_crypto_data
+    from indicators import calculate_indicators
+
+    coin_id = sys.argv[1] if len(sys.argv) > 1 else "bitcoin"
+    for interval in sys.argv[2:] or ["1h"]:
+        df = calculate_indicators(fetch_crypto_data(coin_id, interval, limit=1000))
+        for r in record_backend_stats(interval, df):
+            print(f"{interval:>4} {r['backend']:<24} train {r['train_seconds']:7.3f}s  "
+                  f"inference {r['inference_ms']:7.3f}ms  accuracy {r['accuracy']:.3f}")
+        print(f"{interval:>4} -> {backend_for_interval(interval)}")
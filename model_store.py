@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import pandas as pd
+
+from config import MODEL_STORE_DIR, MODEL_STALE_CANDLES
+from model import FEATURES, train_model
+from model_backends import backend_for_interval
+from profiling import timed
+from search import best_params, params_hash
+
+
+# Stable short hash of the feature set so a changed feature list never reuses an old model
+def feature_set_hash(features=FEATURES):
+    return hashlib.sha1(",".join(features).encode()).hexdigest()[:10]
+
+
+# Hash of the exact training window (features + Close) the model would be fitted on
+def data_window_hash(df, features=FEATURES):
+    columns = [c for c in features + ['Close'] if c in df.columns]
+    hashed = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+class ModelStore:
+    """Disk-backed cache of fitted (model, scaler) pairs keyed by coin, interval and feature set."""
+
+    def __init__(self, root=MODEL_STORE_DIR, stale_candles=MODEL_STALE_CANDLES, trainer=train_model, max_workers=1):
+        self.root = root
+        self.stale_candles = stale_candles
+        self.trainer = trainer
+        self._loaded = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-store")
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        coin_id, interval, fset = key
+        return os.path.join(self.root, f"{coin_id}_{interval}_{fset}")
+
+    def _read_meta(self, key):
+        try:
+            with open(self._path(key) + ".json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load(self, key, meta):
+        cached = self._loaded.get(key)
+        if cached and cached[0] == meta['window_hash']:
+            return cached[1]
+        # mmap_mode keeps the tree arrays on disk and shares pages between worker processes
+        pair = joblib.load(self._path(key) + ".joblib", mmap_mode='r')
+        self._loaded[key] = (meta['window_hash'], pair)
+        return pair
+
+    def _save(self, key, pair, meta):
+        path = self._path(key)
+        joblib.dump(pair, path + ".joblib.tmp")
+        os.replace(path + ".joblib.tmp", path + ".joblib")
+        with open(path + ".json.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".json.tmp", path + ".json")
+        self._loaded[key] = (meta['window_hash'], pair)
+
+    def _train(self, key, df, backend, features, params=None):
+        model, scaler = self.trainer(df.copy(), backend, features, params)
+        if model is None:
+            return None, None
+        meta = {
+            'window_hash': data_window_hash(df, features),
+            'trained_until': str(df['Time'].iloc[-1]) if 'Time' in df.columns else None,
+            'rows': len(df),
+            'backend': backend,
+        }
+        with self._lock:
+            self._save(key, (model, scaler), meta)
+        return model, scaler
+
+    def _train_in_background(self, key, df, backend, features, params=None):
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None and not future.done():
+                return future
+            future = self._executor.submit(self._train, key, df.copy(), backend, features, params)
+            self._pending[key] = future
+            return future
+
+    def _candles_since(self, df, meta):
+        if meta.get('trained_until') is None or 'Time' not in df.columns:
+            return len(df)
+        return int((pd.to_datetime(df['Time']) > pd.Timestamp(meta['trained_until'])).sum())
+
+    @timed('get_model')
+    def get_model(self, coin_id, interval, df, features=FEATURES):
+        """Return a (model, scaler) for this data, training only when nothing usable is cached.
+
+        A config tuned by search.py for this coin/interval picks the backend and its hyperparameters.
+        Its indicator settings shape the features `df` was built with, so they are part of the key too.
+        """
+        tuned = best_params(coin_id, interval)
+        backend = tuned['backend'] if tuned else backend_for_interval(interval)
+        params = tuned['model'] if tuned else None
+        fset = f"{backend}-{feature_set_hash(features)}"
+        if tuned:
+            fset += f"-{params_hash({'indicators': tuned.get('indicators'), 'model': params})}"
+        key = (coin_id, interval, fset)
+        meta = self._read_meta(key)
+        if meta is None:
+            return self._train(key, df, backend, features, params)
+
+        with self._lock:
+            pair = self._load(key, meta)
+        if meta['window_hash'] != data_window_hash(df, features) and self._candles_since(df, meta) > self.stale_candles:
+            # Serve the cached model now and refit off the request path
+            self._train_in_background(key, df, backend, features, params)
+        return pair
+
+    def wait(self):
+        """Block until all background retrains have finished."""
+        for future in list(self._pending.values()):
+            future.result()
+
+
+_default_store = None
+
+
+def get_model(coin_id, interval, df, features=FEATURES):
+    global _default_store
+    if _default_store is None:
+        _default_store = ModelStore()
+    return _default_store.get_model(coin_id, interval, df, features)
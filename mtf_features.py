@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from config import MTF_TIMEFRAMES
+from data_fetcher import BASE_SPACING_MS, INTERVAL_RULES, resample_candles
+from indicators import calculate_indicators_panel, indicator_params
+from model import FEATURES
+
+# Extra closed higher-timeframe bars fetched beyond the base window, past the longest indicator window
+WARMUP_MARGIN = 10
+
+# (coin, vs_currency, timeframe, indicator params) -> (last closed bar time, indicator frame of closed bars)
+_higher_cache = {}
+
+
+def _bar_length(interval):
+    rule = INTERVAL_RULES[interval]
+    return pd.Timedelta(rule) if rule else pd.Timedelta(milliseconds=BASE_SPACING_MS)
+
+
+def higher_timeframes(interval):
+    """Configured higher timeframes for `interval`, keeping only ones longer than it."""
+    base = _bar_length(interval)
+    return [tf for tf in MTF_TIMEFRAMES.get(interval, []) if _bar_length(tf) > base]
+
+
+def mtf_feature_names(interval, timeframes=None):
+    timeframes = higher_timeframes(interval) if timeframes is None else timeframes
+    return FEATURES + [f"{feature}_{tf}" for tf in timeframes for feature in FEATURES]
+
+
+# Indicator frames of closed higher-timeframe bars; only timeframes with a newly closed bar are recomputed
+def _higher_indicators(coin_id, timeframes, span, vs_currency, params=None):
+    p = indicator_params(params)
+    settings = tuple(sorted(p.items()))
+    frames = {}
+    stale = {}
+    for tf in timeframes:
+        limit = int(span / _bar_length(tf)) + max(p.values()) + WARMUP_MARGIN + 2
+        bars = resample_candles(coin_id, tf, limit, vs_currency).iloc[:-1]  # last bar is still forming
+        if bars.empty:
+            continue
+        cached = _higher_cache.get((coin_id, vs_currency, tf, settings))
+        if cached is not None and cached[0] == bars['Time'].iloc[-1] and len(cached[1]) >= len(bars):
+            frames[tf] = cached[1]
+        else:
+            stale[tf] = bars
+
+    # All stale timeframes go through one grouped indicator pass
+    if stale:
+        panel = pd.concat(stale, names=['Timeframe', None]).reset_index(level=0).reset_index(drop=True)
+        panel = calculate_indicators_panel(panel, by='Timeframe', params=params)
+        for tf, group in panel.groupby('Timeframe', sort=False):
+            group = group.drop(columns='Timeframe').reset_index(drop=True)
+            _higher_cache[(coin_id, vs_currency, tf, settings)] = (group['Time'].iloc[-1], group)
+            frames[tf] = group
+    return frames
+
+
+def add_mtf_features(df, coin_id, interval, timeframes=None, vs_currency='usd', params=None):
+    """Add `<feature>_<tf>` columns from higher timeframes onto the base bars of `df`.
+
+    Each base bar only sees higher-timeframe bars that had closed by the time the base bar
+    closed, so there is no lookahead. Higher-timeframe indicators use the same indicator
+    `params` as the base frame. Rows keep df's order and index. Returns (frame, feature names
+    for the model).
+    """
+    timeframes = higher_timeframes(interval) if timeframes is None else timeframes
+    if df.empty or not timeframes:
+        return df, FEATURES
+
+    base_length = _bar_length(interval) if INTERVAL_RULES[interval] else pd.Timedelta(0)
+    span = df['Time'].iloc[-1] - df['Time'].iloc[0] + base_length
+    frames = _higher_indicators(coin_id, timeframes, span, vs_currency, params)
+
+    out = df.copy()
+    out['_closes_at'] = out['Time'] + base_length
+    # merge_asof needs time order; _row puts the rows back in df's order afterwards
+    out['_row'] = np.arange(len(out))
+    out = out.sort_values('_closes_at', kind='stable')
+    for tf in timeframes:
+        columns = [f"{feature}_{tf}" for feature in FEATURES]
+        higher = frames.get(tf)
+        if higher is None:
+            out[columns] = float('nan')
+            continue
+        higher = higher[['Time'] + FEATURES].rename(columns=dict(zip(FEATURES, columns)))
+        higher['_available_at'] = higher['Time'] + _bar_length(tf)
+        out = pd.merge_asof(out, higher.drop(columns='Time'), left_on='_closes_at',
+                            right_on='_available_at', direction='backward').drop(columns='_available_at')
+    out = out.sort_values('_row')
+    out.index = df.index
+    return out.drop(columns=['_closes_at', '_row']), mtf_feature_names(interval, timeframes)
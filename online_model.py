@@ -0,0 +1,194 @@
+import json
+import math
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import ONLINE_LEARNING_RATE, ONLINE_MODEL_DIR
+from model import FEATURES
+from model_store import feature_set_hash
+from search import best_params, params_hash
+
+
+class RunningScaler:
+    """Welford running mean/variance with the StandardScaler attributes predict_latest reads."""
+
+    def __init__(self, n_features):
+        self.n_samples_seen_ = 0
+        self.mean_ = np.zeros(n_features)
+        self._m2 = np.zeros(n_features)
+
+    @property
+    def scale_(self):
+        if self.n_samples_seen_ == 0:
+            return np.ones_like(self.mean_)
+        std = np.sqrt(self._m2 / self.n_samples_seen_)
+        return np.where(std > 0, std, 1.0)
+
+    def partial_fit(self, x):
+        self.n_samples_seen_ += 1
+        delta = x - self.mean_
+        self.mean_ += delta / self.n_samples_seen_
+        self._m2 += delta * (x - self.mean_)
+        return self
+
+    def transform(self, X):
+        return (np.nan_to_num(np.asarray(X, dtype=float)) - self.mean_) / self.scale_
+
+
+class OnlineLogistic:
+    """Logistic regression trained one sample at a time by SGD, with sklearn's predict_proba/classes_."""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, n_features, learning_rate=ONLINE_LEARNING_RATE, l2=1e-4):
+        self.coef_ = np.zeros(n_features)
+        self.intercept_ = 0.0
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.n_updates = 0
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_
+
+    def predict_proba(self, X):
+        p = 1 / (1 + np.exp(-np.clip(self.decision_function(X), -35, 35)))
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        return (self.decision_function(X) > 0).astype(int)
+
+    def update(self, x, y):
+        """One SGD step on a single scaled row and its 0/1 label."""
+        z = max(min(float(x @ self.coef_) + self.intercept_, 35.0), -35.0)
+        error = 1 / (1 + math.exp(-z)) - y
+        self.coef_ -= self.learning_rate * (error * x + self.l2 * self.coef_)
+        self.intercept_ -= self.learning_rate * error
+        self.n_updates += 1
+
+    def partial_fit(self, X, y):
+        for x, target in zip(np.atleast_2d(np.asarray(X, dtype=float)), np.atleast_1d(y)):
+            self.update(x, target)
+        return self
+
+
+class OnlineLearner:
+    """Running scaler + online classifier fed one closed candle at a time.
+
+    A candle's label (next close higher) is only known when the next candle closes, so each
+    call learns the previous candle and holds the new one back until then.
+    """
+
+    def __init__(self, n_features, learning_rate=ONLINE_LEARNING_RATE):
+        self.scaler = RunningScaler(n_features)
+        self.model = OnlineLogistic(n_features, learning_rate)
+        self.pending = None
+        self.pending_close = None
+        self.last_time = None
+
+    def learn(self, x, close):
+        """Consume one closed candle's feature row and close price."""
+        if self.pending is not None:
+            self.model.update(self.scaler.transform(self.pending), int(close > self.pending_close))
+        x = np.asarray(x, dtype=float)
+        if np.isnan(x).any():
+            self.pending = None
+            return
+        self.scaler.partial_fit(x)
+        self.pending, self.pending_close = x, close
+
+    def learn_frame(self, df, features=FEATURES, forming=True):
+        """Learn every closed candle of `df` newer than the last one seen; returns how many were new.
+
+        With `forming` (as fetched), df's last candle is still open and is left for a later call.
+        """
+        new = df.iloc[:-1] if forming else df
+        if self.last_time is not None and 'Time' in df.columns:
+            new = new[pd.to_datetime(new['Time']) > self.last_time]
+        for x, close in zip(new[features].to_numpy(dtype=float), new['Close'].to_numpy(dtype=float)):
+            self.learn(x, close)
+        if len(new) and 'Time' in new.columns:
+            self.last_time = pd.Timestamp(new['Time'].iloc[-1])
+        return len(new)
+
+    def to_dict(self):
+        return {
+            'n_samples_seen': self.scaler.n_samples_seen_,
+            'mean': self.scaler.mean_.tolist(),
+            'm2': self.scaler._m2.tolist(),
+            'coef': self.model.coef_.tolist(),
+            'intercept': self.model.intercept_,
+            'learning_rate': self.model.learning_rate,
+            'n_updates': self.model.n_updates,
+            'pending': None if self.pending is None else self.pending.tolist(),
+            'pending_close': self.pending_close,
+            'last_time': None if self.last_time is None else str(self.last_time),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        learner = cls(len(data['coef']), data['learning_rate'])
+        learner.scaler.n_samples_seen_ = data['n_samples_seen']
+        learner.scaler.mean_ = np.array(data['mean'])
+        learner.scaler._m2 = np.array(data['m2'])
+        learner.model.coef_ = np.array(data['coef'])
+        learner.model.intercept_ = data['intercept']
+        learner.model.n_updates = data['n_updates']
+        learner.pending = None if data['pending'] is None else np.array(data['pending'])
+        learner.pending_close = data['pending_close']
+        learner.last_time = None if data['last_time'] is None else pd.Timestamp(data['last_time'])
+        return learner
+
+
+class OnlineModelStore:
+    """Per coin/interval/feature-set online learners, kept in memory and persisted as small JSON files."""
+
+    def __init__(self, root=ONLINE_MODEL_DIR):
+        self.root = root
+        self._learners = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        coin_id, interval, fset = key
+        return os.path.join(self.root, f"{coin_id}_{interval}_{fset}.json")
+
+    def _read(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return OnlineLearner.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write(self, key, learner):
+        path = self._path(key)
+        with open(path + ".tmp", "w") as f:
+            json.dump(learner.to_dict(), f)
+        os.replace(path + ".tmp", path)
+
+    def get_model(self, coin_id, interval, df, features=FEATURES, forming=True):
+        """Learn any closed candles in `df` not seen yet and return the learner's (model, scaler).
+
+        Tuned indicator windows change what the features mean, so each tuning gets its own learner.
+        """
+        indicators = (best_params(coin_id, interval) or {}).get('indicators')
+        fset = feature_set_hash(features) + (f"-{params_hash(indicators)}" if indicators else "")
+        key = (coin_id, interval, fset)
+        with self._lock:
+            learner = self._learners.get(key) or self._read(key) or OnlineLearner(len(features))
+            self._learners[key] = learner
+            if learner.learn_frame(df, features, forming):
+                self._write(key, learner)
+        return learner.model, learner.scaler
+
+
+_default_store = None
+
+
+def get_online_model(coin_id, interval, df, features=FEATURES, forming=True):
+    global _default_store
+    if _default_store is None:
+        _default_store = OnlineModelStore()
+    return _default_store.get_model(coin_id, interval, df, features, forming)
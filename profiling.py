@@ -0,0 +1,126 @@
+import functools
+import io
+import itertools
+import json
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import PROFILE_BUFFER_SIZE
+
+# Most recent timing spans across all threads; old ones fall off the end
+SPANS = deque(maxlen=PROFILE_BUFFER_SIZE)
+_local = threading.local()
+_run_ids = itertools.count(1)
+
+
+def start_run(label):
+    """Tag spans recorded on this thread with a new run id until end_run()."""
+    _local.run = (next(_run_ids), label)
+    return _local.run[0]
+
+
+def end_run():
+    _local.run = None
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block and record it in the ring buffer."""
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run_id, label = getattr(_local, 'run', None) or (None, None)
+        SPANS.append({
+            'stage': name,
+            'run': run_id,
+            'label': label,
+            'started': started,
+            'ms': (time.perf_counter() - start) * 1000,
+            'thread': threading.current_thread().name,
+        })
+
+
+def timed(name=None):
+    """Decorator form of span(); the stage name defaults to the function name."""
+    def decorator(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def run_spans(run_id):
+    return [s for s in list(SPANS) if s['run'] == run_id]
+
+
+def to_json(spans=None):
+    return json.dumps(list(SPANS) if spans is None else spans, indent=2)
+
+
+def to_prometheus(prefix="deeptradinghub_stage"):
+    """Per-stage totals in Prometheus text exposition format."""
+    totals = {}
+    for s in list(SPANS):
+        count, seconds, last = totals.get(s['stage'], (0, 0.0, 0.0))
+        totals[s['stage']] = (count + 1, seconds + s['ms'] / 1000, s['ms'] / 1000)
+
+    lines = [
+        f"# HELP {prefix}_seconds Time spent per pipeline stage.",
+        f"# TYPE {prefix}_seconds summary",
+    ]
+    for stage, (count, seconds, _) in sorted(totals.items()):
+        lines.append(f'{prefix}_seconds_sum{{stage="{stage}"}} {seconds:.6f}')
+        lines.append(f'{prefix}_seconds_count{{stage="{stage}"}} {count}')
+    lines += [
+        f"# HELP {prefix}_last_seconds Duration of the most recent span per stage.",
+        f"# TYPE {prefix}_last_seconds gauge",
+    ]
+    for stage, (_, _, last) in sorted(totals.items()):
+        lines.append(f'{prefix}_last_seconds{{stage="{stage}"}} {last:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+class Profiler:
+    """Optional whole-run capture with pyinstrument when installed, cProfile otherwise."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.report = None
+        self._profiler = None
+
+    def start(self):
+        if not self.enabled:
+            return self
+        try:
+            from pyinstrument import Profiler as Pyinstrument
+            self._profiler = Pyinstrument()
+        except ImportError:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            return self
+        self._profiler.start()
+        return self
+
+    def stop(self, top=40):
+        if self._profiler is None:
+            return None
+        if hasattr(self._profiler, 'output_text'):
+            self._profiler.stop()
+            self.report = self._profiler.output_text(unicode=True)
+        else:
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(top)
+            self.report = out.getvalue()
+        self._profiler = None
+        return self.report
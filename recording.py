@@ -0,0 +1,122 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+from coingecko_client import CoinGeckoClient, CoinGeckoError
+
+# Request params that change with the wall clock; replay matches requests without them
+VOLATILE_PARAMS = {'from', 'to'}
+
+
+def _replay_key(path, params):
+    return path, tuple(sorted((k, v) for k, v in (params or {}).items() if k not in VOLATILE_PARAMS))
+
+
+class ResponseArchive:
+    """Gzipped JSON-lines archive of CoinGecko responses.
+
+    Each line is one response: path, params, seconds since recording started (`at`), how long
+    the call took (`elapsed`), status and the JSON body. Appending opens a new gzip member,
+    which readers handle transparently, so a recording can be resumed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.started = time.time()
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, path, params, data, elapsed, status=200):
+        entry = {'path': path, 'params': params, 'at': round(time.time() - self.started, 3),
+                 'elapsed': round(elapsed, 4), 'status': status, 'data': data}
+        line = json.dumps(entry, separators=(',', ':')) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def entries(self):
+        """Every recorded response, in recording order; a truncated or corrupt tail is ignored."""
+        entries = []
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    entries.append(json.loads(line))
+        except (EOFError, json.JSONDecodeError):
+            print(f"❌ Archive {self.path} ends mid-record; replaying the {len(entries)} complete responses")
+        except (gzip.BadGzipFile, zlib.error, UnicodeDecodeError):
+            print(f"❌ Archive {self.path} is corrupt; replaying the {len(entries)} responses before the damage")
+        return entries
+
+
+class RecordingClient(CoinGeckoClient):
+    """CoinGeckoClient that also writes every response it receives to an archive."""
+
+    def __init__(self, archive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive if isinstance(archive, ResponseArchive) else ResponseArchive(archive)
+
+    async def _fetch(self, path, params):
+        start = time.perf_counter()
+        try:
+            data = await super()._fetch(path, params)
+        except CoinGeckoError as e:
+            if e.status is not None:
+                self.archive.write(path, params, None, time.perf_counter() - start, e.status)
+            raise
+        self.archive.write(path, params, data, time.perf_counter() - start)
+        return data
+
+    async def close(self):
+        await super().close()
+        self.archive.close()
+
+
+class ReplayClient(CoinGeckoClient):
+    """CoinGeckoClient that serves an archive instead of the network.
+
+    Repeated requests get the recorded responses in order (the last one once they run out),
+    each after its recorded latency divided by `speed`; speed 0 serves immediately. Rate
+    limiting is skipped, since nothing reaches CoinGecko.
+    """
+
+    def __init__(self, archive, speed=1.0, **kwargs):
+        super().__init__(**kwargs)
+        archive = archive if isinstance(archive, ResponseArchive) else ResponseArchive(archive)
+        self.speed = speed
+        self.responses = defaultdict(list)
+        for entry in archive.entries():
+            self.responses[_replay_key(entry['path'], entry['params'])].append(entry)
+        self.served = 0
+        self.missing = 0
+        self._cursor = defaultdict(int)
+
+    def _next(self, key):
+        recorded = self.responses.get(key)
+        if not recorded:
+            return None
+        position = self._cursor[key]
+        self._cursor[key] = position + 1
+        return recorded[min(position, len(recorded) - 1)]
+
+    async def _fetch(self, path, params):
+        entry = self._next(_replay_key(path, params))
+        if entry is None:
+            self.missing += 1
+            raise CoinGeckoError(f"No recorded response for {path}", status=404)
+        if self.speed > 0:
+            await asyncio.sleep(entry['elapsed'] / self.speed)
+        self.served += 1
+        if entry['status'] >= 400:
+            raise CoinGeckoError(f"{entry['status']} from {path}", status=entry['status'])
+        return entry['data']
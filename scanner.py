@@ -0,0 +1,100 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from config import DEFAULT_INTERVAL, DEFAULT_LIMIT, SCAN_FETCH_WORKERS
+from data_fetcher import fetch_crypto_data, fetch_top_100_coins
+from indicators import calculate_indicators_panel, find_support_resistance
+from model import BACKENDS, FEATURES, predict_latest, predict_trade, train_model
+from model_store import ModelStore
+from search import best_params, params_hash
+
+SIGNAL_COLUMNS = ['Coin', 'Name', 'Signal', 'Confidence', 'Price', 'Entry', 'Stop_Loss', 'Take_Profit', 'Reward_Risk']
+
+
+_worker_store = None
+
+
+# The worker processes already use every core between them, so each fit gets one (as in search.py)
+def _train_single_core(df, backend, features, params=None):
+    params = dict(params or {})
+    if 'n_jobs' in BACKENDS[backend]().get_params():
+        params['n_jobs'] = 1
+    return train_model(df, backend, features, params)
+
+
+# Per-process model store sharing the default store's files, with single-core training
+def _get_model(coin_id, interval, df):
+    global _worker_store
+    if _worker_store is None:
+        _worker_store = ModelStore(trainer=_train_single_core)
+    return _worker_store.get_model(coin_id, interval, df)
+
+
+# Score one coin's indicator frame; runs in a worker process
+def _score_coin(job):
+    coin_id, interval, df, sr_window = job
+    df = df.reset_index(drop=True)
+    row = {'Coin': coin_id, 'Price': df['Close'].iloc[-1]}
+
+    model, scaler = _get_model(coin_id, interval, df)
+    if model is None:
+        return {**row, 'Signal': 'No Signal'}
+
+    support, resistance = find_support_resistance(df, window=sr_window)
+    prediction, confidence = predict_latest(model, scaler, df[FEATURES].iloc[-1].to_numpy())
+    signal, entry, levels = predict_trade(df, model, scaler, support, resistance, prediction=prediction)
+    row.update(Signal=signal, Confidence=confidence, Entry=entry)
+    if levels:
+        stop_loss, take_profit = levels
+        risk = abs(entry - stop_loss)
+        row.update(Stop_Loss=stop_loss, Take_Profit=take_profit,
+                   Reward_Risk=abs(take_profit - entry) / risk if risk else None)
+    return row
+
+
+# Fetch, compute and score every top-100 coin; returns signals ranked by confidence
+def scan_universe(interval=DEFAULT_INTERVAL, limit=DEFAULT_LIMIT, fetch_workers=SCAN_FETCH_WORKERS, processes=None):
+    coins = fetch_top_100_coins()
+    if not coins:
+        return pd.DataFrame(columns=SIGNAL_COLUMNS)
+    names = {coin['id']: f"{coin['name']} ({coin['symbol'].upper()})" for coin in coins}
+
+    # The shared CoinGecko client rate-limits and coalesces these across threads
+    def fetch(coin_id):
+        return coin_id, fetch_crypto_data(coin_id, interval, limit=limit)
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as pool:
+        frames = {coin_id: df for coin_id, df in pool.map(fetch, names) if not df.empty}
+    if not frames:
+        return pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+    # One grouped indicator pass per distinct tuned config, so every coin gets the windows the Home page uses
+    tuned = {coin_id: best_params(coin_id, interval) or {} for coin_id in frames}
+    configs = {}
+    for coin_id in frames:
+        configs.setdefault(params_hash(tuned[coin_id].get('indicators')), []).append(coin_id)
+    jobs = []
+    for coin_ids in configs.values():
+        panel = pd.concat({coin_id: frames[coin_id] for coin_id in coin_ids}, names=['Coin', None]).reset_index(level=0)
+        panel = calculate_indicators_panel(panel.reset_index(drop=True), params=tuned[coin_ids[0]].get('indicators'))
+        jobs += [(coin_id, interval, group.drop(columns='Coin'), tuned[coin_id].get('sr_window', 20))
+                 for coin_id, group in panel.groupby('Coin', sort=False)]
+
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as pool:
+        rows = list(pool.map(_score_coin, jobs))
+
+    table = pd.DataFrame(rows).reindex(columns=SIGNAL_COLUMNS)
+    table['Name'] = table['Coin'].map(names)
+    table['Actionable'] = table['Signal'].isin(['Buy', 'Sell'])
+    table = table.sort_values(['Actionable', 'Confidence', 'Reward_Risk'], ascending=False, na_position='last')
+    return table.drop(columns='Actionable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    signals = scan_universe()
+    print(signals.to_string())
+    print(f"Scanned {len(signals)} coins in {time.perf_counter() - start:.1f}s")
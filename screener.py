@@ -0,0 +1,180 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import SCREENER_REFRESH_SECONDS, SCREENER_SIZE, SCREENER_VOLUME_HALFLIFE_HOURS
+from data_fetcher import fetch_top_coins
+
+# Snapshot column -> coins/markets field
+FIELDS = {
+    'rank': 'market_cap_rank',
+    'price': 'current_price',
+    'market_cap': 'market_cap',
+    'volume': 'total_volume',
+    'change_24h': 'price_change_percentage_24h',
+}
+# Derived: a coin's 24h volume over its own running average (NaN until it has a baseline)
+COLUMNS = list(FIELDS) + ['volume_avg', 'volume_spike']
+
+OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+}
+
+
+def _number(value):
+    return np.nan if value is None else float(value)
+
+
+class MarketSnapshot:
+    """Top-N market data as one float64 array per column, merged by delta on refresh.
+
+    Rows whose `last_updated` hasn't moved are left alone. Sort orders are cached per column
+    and rebuilt lazily after a refresh that changed something, so between refreshes a query
+    is just a mask over a ready-made order.
+    """
+
+    def __init__(self, volume_halflife_hours=SCREENER_VOLUME_HALFLIFE_HOURS):
+        self.halflife = volume_halflife_hours * 3600
+        self.ids = np.empty(0, dtype=object)
+        self.names = np.empty(0, dtype=object)
+        self.symbols = np.empty(0, dtype=object)
+        self.updated = np.empty(0, dtype=object)
+        self.seen = np.empty(0)
+        self.columns = {column: np.empty(0) for column in COLUMNS}
+        self.refreshed_at = None
+        self._row = {}
+        self._orders = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _keep(self, keep):
+        self.ids, self.names, self.symbols = self.ids[keep], self.names[keep], self.symbols[keep]
+        self.updated, self.seen = self.updated[keep], self.seen[keep]
+        self.columns = {column: values[keep] for column, values in self.columns.items()}
+        self._row = {coin_id: row for row, coin_id in enumerate(self.ids)}
+        self._orders.clear()
+
+    def refresh(self, coins, now=None):
+        """Merge a coins/markets listing; returns counts of added, changed, removed and unchanged rows."""
+        now = time.time() if now is None else now
+        incoming = {coin['id']: coin for coin in coins if coin.get('id')}
+        with self._lock:
+            removed = [coin_id for coin_id in self._row if coin_id not in incoming]
+            if removed:
+                self._keep(~np.isin(self.ids, removed))
+
+            changed = [(row, incoming[coin_id]) for coin_id, row in self._row.items()
+                       if incoming[coin_id].get('last_updated') != self.updated[row]]
+            added = [coin for coin_id, coin in incoming.items() if coin_id not in self._row]
+
+            if changed:
+                rows = np.array([row for row, _ in changed])
+                for column, field in FIELDS.items():
+                    self.columns[column][rows] = [_number(coin.get(field)) for _, coin in changed]
+                self.updated[rows] = [coin.get('last_updated') for _, coin in changed]
+                # Spikes are measured against the baseline before this update, then the baseline
+                # decays toward the new volume by how long it has been since the coin was last seen
+                volume, average = self.columns['volume'][rows], self.columns['volume_avg'][rows]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    self.columns['volume_spike'][rows] = np.where(average > 0, volume / average, np.nan)
+                weight = 1 - 0.5 ** ((now - self.seen[rows]) / self.halflife)
+                self.columns['volume_avg'][rows] = np.where(np.isnan(average), volume, average + weight * (volume - average))
+                self.seen[rows] = now
+
+            if added:
+                start = len(self.ids)
+                self.ids = np.r_[self.ids, np.array([coin['id'] for coin in added], dtype=object)]
+                self.names = np.r_[self.names, np.array([coin.get('name', '') for coin in added], dtype=object)]
+                self.symbols = np.r_[self.symbols, np.array([coin.get('symbol', '').upper() for coin in added], dtype=object)]
+                self.updated = np.r_[self.updated, np.array([coin.get('last_updated') for coin in added], dtype=object)]
+                self.seen = np.r_[self.seen, np.full(len(added), now)]
+                for column in COLUMNS:
+                    if column in FIELDS:
+                        values = [_number(coin.get(FIELDS[column])) for coin in added]
+                    elif column == 'volume_avg':
+                        values = [_number(coin.get('total_volume')) for coin in added]
+                    else:
+                        values = [np.nan] * len(added)
+                    self.columns[column] = np.r_[self.columns[column], values]
+                self._row.update({coin_id: row for row, coin_id in enumerate(self.ids[start:], start)})
+
+            if added or changed or removed:
+                self._orders.clear()
+            self.refreshed_at = now
+            return {'added': len(added), 'changed': len(changed), 'removed': len(removed),
+                    'unchanged': len(self.ids) - len(added) - len(changed)}
+
+    def order(self, column):
+        """Row positions sorted by `column` ascending, NaNs last; cached until the column changes."""
+        with self._lock:
+            order = self._orders.get(column)
+            if order is None:
+                order = self._orders[column] = np.argsort(self.columns[column], kind='stable')
+            return order
+
+    def query(self, where=(), sort='market_cap', descending=True, limit=None):
+        """Rows matching every (column, operator, value) in `where`, sorted by `sort`, as a DataFrame.
+
+        e.g. query([('volume_spike', '>', 3), ('market_cap', '>', 1e9)], sort='volume_spike')
+        """
+        with self._lock:
+            mask = np.ones(len(self.ids), dtype=bool)
+            for column, operator, value in where:
+                mask &= OPERATORS[operator](self.columns[column], value)
+            order = self.order(sort)
+            if descending:
+                # Reverse the non-NaN part only, so missing values stay at the end
+                valid = int((~np.isnan(self.columns[sort])).sum())
+                order = np.r_[order[:valid][::-1], order[valid:]]
+            rows = order[mask[order]][:limit]
+            frame = pd.DataFrame({'Coin': self.ids[rows], 'Name': self.names[rows], 'Symbol': self.symbols[rows]})
+            for column in COLUMNS:
+                frame[column] = self.columns[column][rows]
+            return frame
+
+
+class Screener:
+    """A MarketSnapshot of the top SCREENER_SIZE coins, refetched when older than the refresh interval."""
+
+    def __init__(self, size=SCREENER_SIZE, refresh_seconds=SCREENER_REFRESH_SECONDS, vs_currency='usd'):
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self.vs_currency = vs_currency
+        self.snapshot = MarketSnapshot()
+        self.stats = {}
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Fetch every page and merge it into the snapshot, unless the snapshot is still fresh."""
+        with self._refresh_lock:
+            refreshed_at = self.snapshot.refreshed_at
+            if not force and refreshed_at is not None and time.time() - refreshed_at < self.refresh_seconds:
+                return self.snapshot
+            started = time.perf_counter()
+            coins = fetch_top_coins(self.size, self.vs_currency)
+            if coins:
+                self.stats = {**self.snapshot.refresh(coins), 'fetch_ms': (time.perf_counter() - started) * 1000}
+            return self.snapshot
+
+    def query(self, where=(), sort='market_cap', descending=True, limit=None):
+        return self.refresh().query(where, sort, descending, limit)
+
+
+_default_screener = None
+_default_lock = threading.Lock()
+
+
+def get_screener():
+    """Process-wide screener shared by the UI and the service."""
+    global _default_screener
+    with _default_lock:
+        if _default_screener is None:
+            _default_screener = Screener()
+        return _default_screener
@@ -0,0 +1,272 @@
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.preprocessing import StandardScaler
+
+from backtest import _simulate_exits, _trade_levels
+from config import DEFAULT_LIMIT, SEARCH_DB_PATH
+from indicators import calculate_indicators
+from model import BACKENDS, DEFAULT_BACKEND, FEATURES, MIN_TRAIN_ROWS, _fit
+
+BASE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+MIN_ROWS = 200
+# Tuned configs are served on DEFAULT_LIMIT candles, so no window may leave fewer than MIN_TRAIN_ROWS of them
+MAX_WINDOW = DEFAULT_LIMIT - MIN_TRAIN_ROWS
+
+# Values tried per parameter: 'indicators.*' go to calculate_indicators, 'model.*' to the estimator
+INDICATOR_SPACE = {
+    'indicators.sma': [3, 5, 10, 20],
+    'indicators.macd_fast': [5, 8, 12],
+    'indicators.macd_slow': [21, 26, 34],
+    'indicators.atr': [7, 14],
+    'indicators.bollinger': [5, 10, 20],
+    'indicators.fibo_lookback': [20, 30, 50],
+    'sr_window': [10, 20, 50],
+}
+MODEL_SPACES = {
+    'random_forest': {'model.n_estimators': [50, 100, 200], 'model.max_depth': [None, 8, 16],
+                      'model.min_samples_leaf': [1, 5]},
+    'hist_gradient_boosting': {'model.max_iter': [100, 200], 'model.learning_rate': [0.05, 0.1],
+                               'model.max_depth': [None, 6]},
+    'logistic': {'model.C': [0.1, 1.0, 10.0]},
+}
+
+
+def default_space(backend=DEFAULT_BACKEND):
+    return {**INDICATOR_SPACE, **MODEL_SPACES.get(backend, {})}
+
+
+# Flat candidate {'indicators.sma': 5, 'sr_window': 20, 'model.max_depth': 8} -> nested config
+def _nest(candidate):
+    config = {'indicators': {}, 'sr_window': 20, 'model': {}}
+    for name, value in candidate.items():
+        group, _, key = name.partition('.')
+        if key:
+            config[group][key] = value
+        else:
+            config[name] = value
+    return config
+
+
+def _valid(candidate):
+    if any(value > MAX_WINDOW for name, value in candidate.items()
+           if (name.startswith('indicators.') or name == 'sr_window') and isinstance(value, int)):
+        return False
+    fast = candidate.get('indicators.macd_fast')
+    slow = candidate.get('indicators.macd_slow')
+    return fast is None or slow is None or fast < slow
+
+
+def grid_candidates(space):
+    names = list(space)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+    return [c for c in candidates if _valid(c)]
+
+
+def random_candidates(space, n, seed=0):
+    rng = np.random.default_rng(seed)
+    names = list(space)
+    candidates, seen = [], set()
+    for _ in range(n * 20):
+        if len(candidates) == n:
+            break
+        candidate = {name: space[name][rng.integers(len(space[name]))] for name in names}
+        key = tuple(candidate.values())
+        if key not in seen and _valid(candidate):
+            seen.add(key)
+            candidates.append(candidate)
+    return candidates
+
+
+# --- Worker side: OHLCV arrays are attached from shared memory once per process ---
+_shm = None
+_base = None
+_indicator_cache = {}
+
+
+def _attach(name, shape):
+    global _shm, _base
+    _shm = shared_memory.SharedMemory(name=name)
+    _base = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+
+
+def _indicators(params, rows):
+    key = (tuple(sorted(params.items())), rows)
+    df = _indicator_cache.get(key)
+    if df is None:
+        if len(_indicator_cache) >= 64:
+            _indicator_cache.clear()
+        df = calculate_indicators(pd.DataFrame({c: _base[i, -rows:] for i, c in enumerate(BASE_COLUMNS)}), params)
+        _indicator_cache[key] = df
+    return df
+
+
+# Time-series CV of one candidate on the last `rows` bars: each fold trains on the past and trades the next block
+def _evaluate(job):
+    candidate, rows, backend, n_splits, horizon = job
+    config = _nest(candidate)
+    df = _indicators(config['indicators'], rows)
+    close = df['Close'].to_numpy()
+    X = df[FEATURES].to_numpy()
+    y = (np.r_[close[1:], np.nan] > close).astype(int)
+    usable = np.flatnonzero(~np.isnan(X).any(axis=1))
+    usable = usable[usable < len(df) - 1]
+
+    # Pool workers already use every core; keep each fit single-threaded
+    model_params = dict(config['model'])
+    if 'n_jobs' in BACKENDS[backend]().get_params():
+        model_params['n_jobs'] = 1
+
+    signals = np.full(len(df), -1)
+    correct = tested = 0
+    for train, test in TimeSeriesSplit(n_splits=n_splits).split(usable):
+        train, test = usable[train], usable[test]
+        if len(np.unique(y[train])) < 2:
+            continue
+        scaler = StandardScaler().fit(X[train])
+        model = _fit(backend, scaler.transform(X[train]), y[train], model_params)
+        predicted = model.predict(scaler.transform(X[test]))
+        signals[test] = predicted
+        correct += int((predicted == y[test]).sum())
+        tested += len(test)
+
+    traded = signals >= 0
+    entry, stop_loss, take_profit = _trade_levels(df, signals, config['sr_window'])
+    returns = _simulate_exits(df, signals, entry, stop_loss, take_profit, horizon)[3][traded]
+    return {
+        'score': float(returns.sum()),
+        'accuracy': correct / tested if tested else 0.0,
+        'hit_rate': float((returns > 0).mean()) if len(returns) else 0.0,
+        'trades': int(traded.sum()),
+    }
+
+
+# --- Results DB ---
+def _connect(db_path):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY,
+            coin TEXT, interval TEXT, backend TEXT, strategy TEXT, params TEXT,
+            rows INTEGER, full_rows INTEGER, score REAL, accuracy REAL, hit_rate REAL, trades INTEGER,
+            created TEXT
+        )""")
+    connection.execute("CREATE INDEX IF NOT EXISTS results_pair ON results (coin, interval, score)")
+    return connection
+
+
+def _record(db_path, coin_id, interval, backend, strategy, results, full_rows):
+    created = time.strftime("%Y-%m-%dT%H:%M:%S")
+    with _connect(db_path) as connection:
+        connection.executemany(
+            "INSERT INTO results (coin, interval, backend, strategy, params, rows, full_rows, score, accuracy, "
+            "hit_rate, trades, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(coin_id, interval, backend, strategy, json.dumps(_nest(r['params']), sort_keys=True), r['rows'],
+              full_rows, r['score'], r['accuracy'], r['hit_rate'], r['trades'], created) for r in results])
+    connection.close()
+
+
+def best_params(coin_id, interval, db_path=SEARCH_DB_PATH):
+    """Best full-data config recorded for this coin/interval, or None:
+    {'backend', 'indicators', 'sr_window', 'model'}."""
+    if not os.path.exists(db_path):
+        return None
+    connection = _connect(db_path)
+    try:
+        row = connection.execute(
+            "SELECT backend, params FROM results WHERE coin = ? AND interval = ? AND rows = full_rows "
+            "ORDER BY score DESC, accuracy DESC LIMIT 1", (coin_id, interval)).fetchone()
+    finally:
+        connection.close()
+    return None if row is None else {'backend': row[0], **json.loads(row[1])}
+
+
+# Stable short hash of a tuned config so a new best never reuses a model fitted with the old one
+def params_hash(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def run_search(coin_id, interval, df, strategy='halving', space=None, backend=DEFAULT_BACKEND, n_candidates=27,
+               n_splits=4, horizon=24, eta=3, min_rows=MIN_ROWS, processes=None, seed=0, db_path=SEARCH_DB_PATH):
+    """Search indicator windows, support/resistance window and model hyperparameters for one coin/interval.
+
+    `strategy` is 'grid' (every combination of `space`), 'random' (`n_candidates` samples) or
+    'halving' (successive halving: random candidates scored on the most recent bars, the best
+    1/eta kept and re-scored on eta times more bars until the full frame). Candidates are scored
+    by the P&L of their signals under time-series cross-validation. Every evaluation is stored
+    in the results DB; returns the full-data results, best first.
+    """
+    space = space or default_space(backend)
+    if strategy == 'grid':
+        candidates = grid_candidates(space)
+    elif strategy in ('random', 'halving'):
+        candidates = random_candidates(space, n_candidates, seed)
+    else:
+        raise ValueError(f"Unknown search strategy: {strategy}")
+
+    full_rows = len(df)
+    if strategy == 'halving':
+        rungs = int(math.log(max(len(candidates), 1), eta))
+        rows = min(full_rows, max(min_rows, full_rows // eta ** rungs))
+    else:
+        rows = full_rows
+
+    # One copy of the OHLCV arrays in shared memory, attached by every worker
+    base = np.ascontiguousarray(df[BASE_COLUMNS].to_numpy(dtype=np.float64).T)
+    shm = shared_memory.SharedMemory(create=True, size=base.nbytes)
+    results = []
+    try:
+        np.ndarray(base.shape, dtype=np.float64, buffer=shm.buf)[:] = base
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), initializer=_attach,
+                                 initargs=(shm.name, base.shape)) as pool:
+            while candidates:
+                jobs = [(c, rows, backend, n_splits, horizon) for c in candidates]
+                rung = [{'params': c, 'rows': rows, **r} for c, r in zip(candidates, pool.map(_evaluate, jobs))]
+                results += rung
+                if rows >= full_rows:
+                    break
+                rung.sort(key=lambda r: (r['score'], r['accuracy']), reverse=True)
+                candidates = [r['params'] for r in rung[:max(1, len(rung) // eta)]]
+                rows = full_rows if len(candidates) == 1 else min(full_rows, rows * eta)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    _record(db_path, coin_id, interval, backend, strategy, results, full_rows)
+    final = [{**r['params'], **{k: v for k, v in r.items() if k != 'params'}} for r in results if r['rows'] == full_rows]
+    return pd.DataFrame(final).sort_values(['score', 'accuracy'], ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    from data_fetcher import fetch_crypto_data
+
+    parser = argparse.ArgumentParser(description="Tune indicator windows and model hyperparameters.")
+    parser.add_argument("coin_id", nargs="?", default="bitcoin")
+    parser.add_argument("intervals", nargs="*", default=["1h"])
+    parser.add_argument("--strategy", choices=["grid", "random", "halving"], default="halving")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--candidates", type=int, default=27)
+    parser.add_argument("--limit", type=int, default=2000, help="candles to search over")
+    parser.add_argument("--processes", type=int)
+    args = parser.parse_args()
+
+    for interval in args.intervals:
+        start = time.perf_counter()
+        candles = fetch_crypto_data(args.coin_id, interval, limit=args.limit)
+        table = run_search(args.coin_id, interval, candles, args.strategy, backend=args.backend,
+                           n_candidates=args.candidates, processes=args.processes)
+        print(table.head(10).to_string())
+        print(f"{interval}: {len(table)} full-data candidates in {time.perf_counter() - start:.1f}s; "
+              f"best -> {best_params(args.coin_id, interval)}")
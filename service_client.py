@@ -0,0 +1,36 @@
+import io
+
+import pandas as pd
+import requests
+
+from config import DEFAULT_LIMIT, SIGNAL_SERVICE_URL
+
+_session = requests.Session()
+
+
+# --- SIGNAL FOR THE LATEST BAR FROM THE SIGNAL SERVICE ---
+def fetch_signal(coin_id, interval, limit=DEFAULT_LIMIT, mtf=False, base_url=SIGNAL_SERVICE_URL, timeout=60):
+    try:
+        response = _session.get(f"{base_url.rstrip('/')}/signal/{coin_id}/{interval}",
+                                params={'limit': limit, 'mtf': int(mtf)}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    except requests.RequestException as e:
+        print(f"❌ Error fetching signal from the signal service: {e}")
+        return None
+
+
+# --- CANDLES (WITH INDICATORS) FROM THE SIGNAL SERVICE ---
+def fetch_service_candles(coin_id, interval, limit=DEFAULT_LIMIT, indicators=True, base_url=SIGNAL_SERVICE_URL,
+                          timeout=60):
+    try:
+        response = _session.get(f"{base_url.rstrip('/')}/candles/{coin_id}/{interval}",
+                                params={'limit': limit, 'indicators': int(indicators)}, timeout=timeout)
+        response.raise_for_status()
+        df = pd.read_json(io.StringIO(response.text), orient='records')
+        if not df.empty:
+            df['Time'] = pd.to_datetime(df['Time']).dt.tz_localize(None)
+        return df
+    except (requests.RequestException, ValueError) as e:
+        print(f"❌ Error fetching candles from the signal service: {e}")
+        return pd.DataFrame()
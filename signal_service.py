@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from cache import get_cache
+from config import (DEFAULT_LIMIT, SIGNAL_SERVICE_HOST, SIGNAL_SERVICE_PORT, SIGNAL_SERVICE_WORKERS)
+from data_fetcher import INTERVAL_RULES, fetch_crypto_data
+from indicators import calculate_indicators, find_support_resistance
+from model import FEATURES, predict_latest, predict_trade
+from model_store import get_model
+from mtf_features import add_mtf_features
+from profiling import to_prometheus
+from search import best_params, params_hash
+
+MAX_LIMIT = 5000
+
+# One lock per coin so concurrent requests don't race on extending the same base series
+_coin_locks = {}
+_coin_locks_guard = threading.Lock()
+
+
+def _coin_lock(coin_id):
+    with _coin_locks_guard:
+        return _coin_locks.setdefault(coin_id, threading.Lock())
+
+
+def _number(value):
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def _candles(coin_id, interval, limit):
+    with _coin_lock(coin_id):
+        df = fetch_crypto_data(coin_id, interval, limit=limit)
+    if df.empty:
+        raise LookupError(f"No candles for {coin_id} {interval}")
+    return df
+
+
+# Indicators, levels, model and signal for the latest bar; cached per last candle like the UI's analysis
+def compute_signal(coin_id, interval, limit=DEFAULT_LIMIT, mtf=False):
+    df = _candles(coin_id, interval, limit)
+    last_time = df['Time'].iloc[-1]
+    tuned = best_params(coin_id, interval) or {}
+
+    def analyse():
+        frame = calculate_indicators(df.copy(), tuned.get('indicators'))
+        support, resistance = find_support_resistance(frame, window=tuned.get('sr_window', 20))
+        features = FEATURES
+        if mtf:
+            frame, features = add_mtf_features(frame, coin_id, interval, params=tuned.get('indicators'))
+
+        result = {
+            'coin': coin_id,
+            'interval': interval,
+            'time': last_time.isoformat(),
+            'price': _number(frame['Close'].iloc[-1]),
+            'support': _number(support),
+            'resistance': _number(resistance),
+            'signal': 'No Signal',
+            'confidence': None,
+            'entry': None,
+            'stop_loss': None,
+            'take_profit': None,
+        }
+        model, scaler = get_model(coin_id, interval, frame, features)
+        if model is None:
+            return result
+        signal, entry, levels = predict_trade(frame, model, scaler, support, resistance, features)
+        _, confidence = predict_latest(model, scaler, frame[features].iloc[-1].to_numpy())
+        result.update(signal=signal, confidence=confidence, entry=_number(entry))
+        if levels:
+            result.update(stop_loss=_number(levels[0]), take_profit=_number(levels[1]))
+        return result
+
+    key = ("service_signal", coin_id, interval, limit, mtf, str(last_time), params_hash(tuned))
+    return get_cache().get_or_compute(key, analyse)
+
+
+def compute_candles(coin_id, interval, limit=DEFAULT_LIMIT, indicators=True):
+    df = _candles(coin_id, interval, limit)
+    if indicators:
+        tuned = best_params(coin_id, interval) or {}
+        df = calculate_indicators(df.copy(), tuned.get('indicators'))
+    return df.to_json(orient='records', date_format='iso', date_unit='ms')
+
+
+class SignalService:
+    """aiohttp JSON API over the fetch -> indicators -> model pipeline.
+
+    The pipeline runs on a thread pool; identical requests that arrive while one is
+    being computed wait on the same result instead of computing it again.
+    """
+
+    def __init__(self, workers=SIGNAL_SERVICE_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="signal")
+        self.stats = {'requests': 0, 'computed': 0, 'deduplicated': 0, 'errors': 0}
+        self._inflight = {}
+
+    async def _shared(self, key, func, *args):
+        self.stats['requests'] += 1
+        future = self._inflight.get(key)
+        if future is None:
+            self.stats['computed'] += 1
+            future = asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats['deduplicated'] += 1
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _params(request):
+        coin_id = request.match_info['coin']
+        interval = request.match_info['interval']
+        if interval not in INTERVAL_RULES:
+            raise web.HTTPBadRequest(text=json.dumps({'error': f"Unsupported interval: {interval}"}),
+                                     content_type='application/json')
+        try:
+            limit = min(int(request.query.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            limit = None
+        if limit is None or limit < 1:
+            raise web.HTTPBadRequest(text=json.dumps({'error': "limit must be a positive integer"}),
+                                     content_type='application/json')
+        return coin_id, interval, limit
+
+    @staticmethod
+    def _flag(request, name, default):
+        value = request.query.get(name)
+        return default if value is None else value.lower() in ('1', 'true', 'yes')
+
+    async def _respond(self, key, func, *args):
+        try:
+            result = await self._shared(key, func, *args)
+        except LookupError as e:
+            self.stats['errors'] += 1
+            return web.json_response({'error': str(e)}, status=404)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print("❌ Signal service request failed:", e)
+            return web.json_response({'error': str(e)}, status=500)
+        if isinstance(result, str):
+            return web.Response(text=result, content_type='application/json')
+        return web.json_response(result)
+
+    async def signal(self, request):
+        coin_id, interval, limit = self._params(request)
+        mtf = self._flag(request, 'mtf', False)
+        return await self._respond(('signal', coin_id, interval, limit, mtf),
+                                   compute_signal, coin_id, interval, limit, mtf)
+
+    async def candles(self, request):
+        coin_id, interval, limit = self._params(request)
+        indicators = self._flag(request, 'indicators', True)
+        return await self._respond(('candles', coin_id, interval, limit, indicators),
+                                   compute_candles, coin_id, interval, limit, indicators)
+
+    async def health(self, request):
+        return web.json_response({'status': 'ok', **self.stats, 'inflight': len(self._inflight)})
+
+    async def metrics(self, request):
+        return web.Response(text=to_prometheus(), content_type='text/plain')
+
+    async def _shutdown(self, app):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def app(self):
+        app = web.Application()
+        app.add_routes([
+            web.get('/signal/{coin}/{interval}', self.signal),
+            web.get('/candles/{coin}/{interval}', self.candles),
+            web.get('/health', self.health),
+            web.get('/metrics', self.metrics),
+        ])
+        app.on_cleanup.append(self._shutdown)
+        return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve signals and candles as JSON.")
+    parser.add_argument("--host", default=SIGNAL_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SIGNAL_SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SIGNAL_SERVICE_WORKERS)
+    args = parser.parse_args()
+    web.run_app(SignalService(args.workers).app(), host=args.host, port=args.port)
@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.synthetic import make_candles
+from indicators import calculate_indicators
+
+
+@pytest.fixture
+def candles():
+    return make_candles(600, freq="1h")
+
+
+@pytest.fixture
+def frame(candles):
+    return calculate_indicators(candles.copy())
+
+
+@pytest.fixture
+def base_store(tmp_path, monkeypatch):
+    """An empty candle store behind data_fetcher, with network refreshes switched off."""
+    import data_fetcher
+    from candle_store import CandleStore
+
+    store = CandleStore(str(tmp_path / "candles"))
+    monkeypatch.setattr(data_fetcher, 'candle_store', store)
+    monkeypatch.setattr(data_fetcher, '_resampled', {})
+    monkeypatch.setattr(data_fetcher, '_update_store', lambda coin_id, vs_currency: None)
+    return store
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from alerts import AlertEngine, LevelBook, LogFileSink
+
+LEVELS = {'Support': 90.0, 'Fib_0.382': 95.0, 'Fib_0.618': 98.0, 'Resistance': 110.0}
+
+
+@pytest.fixture
+def book():
+    book = LevelBook()
+    book.set_levels('coin', LEVELS)
+    return book
+
+
+def test_crossed_levels_come_in_the_order_met(book):
+    assert book.crossed('coin', 94.0, 111.0) == [('Fib_0.382', 95.0, 'up'), ('Fib_0.618', 98.0, 'up'),
+                                                 ('Resistance', 110.0, 'up')]
+    assert book.crossed('coin', 99.0, 89.0) == [('Fib_0.618', 98.0, 'down'), ('Fib_0.382', 95.0, 'down'),
+                                                ('Support', 90.0, 'down')]
+
+
+def test_crossing_matches_a_scan_of_every_level(book):
+    prices = [85.0, 90.0, 95.0, 96.5, 98.0, 110.0, 120.0, 97.0, 90.0]
+    for previous, price in zip(prices, prices[1:]):
+        # A level landed on exactly counts as crossed, one started from doesn't
+        expected = {name for name, level in LEVELS.items()
+                    if (previous < level <= price) or (price <= level < previous)}
+        assert {name for name, _, _ in book.crossed('coin', previous, price)} == expected
+
+
+def test_no_crossing_without_levels_or_movement(book):
+    assert book.crossed('coin', 95.0, 95.0) == []
+    assert book.crossed('other', 1.0, 1000.0) == []
+    assert book.crossed('coin', 91.0, 94.0) == []
+
+
+def test_add_moves_and_remove_drops_levels(book):
+    book.add('coin', 'Fib_0.382', 100.0)
+    book.add('coin', 'Entry', 92.0)
+    assert book.levels('coin') == {'Support': 90.0, 'Entry': 92.0, 'Fib_0.618': 98.0, 'Fib_0.382': 100.0,
+                                   'Resistance': 110.0}
+    book.remove('coin', 'Entry')
+    assert 'Entry' not in book.levels('coin') and len(book) == 4
+    book.remove('coin')
+    assert book.levels('coin') == {} and len(book) == 0
+
+
+def test_invalid_levels_are_dropped():
+    book = LevelBook()
+    book.set_levels('coin', {'Support': None, 'Resistance': float('nan'), 'Fib_0.5': 10})
+    assert book.levels('coin') == {'Fib_0.5': 10.0}
+
+
+def test_engine_debounces_each_level(book):
+    alerts = []
+    engine = AlertEngine([alerts.append], debounce_seconds=60, book=book)
+    assert engine.on_price('coin', 94.0, now=0) == []
+    assert [a['level'] for a in engine.on_price('coin', 96.0, now=1)] == ['Fib_0.382']
+    # Chopping back and forth inside the window is suppressed
+    assert engine.on_price('coin', 94.0, now=2) == []
+    assert engine.on_price('coin', 96.0, now=3) == []
+    assert [a['direction'] for a in engine.on_price('coin', 94.0, now=62)] == ['down']
+    assert engine.stats == {'ticks': 5, 'alerts': 2, 'debounced': 2}
+    assert len(alerts) == 2
+
+
+def test_failing_sink_does_not_stop_the_others(book, tmp_path):
+    def broken(alert):
+        raise RuntimeError("down")
+
+    path = tmp_path / "alerts.jsonl"
+    engine = AlertEngine([broken, LogFileSink(str(path))], book=book)
+    engine.on_prices({'coin': 89.0}, now=0)
+    engine.on_prices({'coin': 111.0}, now=1)
+    logged = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [a['level'] for a in logged] == ['Support', 'Fib_0.382', 'Fib_0.618', 'Resistance']
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import EXIT_STOP, EXIT_TARGET, EXIT_TIME, _simulate_exits, walk_forward
+from model import train_model
+
+
+def bars(high, low, close=None):
+    close = close or [(h + l) / 2 for h, l in zip(high, low)]
+    return pd.DataFrame({'High': high, 'Low': low, 'Close': close})
+
+
+def simulate(df, signal, stop_loss, take_profit, horizon=3):
+    n = len(df)
+    signals = np.full(n, signal)
+    entry = np.full(n, 100.0)
+    result = _simulate_exits(df, signals, entry, np.full(n, stop_loss), np.full(n, take_profit), horizon)
+    return [values[0] for values in result]
+
+
+@pytest.mark.parametrize("signal, stop_loss, take_profit", [(1, 95.0, 105.0), (0, 105.0, 95.0)])
+def test_stop_wins_when_both_are_hit_in_one_bar(signal, stop_loss, take_profit):
+    df = bars([100, 101, 106, 107], [100, 99, 94, 93])
+    assert simulate(df, signal, stop_loss, take_profit) == [stop_loss, 2, EXIT_STOP, pytest.approx(-0.05)]
+
+
+@pytest.mark.parametrize("signal, stop_loss, take_profit", [(1, 95.0, 105.0), (0, 105.0, 95.0)])
+def test_first_level_touched_exits(signal, stop_loss, take_profit):
+    # Bar 2 reaches the buy target and the sell target alike before anything touches a stop
+    df = bars([100, 101, 106 if signal == 1 else 101, 107], [100, 99, 99 if signal == 1 else 94, 90])
+    assert simulate(df, signal, stop_loss, take_profit) == [take_profit, 2, EXIT_TARGET, pytest.approx(0.05)]
+
+
+def test_time_exit_after_the_horizon():
+    df = bars([100, 101, 102, 101, 103], [99, 99, 100, 100, 101], [100, 100, 101, 100.5, 102])
+    price, held, reason, returns = simulate(df, 1, 90.0, 110.0, horizon=3)
+    assert (price, held, reason) == (100.5, 3, EXIT_TIME)
+    assert returns == pytest.approx(0.005)
+
+
+def test_time_exit_is_clipped_at_the_last_bar():
+    df = bars([100, 101, 102], [99, 99, 100], [100, 100, 101])
+    n = len(df)
+    exit_price, exit_bar, reason, _ = _simulate_exits(df, np.ones(n), np.full(n, 100.0), np.full(n, 90.0),
+                                                      np.full(n, 110.0), horizon=5)
+    assert list(exit_bar) == [2, 1, 0]
+    assert list(exit_price) == [101, 101, 101] and set(reason) == {EXIT_TIME}
+
+
+class RecordingTrainer:
+    def __init__(self):
+        self.windows = []
+
+    def __call__(self, df, backend):
+        self.windows.append((df['Time'].iloc[0], df['Time'].iloc[-1]))
+        return train_model(df, backend)
+
+
+@pytest.mark.parametrize("expanding", [False, True])
+def test_each_model_only_sees_bars_before_its_segment(frame, expanding):
+    trainer = RecordingTrainer()
+    summary, trades = walk_forward(frame, train_window=200, retrain_every=50, expanding=expanding,
+                                   backend='logistic', trainer=trainer)
+    assert summary['retrains'] == len(trainer.windows) == 8
+    for i, (first, last) in enumerate(trainer.windows):
+        segment_start = frame['Time'].iloc[200 + 50 * i]
+        assert last < segment_start
+        assert first == frame['Time'].iloc[0 if expanding else 50 * i]
+    # Nothing is traded before the first model exists
+    assert trades['Time'].min() == frame['Time'].iloc[200]
+    assert summary['trades'] == len(frame) - 200
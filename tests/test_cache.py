@@ -0,0 +1,80 @@
+import os
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+import cache
+from cache import LayeredCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(cache, 'time', SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def make_cache(tmp_path, **kwargs):
+    return LayeredCache(root=str(tmp_path / "cache"), **kwargs)
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    layered = make_cache(tmp_path, ttl=60)
+    layered.set('a', 1)
+    layered.set('b', 2, ttl=600)
+
+    clock.value += 59
+    assert layered.get('a') == 1
+    clock.value += 2
+    assert layered.get('a') is None
+    assert layered.get('b') == 2
+
+    # Expiry holds for the disk tier too, not just memory
+    assert make_cache(tmp_path).get('a') is None
+    assert make_cache(tmp_path).get('b') == 2
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path, clock):
+    layered = make_cache(tmp_path, max_entries=2)
+    layered.set('a', 1)
+    layered.set('b', 2)
+    layered.get('a')
+    layered.set('c', 3)
+    assert list(layered._memory) == ['a', 'c']
+    # Evicted from memory is not lost; it is still on disk
+    assert layered.get('b') == 2
+
+
+def test_disk_hits_are_promoted_to_memory(tmp_path, clock):
+    make_cache(tmp_path).set('a', {'x': 1})
+    layered = make_cache(tmp_path)
+    assert 'a' not in layered._memory
+    assert layered.get('a') == {'x': 1}
+    assert 'a' in layered._memory
+
+    os.remove(layered._path('a'))
+    assert layered.get('a') == {'x': 1}
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path, clock):
+    layered = make_cache(tmp_path, max_disk_entries=2)
+    for mtime, key in enumerate(['a', 'b']):
+        layered.set(key, key)
+        os.utime(layered._path(key), (mtime, mtime))
+    layered.set('c', 'c')
+    assert not os.path.exists(layered._path('a'))
+    assert os.path.exists(layered._path('b')) and os.path.exists(layered._path('c'))
+
+
+@pytest.mark.parametrize("contents", [b"", b"not a pickle", pickle.dumps(('a', 1e12, 1))[:-3],
+                                      pickle.dumps({'a': 1}), pickle.dumps(42)],
+                         ids=['empty', 'garbage', 'truncated', 'wrong-shape', 'not-a-tuple'])
+def test_corrupt_pickles_are_recomputed(tmp_path, clock, contents):
+    layered = make_cache(tmp_path)
+    with open(layered._path('a'), 'wb') as f:
+        f.write(contents)
+
+    assert layered.get('a', 'missing') == 'missing'
+    assert layered.get_or_compute('a', lambda: 'fresh') == 'fresh'
+    assert make_cache(tmp_path).get('a') == 'fresh'
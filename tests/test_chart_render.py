@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chart_render import build_figure, bucket_candles, downsample_line, lttb
+
+
+@pytest.mark.parametrize("df", [pd.DataFrame(), pd.DataFrame(columns=['Time', 'Open', 'High', 'Low', 'Close'])])
+def test_empty_frame_gives_an_empty_figure(df):
+    fig, stats = build_figure(df, [{'y': 1.0, 'name': 'Support'}], x_range=(pd.Timestamp(0), pd.Timestamp(1)))
+    assert len(fig.data) == 0
+    assert (stats['bars'], stats['points']) == (0, 0)
+
+
+def test_zoom_outside_the_data_gives_an_empty_figure(frame):
+    x_range = (pd.Timestamp("1990-01-01"), pd.Timestamp("1990-02-01"))
+    fig, stats = build_figure(frame, codes=np.zeros(len(frame), dtype=int), x_range=x_range)
+    assert len(fig.data) == 0 and stats['bars'] == 0
+
+
+def test_buckets_cover_every_candle(frame):
+    candles = bucket_candles(frame, 100)
+    assert len(candles) == 100
+    assert candles['High'].max() == frame['High'].max()
+    assert candles['Low'].min() == frame['Low'].min()
+    assert candles['Close'].iloc[-1] == frame['Close'].iloc[-1]
+
+
+def test_lttb_keeps_the_endpoints(frame):
+    kept = lttb(np.arange(len(frame)), frame['Close'], 50)
+    assert len(kept) == 50 and kept[0] == 0 and kept[-1] == len(frame) - 1
+    x, y = downsample_line(frame['Time'], frame['EMA_9'], 50)
+    assert len(x) == len(y) == 50
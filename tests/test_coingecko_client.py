@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from benchmarks.stub_coingecko import serve
+from coingecko_client import CoinGeckoClient, CoinGeckoError
+
+
+def run_against(handler, max_retries=2):
+    """GET /thing from a client pointed at a one-route server; returns (result or error, calls)."""
+    calls = []
+
+    async def route(request):
+        calls.append(request.path)
+        return await handler(len(calls))
+
+    async def main():
+        app = web.Application()
+        app.add_routes([web.get('/thing', route)])
+        runner, port = await serve(app, 0)
+        client = CoinGeckoClient(base_url=f"http://127.0.0.1:{port}", max_retries=max_retries, backoff_base=0)
+        try:
+            return await client.get('thing')
+        except CoinGeckoError as e:
+            return e
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    return asyncio.run(main()), len(calls)
+
+
+@pytest.mark.parametrize("body, content_type", [
+    ("<html>Bad gateway</html>", "text/html"),
+    ('{"truncated": ', "application/json"),
+])
+def test_bad_bodies_become_coingecko_errors(body, content_type):
+    async def handler(call):
+        return web.Response(text=body, content_type=content_type)
+
+    result, calls = run_against(handler)
+    assert isinstance(result, CoinGeckoError)
+    assert calls == 3
+
+
+def test_bad_body_is_retried():
+    async def handler(call):
+        if call == 1:
+            return web.Response(text="<html>oops</html>", content_type="text/html")
+        return web.json_response({'ok': True})
+
+    assert run_against(handler) == ({'ok': True}, 2)
+
+
+def test_client_errors_are_not_retried():
+    async def handler(call):
+        return web.json_response({'error': 'not found'}, status=404)
+
+    result, calls = run_against(handler)
+    assert isinstance(result, CoinGeckoError) and result.status == 404
+    assert calls == 1
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_fetcher
+from compact import CompactCandles, CompactIndicators
+from data_fetcher import BASE_INTERVAL, BASE_SPACING_MS, fetch_compact_data, resample_candles
+from indicators import calculate_indicators
+
+
+def store_points(store, n=3_000):
+    rng = np.random.default_rng(0)
+    times = 1_700_000_000_000 + np.arange(n, dtype=np.int64) * BASE_SPACING_MS
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, len(times))))
+    volume = rng.lognormal(3, 0.5, len(times))
+    store.append('coin-usd', BASE_INTERVAL, times, close, volume)
+    return times, close, volume
+
+
+@pytest.mark.parametrize("interval, rule", [('1m', None), ('15m', '15min'), ('1h', '1h')])
+def test_compact_candles_match_resampled_frame(base_store, interval, rule):
+    times, close, volume = store_points(base_store)
+
+    expected = resample_candles('coin', interval, limit=len(times))
+    compact = CompactCandles.from_close_volume(times, close, volume, rule).to_frame()
+    compact = compact.tail(len(expected)).reset_index(drop=True)
+    pd.testing.assert_frame_equal(compact, expected, check_dtype=False, rtol=1e-6)
+
+
+@pytest.mark.parametrize("interval", ['1m', '15m', '1h'])
+def test_fetch_compact_data_reads_the_store_directly(base_store, interval):
+    store_points(base_store)
+    compact = fetch_compact_data('coin', interval, limit=120)
+    assert not data_fetcher._resampled
+    expected = resample_candles('coin', interval, limit=120)
+    pd.testing.assert_frame_equal(compact.to_frame(), expected, check_dtype=False, rtol=1e-6)
+
+
+def test_fetch_compact_data_without_history(base_store):
+    assert len(fetch_compact_data('coin', '1h')) == 0
+
+
+@pytest.mark.parametrize("params", [None, {'sma': 3, 'macd_fast': 5, 'macd_slow': 34, 'atr': 14, 'bollinger': 10,
+                                           'fibo_lookback': 20}])
+def test_compact_indicators_match_calculate_indicators(candles, params):
+    compact = CompactCandles.from_frame(candles)
+    expected = calculate_indicators(compact.to_frame().astype({c: np.float64 for c in ['Open', 'High', 'Low',
+                                                                                       'Close', 'Volume']}), params)
+    actual = CompactIndicators(compact, params).to_frame()
+    pd.testing.assert_frame_equal(actual, expected[actual.columns], check_dtype=False, rtol=1e-5)
+    assert CompactIndicators(compact, params).tail(10).equals(actual.tail(10).reset_index(drop=True))
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_candles
+from indicators import IndicatorState, calculate_indicators, calculate_indicators_panel
+
+INDICATOR_COLUMNS = ['SMA', 'MACD', 'ATR', 'Bollinger_Upper', 'Bollinger_Lower', 'VWAP', 'EMA_9', 'EMA_21',
+                     'Fibo_High', 'Fibo_Low', 'Fib_0.236', 'Fib_0.618']
+
+
+def assert_same_indicators(actual, expected):
+    pd.testing.assert_frame_equal(actual[INDICATOR_COLUMNS].reset_index(drop=True),
+                                  expected[INDICATOR_COLUMNS].reset_index(drop=True),
+                                  check_dtype=False, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("params", [None, {'sma': 3, 'macd_fast': 5, 'atr': 14, 'bollinger': 10, 'fibo_lookback': 20}])
+def test_incremental_matches_batch(candles, params):
+    expected = calculate_indicators(candles.copy(), params)
+    state = IndicatorState(params)
+    rows = pd.DataFrame([state.update(candle) for candle in candles.to_dict('records')])
+    assert_same_indicators(rows, expected)
+
+
+def test_seeded_state_continues_like_batch(candles):
+    expected = calculate_indicators(candles.copy())
+    state = IndicatorState.from_frame(candles.iloc[:400])
+    assert_same_indicators(state.update_batch(candles.iloc[400:]), expected.iloc[400:])
+
+
+def test_state_round_trips_through_dict(candles):
+    expected = calculate_indicators(candles.copy())
+    state = IndicatorState.from_dict(IndicatorState.from_frame(candles.iloc[:300]).to_dict())
+    assert_same_indicators(state.update_batch(candles.iloc[300:]), expected.iloc[300:])
+
+
+def test_empty_batch(candles):
+    assert IndicatorState().update_batch(candles.iloc[:0]).empty
+    assert np.isnan(IndicatorState().update(candles.iloc[0])['ATR'])
+
+
+@pytest.mark.parametrize("params", [None, {'sma': 3, 'macd_slow': 30, 'atr': 14, 'bollinger': 10, 'fibo_lookback': 20}])
+def test_panel_matches_per_coin(params):
+    frames = {f"coin-{seed}": make_candles(200 + seed * 10, seed=seed, freq="1h") for seed in range(3)}
+    panel = pd.concat(frames, names=['Coin', None]).reset_index(level=0).reset_index(drop=True)
+    panel = calculate_indicators_panel(panel, params=params)
+    for coin_id, df in frames.items():
+        assert_same_indicators(panel[panel['Coin'] == coin_id], calculate_indicators(df.copy(), params))
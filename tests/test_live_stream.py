@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import live_stream
+from chart_render import build_figure, bucket_candles
+from data_fetcher import BASE_INTERVAL, BASE_SPACING_MS, fetch_candles_since, resample_candles
+from indicators import calculate_indicators
+from live_stream import OHLCV, LiveStream, append_to_figure
+from test_indicators import assert_same_indicators
+
+# 400px at CHART_PX_PER_CANDLE 4 -> 100 candles, so 500 rows render as 5-row buckets
+WIDTH_PX = 400
+
+
+def candle_trace(fig):
+    return next(trace for trace in fig.data if trace.type == 'candlestick')
+
+
+@pytest.mark.parametrize("chunks", [[100], [47, 53], [1] * 100])
+def test_appended_rows_are_bucketed_like_the_initial_render(frame, chunks):
+    fig, _ = build_figure(frame.iloc[:500], width_px=WIDTH_PX)
+    assert fig.layout.meta['bucket'] == 5
+
+    start = 500
+    for size in chunks:
+        append_to_figure(fig, frame.iloc[start:start + size])
+        start += size
+
+    expected = bucket_candles(frame.iloc[500:], 20)
+    candles = candle_trace(fig)
+    assert len(candles.x) == 100 + 20
+    np.testing.assert_array_equal(np.asarray(candles.x[100:], dtype='datetime64[ns]'),
+                                  expected['Time'].to_numpy())
+    for column in ['Open', 'High', 'Low', 'Close']:
+        np.testing.assert_allclose(getattr(candles, column.lower())[100:], expected[column])
+
+    # One line point per bucket, at the bucket's latest row
+    ema = next(trace for trace in fig.data if trace.name == 'EMA 9')
+    np.testing.assert_allclose(ema.y[-20:], frame['EMA_9'].to_numpy()[504::5])
+
+
+def test_unbucketed_figure_appends_every_row(frame):
+    fig, _ = build_figure(frame.iloc[:50], width_px=WIDTH_PX)
+    append_to_figure(fig, frame.iloc[50:60])
+    np.testing.assert_allclose(candle_trace(fig).close, frame['Close'].iloc[:60])
+
+
+def test_levels_move_shapes_and_labels(frame):
+    levels = [{'y': 1.0, 'name': 'Fib_0.5'}, {'y': 2.0, 'name': 'Support'}]
+    fig, _ = build_figure(frame.iloc[:50], levels, width_px=WIDTH_PX)
+    append_to_figure(fig, frame.iloc[50:51], {'Fib_0.5': 3.0})
+
+    shapes = {shape.name: shape for shape in fig.layout.shapes}
+    assert (shapes['Fib_0.5'].y0, shapes['Fib_0.5'].y1) == (3.0, 3.0)
+    assert (shapes['Support'].y0, shapes['Support'].y1) == (2.0, 2.0)
+    labels = {annotation.text: annotation.y for annotation in fig.layout.annotations}
+    assert labels == {'Fib_0.5': 3.0, 'Support': 2.0}
+
+
+def test_stream_emits_the_forming_bar_once_it_closes(base_store, monkeypatch):
+    monkeypatch.setattr(live_stream, 'fetch_live_price', lambda coin_id: None)
+    rng = np.random.default_rng(1)
+    # 5-minute base points: 30.5 hours, then another two hours
+    times = 1_699_999_200_000 + np.arange(12 * 33, dtype=np.int64) * BASE_SPACING_MS
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, len(times))))
+    volume = rng.lognormal(3, 0.5, len(times))
+    seen = 12 * 30 + 6
+    base_store.append('coin-usd', BASE_INTERVAL, times[:seen], close[:seen], volume[:seen])
+
+    df = resample_candles('coin', '1h', limit=100)
+    forming = df['Time'].iloc[-1]
+    stream = LiveStream('coin', '1h', df, None, None)
+    assert stream.last_time < forming
+
+    base_store.append('coin-usd', BASE_INTERVAL, times[seen:], close[seen:], volume[seen:])
+    rows = stream.poll()['rows']
+
+    bars = resample_candles('coin', '1h', limit=100)
+    expected = calculate_indicators(bars.iloc[:-1].copy())
+    expected = expected[expected['Time'] >= forming]
+    assert list(rows['Time']) == list(expected['Time'])
+    assert rows['Time'].iloc[0] == forming
+    pd.testing.assert_frame_equal(rows[OHLCV], expected[OHLCV].reset_index(drop=True), check_dtype=False)
+    assert_same_indicators(rows, expected)
+    assert stream.poll() is None
+
+
+
+@pytest.mark.parametrize("interval, forming", [('1m', False), ('15m', True), ('1h', True)])
+def test_candles_since_drop_only_a_forming_resampled_bar(base_store, interval, forming):
+    # Five hours of 5-minute base points, less the last one, so resampled bars end mid-bar
+    times = 1_699_999_200_000 + np.arange(12 * 5 - 1, dtype=np.int64) * BASE_SPACING_MS
+    base_store.append('coin-usd', BASE_INTERVAL, times, np.linspace(100, 110, len(times)), np.ones(len(times)))
+
+    bars = resample_candles('coin', interval, limit=100)
+    new = fetch_candles_since('coin', interval, bars['Time'].iloc[-4])
+    closed = bars.iloc[:-1] if forming else bars
+    assert list(new['Time']) == list(closed['Time'].iloc[-(2 if forming else 3):])
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_candles
+from model import (FEATURES, find_support_resistance, find_swing_points, predict_latest, predict_trade,
+                   predict_trades_batch, train_model)
+
+
+# The original per-candle loop find_swing_points replaced
+def loop_swing_points(df, window):
+    support, resistance = [], []
+    for i in range(window, len(df) - window):
+        if all(df['Low'][i] < df['Low'][i - j] and df['Low'][i] < df['Low'][i + j] for j in range(1, window)):
+            support.append(df['Low'][i])
+        if all(df['High'][i] > df['High'][i - j] and df['High'][i] > df['High'][i + j] for j in range(1, window)):
+            resistance.append(df['High'][i])
+    return sorted(set(support)), sorted(set(resistance))
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 20])
+@pytest.mark.parametrize("rows", [30, 41, 300])
+def test_swing_points_match_loop(window, rows):
+    df = make_candles(rows, seed=rows + window)
+    assert find_support_resistance(df, window) == loop_swing_points(df, window)
+
+
+def test_swing_points_batch_matches_per_symbol():
+    frames = [make_candles(200, seed=seed) for seed in range(3)]
+    low = np.stack([df['Low'].to_numpy() for df in frames])
+    high = np.stack([df['High'].to_numpy() for df in frames])
+    assert find_swing_points(low, high, 10) == [find_support_resistance(df, 10) for df in frames]
+
+
+def test_swing_points_too_short():
+    assert find_support_resistance(make_candles(20), 10) == ([], [])
+
+
+@pytest.fixture
+def trained(frame):
+    return train_model(frame, backend='logistic')
+
+
+@pytest.mark.parametrize("levels", ['none', 'scalar'])
+def test_batch_predictions_match_per_row(frame, trained, levels):
+    model, scaler = trained
+    support, resistance = None, None
+    if levels == 'scalar':
+        # Between the extremes, so some rows need predict_trade's out-of-range fallbacks
+        support, resistance = frame['Close'].quantile(0.3), frame['Close'].quantile(0.7)
+    batch = predict_trades_batch(frame, model, scaler, support, resistance)
+
+    for i in range(30, len(frame), 23):
+        signal, entry, (stop_loss, take_profit) = predict_trade(frame.iloc[:i + 1].copy(), model, scaler,
+                                                                support, resistance)
+        _, confidence = predict_latest(model, scaler, frame[FEATURES].iloc[i].to_numpy())
+        row = batch.iloc[i]
+        assert row['Signal'] == signal
+        assert row['Confidence'] == pytest.approx(confidence)
+        assert (row['Entry'], row['Stop_Loss'], row['Take_Profit']) == pytest.approx((entry, stop_loss, take_profit))
+
+
+def test_predict_trade_reads_only_the_latest_row(frame, trained):
+    model, scaler = trained
+    expected = predict_trade(frame.copy(), model, scaler, None, None)
+    history = frame.copy()
+    history.loc[history.index[:-1], FEATURES] = np.nan
+    assert predict_trade(history, model, scaler, None, None) == expected
+
+
+@pytest.mark.parametrize("levels", ['swing', 'none_below', 'none_above', 'empty'])
+def test_batch_level_arrays_match_per_row(frame, trained, levels):
+    model, scaler = trained
+    support, resistance = find_support_resistance(frame, 5)
+    low, high = frame['Close'].min(), frame['Close'].max()
+    if levels == 'none_below':
+        support = [level for level in support if level < low]
+    elif levels == 'none_above':
+        resistance = [level for level in resistance if level > high]
+    elif levels == 'empty':
+        support, resistance = [], []
+    batch = predict_trades_batch(frame, model, scaler, support, resistance)
+    assert set(batch['Signal'].iloc[30:]) == {'Buy', 'Sell'}
+
+    for i in range(30, len(frame), 7):
+        signal, entry, (stop_loss, take_profit) = predict_trade(frame.iloc[:i + 1].copy(), model, scaler,
+                                                                support, resistance)
+        row = batch.iloc[i]
+        assert row['Signal'] == signal
+        assert (row['Entry'], row['Stop_Loss'], row['Take_Profit']) == pytest.approx((entry, stop_loss, take_profit))
+
+
+def test_level_array_trades():
+    class Fixed:
+        classes_ = np.array([0, 1])
+
+        def __init__(self, buy):
+            self.buy = buy
+
+        def predict_proba(self, X):
+            return np.tile([0.2, 0.8] if self.buy else [0.8, 0.2], (len(X), 1))
+
+    class Identity:
+        mean_, scale_ = np.zeros(len(FEATURES)), np.ones(len(FEATURES))
+
+        def transform(self, X):
+            return np.asarray(X, dtype=float)
+
+    df = make_candles(5)
+    df[FEATURES] = 0.0
+    df['Close'] = 100.0
+    support, resistance = [90.0, 95.0], [105.0, 110.0]
+    # Buy at the support below, stop one level further down, target the resistance above
+    assert predict_trade(df.copy(), Fixed(True), Identity(), support, resistance) == ("Buy", 95.0, (90.0, 105.0))
+    assert predict_trade(df.copy(), Fixed(False), Identity(), support, resistance) == ("Sell", 105.0, (110.0, 95.0))
+    # No level beyond the entry: the stop falls back to 2% past it
+    assert predict_trade(df.copy(), Fixed(True), Identity(), [95.0], resistance) == ("Buy", 95.0, (95.0 * 0.98, 105.0))
+    # No level above: sells enter 0.5% up; no level at all: at the price, with a 2% stop and target
+    assert predict_trade(df.copy(), Fixed(False), Identity(), support, [90.0]) == ("Sell", 100 * 1.005, (100 * 1.005 * 1.02, 95.0))
+    assert predict_trade(df.copy(), Fixed(True), Identity(), [], []) == ("Buy", 100.0, (98.0, 102.0))
+    assert predict_trade(df.copy(), Fixed(False), Identity(), [], []) == ("Sell", 100.0, (102.0, 98.0))
+    batch = predict_trades_batch(df, Fixed(True), Identity(), support, resistance)
+    assert list(batch.iloc[-1][['Entry', 'Stop_Loss', 'Take_Profit']]) == [95.0, 90.0, 105.0]
@@ -0,0 +1,68 @@
+import json
+import math
+
+import model_backends
+from benchmarks.synthetic import make_candles
+from indicators import calculate_indicators
+from model import BACKENDS, DEFAULT_BACKEND, evaluate_backends
+from model_backends import backend_for_interval, load_backend_stats, record_backend_stats
+
+STATS = {
+    '1h': {'results': [
+        {'backend': 'random_forest', 'accuracy': 0.55, 'inference_ms': 8.0},
+        {'backend': 'hist_gradient_boosting', 'accuracy': 0.60, 'inference_ms': 2.0},
+        {'backend': 'logistic', 'accuracy': 0.52, 'inference_ms': 0.1},
+    ]},
+    '1D': {'results': [{'backend': 'logistic', 'accuracy': 0.58, 'inference_ms': 0.1}]},
+}
+
+
+def write_stats(tmp_path, stats=STATS):
+    path = tmp_path / "backend_stats.json"
+    path.write_text(json.dumps(stats))
+    return str(path)
+
+
+def test_recorded_stats_pick_the_most_accurate_backend_per_interval(tmp_path):
+    path = write_stats(tmp_path)
+    assert backend_for_interval('1h', path=path) == 'hist_gradient_boosting'
+    assert backend_for_interval('1D', path=path) == 'logistic'
+    assert backend_for_interval('1h', max_inference_ms=1.0, path=path) == 'logistic'
+
+
+def test_unrecorded_or_filtered_out_intervals_use_the_default(tmp_path):
+    path = write_stats(tmp_path)
+    assert backend_for_interval('5m', path=path) == DEFAULT_BACKEND
+    assert backend_for_interval('1D', max_inference_ms=0.01, path=path) == DEFAULT_BACKEND
+    assert backend_for_interval('1h', path=str(tmp_path / "missing.json")) == DEFAULT_BACKEND
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{")
+    assert backend_for_interval('1h', path=str(corrupt)) == DEFAULT_BACKEND
+
+
+def test_configured_backend_overrides_the_stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_backends, 'MODEL_BACKEND_BY_INTERVAL', {'1h': 'random_forest'})
+    path = write_stats(tmp_path)
+    assert backend_for_interval('1h', path=path) == 'random_forest'
+    assert backend_for_interval('1D', path=path) == 'logistic'
+
+
+def test_every_backend_is_scored_on_a_small_frame(tmp_path):
+    df = calculate_indicators(make_candles(120, freq="1h"))
+    results = evaluate_backends(df, latency_runs=3)
+    assert [r['backend'] for r in results] == list(BACKENDS)
+    for r in results:
+        assert 0 <= r['accuracy'] <= 1 and not math.isnan(r['accuracy'])
+        assert r['inference_ms'] > 0 and r['train_seconds'] > 0
+        assert r['rows'] == results[0]['rows'] > 0
+
+    path = str(tmp_path / "stats" / "backend_stats.json")
+    record_backend_stats('1h', df, path=path)
+    assert [r['backend'] for r in load_backend_stats(path)['1h']['results']] == list(BACKENDS)
+    best = max(results, key=lambda r: r['accuracy'])['backend']
+    assert backend_for_interval('1h', path=path) == best
+
+
+def test_too_little_data_scores_nothing():
+    assert evaluate_backends(calculate_indicators(make_candles(30, freq="1h"))) == []
@@ -0,0 +1,81 @@
+import pytest
+
+import model_store
+from benchmarks.synthetic import make_candles
+from indicators import calculate_indicators
+from model import train_model
+from model_store import ModelStore
+
+
+@pytest.fixture
+def history():
+    return calculate_indicators(make_candles(400, freq="1h"))
+
+
+@pytest.fixture(autouse=True)
+def untuned(monkeypatch):
+    monkeypatch.setattr(model_store, 'best_params', lambda coin_id, interval: None)
+    monkeypatch.setattr(model_store, 'backend_for_interval', lambda interval: 'logistic')
+
+
+class CountingTrainer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return train_model(*args)
+
+
+def make_store(tmp_path, stale_candles=5):
+    trainer = CountingTrainer()
+    return ModelStore(root=str(tmp_path), stale_candles=stale_candles, trainer=trainer), trainer
+
+
+def test_trains_once_then_serves_cache(tmp_path, history):
+    store, trainer = make_store(tmp_path)
+    model, scaler = store.get_model('coin', '1h', history.iloc[:300])
+    assert model is not None and trainer.calls == 1
+    store.get_model('coin', '1h', history.iloc[:300])
+    assert trainer.calls == 1
+
+    # A fresh store (e.g. another process) loads the saved model from disk
+    reloaded, reloaded_trainer = make_store(tmp_path)
+    assert reloaded.get_model('coin', '1h', history.iloc[:300])[0] is not None
+    assert reloaded_trainer.calls == 0
+
+
+def test_retrains_in_background_only_when_stale(tmp_path, history):
+    store, trainer = make_store(tmp_path, stale_candles=5)
+    first, _ = store.get_model('coin', '1h', history.iloc[:300])
+
+    # Up to stale_candles new candles keep the cached model
+    assert store.get_model('coin', '1h', history.iloc[:305])[0] is first
+    store.wait()
+    assert trainer.calls == 1
+
+    # More than that still serves the cached model, and refits off the request path
+    assert store.get_model('coin', '1h', history.iloc[:306])[0] is first
+    store.wait()
+    assert trainer.calls == 2
+    assert store.get_model('coin', '1h', history.iloc[:306])[0] is not first
+    assert trainer.calls == 2
+
+
+def test_feature_sets_get_separate_models(tmp_path, history):
+    store, trainer = make_store(tmp_path)
+    store.get_model('coin', '1h', history)
+    store.get_model('coin', '1h', history, ['SMA', 'MACD', 'ATR'])
+    assert trainer.calls == 2
+
+
+def test_tuned_indicator_settings_get_separate_models(tmp_path, history, monkeypatch):
+    store, trainer = make_store(tmp_path)
+    tuned = {'backend': 'logistic', 'indicators': {'sma': 10}, 'sr_window': 20, 'model': {'C': 1.0}}
+    monkeypatch.setattr(model_store, 'best_params', lambda coin_id, interval: tuned)
+    store.get_model('coin', '1h', history)
+    tuned = {**tuned, 'indicators': {'sma': 30}}
+    store.get_model('coin', '1h', history)
+    assert trainer.calls == 2
+    store.get_model('coin', '1h', history)
+    assert trainer.calls == 2
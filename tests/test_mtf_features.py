@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import mtf_features
+from data_fetcher import BASE_INTERVAL, BASE_SPACING_MS, resample_candles
+from indicators import calculate_indicators
+from mtf_features import add_mtf_features
+
+PARAMS = {'sma': 3, 'atr': 14, 'bollinger': 10}
+
+
+@pytest.fixture
+def hourly(base_store, monkeypatch):
+    """Four days of 5-minute points starting at midnight, as 1h indicator bars."""
+    monkeypatch.setattr(mtf_features, '_higher_cache', {})
+    rng = np.random.default_rng(2)
+    times = pd.Timestamp("2024-01-01").value // 10**6 + np.arange(12 * 24 * 4, dtype=np.int64) * BASE_SPACING_MS
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, len(times))))
+    base_store.append('coin-usd', BASE_INTERVAL, times, close, rng.lognormal(3, 0.5, len(times)))
+    return calculate_indicators(resample_candles('coin', '1h', limit=48))
+
+
+def four_hour_bar(out, time):
+    return out.loc[out['Time'] == pd.Timestamp(time)].iloc[0]
+
+
+@pytest.mark.parametrize("params", [None, PARAMS])
+def test_bars_only_see_closed_higher_bars(hourly, params):
+    out, names = add_mtf_features(hourly, 'coin', '1h', ['4h'], params=params)
+    assert 'SMA_4h' in names
+    higher = calculate_indicators(resample_candles('coin', '4h', limit=100).iloc[:-1], params)
+    by_time = higher.set_index('Time')
+
+    # 03:00-04:00 closes exactly when the 00:00 4h bar does, so it sees that bar
+    assert four_hour_bar(out, "2024-01-04 03:00")['SMA_4h'] == pytest.approx(by_time.loc["2024-01-04 00:00", 'SMA'])
+    # 02:00-03:00 closes an hour before it, so it still sees the previous day's 20:00 bar
+    assert four_hour_bar(out, "2024-01-04 02:00")['SMA_4h'] == pytest.approx(by_time.loc["2024-01-03 20:00", 'SMA'])
+
+    for _, row in out.iterrows():
+        closed = higher[higher['Time'] + pd.Timedelta('4h') <= row['Time'] + pd.Timedelta('1h')].iloc[-1]
+        assert row['SMA_4h'] == pytest.approx(closed['SMA'])
+        assert row['ATR_4h'] == pytest.approx(closed['ATR'], nan_ok=True)
+
+
+def test_unsorted_frames_keep_their_order_and_index(hourly):
+    expected, _ = add_mtf_features(hourly, 'coin', '1h', ['4h'])
+    shuffled = hourly.sample(frac=1, random_state=0)
+    out, _ = add_mtf_features(shuffled, 'coin', '1h', ['4h'])
+    assert list(out.index) == list(shuffled.index)
+    pd.testing.assert_frame_equal(out.sort_index(), expected)
+
+
+def test_params_get_their_own_higher_frames(hourly):
+    default, _ = add_mtf_features(hourly, 'coin', '1h', ['4h'])
+    tuned, _ = add_mtf_features(hourly, 'coin', '1h', ['4h'], params=PARAMS)
+    assert not np.allclose(default['SMA_4h'], tuned['SMA_4h'])
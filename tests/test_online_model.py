@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import online_model
+from model import FEATURES
+from online_model import OnlineLearner, OnlineModelStore
+
+TUNED = {}
+
+
+@pytest.fixture(autouse=True)
+def tuned(monkeypatch):
+    TUNED.clear()
+    monkeypatch.setattr(online_model, 'best_params', lambda coin_id, interval: TUNED or None)
+
+
+def assert_same_learner(actual, expected):
+    np.testing.assert_allclose(actual.model.coef_, expected.model.coef_)
+    np.testing.assert_allclose(actual.scaler.mean_, expected.scaler.mean_)
+    assert actual.model.n_updates == expected.model.n_updates
+    assert actual.last_time == expected.last_time
+
+
+def test_forming_candle_is_learned_only_once_closed(frame):
+    expected = OnlineLearner(len(FEATURES))
+    expected.learn_frame(frame.iloc[:301], forming=False)
+
+    learner = OnlineLearner(len(FEATURES))
+    fetched = frame.iloc[:301].copy()
+    # The fetched frame's last candle is still forming: its close is not final yet
+    fetched.loc[fetched.index[-1], 'Close'] *= 1.1
+    assert learner.learn_frame(fetched) == 300
+    assert learner.last_time == frame['Time'].iloc[299]
+    # Once it closes, the next fetch learns its final version
+    assert learner.learn_frame(frame.iloc[:302]) == 1
+    assert_same_learner(learner, expected)
+
+
+def test_store_skips_the_forming_candle_unless_told_otherwise(tmp_path, frame):
+    store = OnlineModelStore(str(tmp_path))
+    store.get_model('coin', '1h', frame.iloc[:200])
+    store.get_model('coin', '1h', frame.iloc[199:210], forming=False)
+
+    expected = OnlineLearner(len(FEATURES))
+    expected.learn_frame(frame.iloc[:210], forming=False)
+    assert_same_learner(next(iter(store._learners.values())), expected)
+    assert_same_learner(OnlineModelStore(str(tmp_path))._read(next(iter(store._learners))), expected)
+
+
+def test_each_indicator_tuning_gets_its_own_learner(tmp_path, frame):
+    store = OnlineModelStore(str(tmp_path))
+    store.get_model('coin', '1h', frame.iloc[:100])
+    TUNED.update({'backend': 'logistic', 'indicators': {'sma': 10}, 'model': {}})
+    store.get_model('coin', '1h', frame.iloc[:150])
+    TUNED['indicators'] = {'sma': 20}
+    store.get_model('coin', '1h', frame.iloc[:200])
+
+    learners = list(store._learners.values())
+    assert len(learners) == 3 and len(list(tmp_path.iterdir())) == 3
+    # A new tuning starts from scratch rather than continuing a learner fed other windows
+    assert [learner.last_time for learner in learners] == [frame['Time'].iloc[i] for i in (98, 148, 198)]
+    assert learners[2].scaler.n_samples_seen_ > learners[0].scaler.n_samples_seen_
@@ -0,0 +1,84 @@
+import threading
+from collections import deque
+
+import pytest
+
+import profiling
+from profiling import Profiler, end_run, run_spans, span, start_run, timed, to_prometheus
+
+
+@pytest.fixture(autouse=True)
+def spans(monkeypatch):
+    buffer = deque(maxlen=10)
+    monkeypatch.setattr(profiling, 'SPANS', buffer)
+    yield buffer
+    end_run()
+
+
+def test_span_records_its_stage_and_duration(spans):
+    with span("load"):
+        pass
+    [record] = spans
+    assert record['stage'] == "load"
+    assert record['ms'] >= 0
+    assert record['thread'] == threading.current_thread().name
+    assert (record['run'], record['label']) == (None, None)
+
+
+def test_timed_names_the_stage_and_records_failures(spans):
+    @timed()
+    def fit(x):
+        return x * 2
+
+    @timed('custom')
+    def broken():
+        raise ValueError("boom")
+
+    assert fit(2) == 4
+    assert fit.__name__ == "fit"
+    with pytest.raises(ValueError):
+        broken()
+    assert [s['stage'] for s in spans] == ["fit", "custom"]
+
+
+def test_spans_are_tagged_with_the_run_on_their_thread(spans):
+    run_id = start_run("prediction")
+    with span("inside"):
+        pass
+
+    def elsewhere():
+        with span("elsewhere"):
+            pass
+
+    worker = threading.Thread(target=elsewhere)
+    with span("outer"):
+        worker.start()
+        worker.join()
+    end_run()
+    with span("after"):
+        pass
+
+    assert [s['stage'] for s in run_spans(run_id)] == ["inside", "outer"]
+    assert {s['label'] for s in run_spans(run_id)} == {"prediction"}
+    assert start_run("prediction") != run_id
+
+
+def test_buffer_keeps_the_most_recent_spans(monkeypatch):
+    spans = deque(maxlen=3)
+    monkeypatch.setattr(profiling, 'SPANS', spans)
+    for stage in "abcd":
+        with span(stage):
+            pass
+    assert [s['stage'] for s in spans] == ["b", "c", "d"]
+
+
+def test_prometheus_totals_per_stage(spans):
+    spans.extend([{'stage': 'fit', 'ms': 1000.0, 'run': None}, {'stage': 'fit', 'ms': 500.0, 'run': None}])
+    text = to_prometheus(prefix="app")
+    assert 'app_seconds_sum{stage="fit"} 1.500000' in text
+    assert 'app_seconds_count{stage="fit"} 2' in text
+    assert 'app_last_seconds{stage="fit"} 0.500000' in text
+
+
+def test_disabled_profiler_reports_nothing():
+    assert Profiler(enabled=False).start().stop() is None
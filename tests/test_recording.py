@@ -0,0 +1,132 @@
+import asyncio
+import gzip
+import time
+
+import pytest
+
+from benchmarks.stub_coingecko import StubCoinGecko, serve
+from coingecko_client import CoinGeckoError
+from recording import RecordingClient, ReplayClient, ResponseArchive
+
+DAY = 24 * 3600
+
+
+async def session(client, start):
+    """The calls both sides make; the range request's from/to move with `start`, like wall-clock ones."""
+    results = [await client.price(['bitcoin', 'ethereum']),
+               await client.market_chart_range('bitcoin', 'usd', start, start + DAY)]
+    try:
+        await client.get('coins/nope')
+    except CoinGeckoError as e:
+        results.append(e.status)
+    return results
+
+
+def record(path):
+    async def main():
+        runner, port = await serve(StubCoinGecko(latency=0).app(), 0)
+        client = RecordingClient(str(path), base_url=f"http://127.0.0.1:{port}", backoff_base=0, max_retries=0)
+        try:
+            return await session(client, 1_700_000_000)
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def replay(client, coro_factory):
+    async def main():
+        try:
+            return await coro_factory(client)
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+def test_replay_serves_the_recorded_session(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    recorded = record(path)
+    assert recorded[-1] == 404
+
+    client = ReplayClient(str(path), speed=0)
+    # A later session asks for a different from/to; those params are ignored when matching
+    assert replay(client, lambda c: session(c, 1_700_086_400)) == recorded
+    assert (client.served, client.missing) == (3, 0)
+
+
+def test_unrecorded_requests_are_counted_as_missing(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    record(path)
+    client = ReplayClient(str(path), speed=0)
+    with pytest.raises(CoinGeckoError) as error:
+        replay(client, lambda c: c.price('solana'))
+    assert error.value.status == 404 and client.missing == 1
+
+
+def test_repeated_requests_replay_in_order_then_repeat_the_last(tmp_path):
+    archive = ResponseArchive(str(tmp_path / "prices.jsonl.gz"))
+    for price in (1.0, 2.0):
+        archive.write('simple/price', {'ids': 'bitcoin', 'vs_currencies': 'usd'}, {'bitcoin': {'usd': price}}, 0.2)
+    archive.close()
+
+    client = ReplayClient(archive, speed=10)
+
+    async def three_polls(c):
+        return [(await c.price('bitcoin'))['bitcoin']['usd'] for _ in range(3)]
+
+    started = time.perf_counter()
+    assert replay(client, three_polls) == [1.0, 2.0, 2.0]
+    # Each response waits its recorded latency divided by the speed
+    assert time.perf_counter() - started >= 3 * 0.02
+
+
+def test_truncated_archive_keeps_the_complete_responses(tmp_path, capsys):
+    path = tmp_path / "session.jsonl.gz"
+    archive = ResponseArchive(str(path))
+    for i in range(50):
+        archive.write('simple/price', {'ids': f"coin-{i}"}, {f"coin-{i}": {'usd': float(i)}}, 0.01)
+    archive.close()
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) // 2])
+
+    entries = ResponseArchive(str(path)).entries()
+    assert 0 < len(entries) < 50
+    assert [entry['params']['ids'] for entry in entries] == [f"coin-{i}" for i in range(len(entries))]
+    assert "ends mid-record" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("damage", ['not-gzip', 'bad-deflate', 'bad-crc'])
+def test_corrupt_archive_keeps_the_responses_before_the_damage(tmp_path, capsys, damage):
+    path = tmp_path / "session.jsonl.gz"
+    archive = ResponseArchive(str(path))
+    for i in range(50):
+        archive.write('simple/price', {'ids': f"coin-{i}"}, {f"coin-{i}": {'usd': float(i)}}, 0.01)
+    archive.close()
+    data = bytearray(path.read_bytes())
+    if damage == 'not-gzip':
+        data[:2] = b"{}"  # BadGzipFile
+    elif damage == 'bad-deflate':
+        # The first deflate block, after the header and its stored file name, gets the reserved type
+        data[data.index(0, 10) + 1 if data[3] & 0x08 else 10] = 0xFF
+    else:
+        data[-8] ^= 0xFF  # trailer CRC: BadGzipFile once the member is read
+    path.write_bytes(bytes(data))
+
+    entries = ResponseArchive(str(path)).entries()
+    assert [entry['params']['ids'] for entry in entries] == [f"coin-{i}" for i in range(len(entries))]
+    if damage != 'bad-crc':
+        assert entries == []
+    assert "is corrupt" in capsys.readouterr().out
+
+
+def test_appending_resumes_a_recording(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    for i in range(2):
+        archive = ResponseArchive(str(path))
+        archive.write('simple/price', {'ids': 'bitcoin'}, {'bitcoin': {'usd': float(i)}}, 0.01)
+        archive.close()
+    with gzip.open(path, "rt") as f:
+        assert len(f.readlines()) == 2
+    assert [entry['data']['bitcoin']['usd'] for entry in ResponseArchive(str(path)).entries()] == [0.0, 1.0]
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+import scanner
+from benchmarks.synthetic import make_candles
+from indicators import calculate_indicators
+from model import FEATURES, predict_latest
+from model_store import ModelStore
+
+COINS = [{'id': 'alpha', 'name': 'Alpha', 'symbol': 'alp'},
+         {'id': 'beta', 'name': 'Beta', 'symbol': 'bet'},
+         {'id': 'gamma', 'name': 'Gamma', 'symbol': 'gam'},
+         {'id': 'delta', 'name': 'Delta', 'symbol': 'del'}]
+# delta has too little history to train on and gamma has none at all
+CANDLES = {'alpha': make_candles(400, seed=1, freq="1h"), 'beta': make_candles(400, seed=2, freq="1h"),
+           'gamma': pd.DataFrame(), 'delta': make_candles(30, seed=3, freq="1h")}
+
+
+@pytest.fixture
+def universe(tmp_path, monkeypatch):
+    store = ModelStore(root=str(tmp_path / "models"), trainer=scanner._train_single_core)
+    monkeypatch.setattr(scanner, '_worker_store', store)
+    monkeypatch.setattr(scanner, 'fetch_top_100_coins', lambda: COINS)
+    monkeypatch.setattr(scanner, 'fetch_crypto_data', lambda coin_id, interval, limit: CANDLES[coin_id].copy())
+    monkeypatch.setattr(scanner, 'best_params', lambda coin_id, interval: None)
+    return store
+
+
+def test_scan_ranks_actionable_signals_by_confidence(universe):
+    table = scanner.scan_universe(interval='1h', processes=2)
+
+    assert list(table.columns) == scanner.SIGNAL_COLUMNS
+    assert list(table['Coin'].iloc[-1:]) == ['delta']
+    assert table['Signal'].iloc[-1] == 'No Signal'
+    actionable = table.iloc[:-1]
+    assert set(actionable['Coin']) == {'alpha', 'beta'}
+    assert set(actionable['Signal']) <= {'Buy', 'Sell'}
+    assert actionable['Confidence'].is_monotonic_decreasing
+    assert table.set_index('Coin').loc['alpha', 'Name'] == 'Alpha (ALP)'
+
+    # Confidence is predict_latest's probability for the model the workers saved
+    for coin_id in actionable['Coin']:
+        df = calculate_indicators(CANDLES[coin_id].copy())
+        model, scaler = universe.get_model(coin_id, '1h', df)
+        _, confidence = predict_latest(model, scaler, df[FEATURES].iloc[-1].to_numpy())
+        assert table.set_index('Coin').loc[coin_id, 'Confidence'] == pytest.approx(confidence)
+
+
+def test_scan_with_no_coins_is_empty(monkeypatch):
+    monkeypatch.setattr(scanner, 'fetch_top_100_coins', lambda: [])
+    table = scanner.scan_universe()
+    assert table.empty and list(table.columns) == scanner.SIGNAL_COLUMNS
+
+
+def test_worker_fits_use_one_core(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scanner, 'train_model', lambda df, backend, features, params: calls.append(params))
+    scanner._train_single_core(None, 'random_forest', FEATURES, {'max_depth': 4})
+    scanner._train_single_core(None, 'hist_gradient_boosting', FEATURES)
+    assert calls == [{'max_depth': 4, 'n_jobs': 1}, {}]
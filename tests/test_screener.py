@@ -0,0 +1,96 @@
+import numpy as np
+
+import screener
+from data_fetcher import fetch_top_coins
+from screener import MarketSnapshot, Screener
+
+HOUR = 3600
+
+
+def coin(coin_id, volume=100.0, market_cap=1e9, updated='t0', **fields):
+    return {'id': coin_id, 'name': coin_id.title(), 'symbol': coin_id[:3], 'last_updated': updated,
+            'market_cap_rank': 1, 'current_price': 1.0, 'market_cap': market_cap,
+            'total_volume': volume, 'price_change_percentage_24h': 0.0, **fields}
+
+
+def column(snapshot, coin_id, name):
+    return snapshot.columns[name][snapshot._row[coin_id]]
+
+
+def test_refresh_merges_by_delta():
+    snapshot = MarketSnapshot()
+    assert snapshot.refresh([coin('a'), coin('b'), coin('c')], now=0) == \
+        {'added': 3, 'changed': 0, 'removed': 0, 'unchanged': 0}
+
+    stats = snapshot.refresh([coin('a'), coin('b', volume=200.0, updated='t1'), coin('d')], now=HOUR)
+    assert stats == {'added': 1, 'changed': 1, 'removed': 1, 'unchanged': 1}
+    assert sorted(snapshot.ids) == ['a', 'b', 'd']
+    assert column(snapshot, 'b', 'volume') == 200.0
+    assert all(snapshot.ids[row] == coin_id for coin_id, row in snapshot._row.items())
+
+
+def test_rows_with_the_same_last_updated_are_left_alone():
+    snapshot = MarketSnapshot()
+    snapshot.refresh([coin('a', volume=100.0)], now=0)
+    stats = snapshot.refresh([coin('a', volume=999.0)], now=HOUR)
+    assert stats == {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 1}
+    assert column(snapshot, 'a', 'volume') == 100.0
+
+
+def test_volume_spike_is_measured_against_the_decayed_baseline():
+    snapshot = MarketSnapshot(volume_halflife_hours=1)
+    snapshot.refresh([coin('a', volume=100.0)], now=0)
+    assert column(snapshot, 'a', 'volume_avg') == 100.0
+    assert np.isnan(column(snapshot, 'a', 'volume_spike'))
+
+    # One half-life later the baseline moves halfway toward the new volume
+    snapshot.refresh([coin('a', volume=300.0, updated='t1')], now=HOUR)
+    assert column(snapshot, 'a', 'volume_spike') == 3.0
+    assert column(snapshot, 'a', 'volume_avg') == 200.0
+
+    snapshot.refresh([coin('a', volume=400.0, updated='t2')], now=2 * HOUR)
+    assert column(snapshot, 'a', 'volume_spike') == 2.0
+    assert column(snapshot, 'a', 'volume_avg') == 300.0
+
+
+def test_query_filters_sorts_and_keeps_nans_last():
+    snapshot = MarketSnapshot()
+    snapshot.refresh([coin('a', market_cap=3e9), coin('b', market_cap=None), coin('c', market_cap=1e9),
+                      coin('d', market_cap=2e9, volume=5.0)], now=0)
+
+    assert list(snapshot.query()['Coin']) == ['a', 'd', 'c', 'b']
+    assert list(snapshot.query(descending=False)['Coin']) == ['c', 'd', 'a', 'b']
+    assert list(snapshot.query(limit=2)['Coin']) == ['a', 'd']
+    assert list(snapshot.query([('volume', '>', 10)])['Coin']) == ['a', 'c', 'b']
+    assert list(snapshot.query([('market_cap', '>=', 2e9)], descending=False)['Coin']) == ['d', 'a']
+
+
+def test_query_order_follows_a_refresh():
+    snapshot = MarketSnapshot()
+    snapshot.refresh([coin('a', market_cap=1e9), coin('b', market_cap=2e9)], now=0)
+    assert list(snapshot.query()['Coin']) == ['b', 'a']
+    snapshot.refresh([coin('a', market_cap=3e9, updated='t1'), coin('b', market_cap=2e9)], now=HOUR)
+    assert list(snapshot.query()['Coin']) == ['a', 'b']
+
+
+def test_screener_refetches_only_when_stale(monkeypatch):
+    calls = []
+
+    def fake_fetch(n, vs_currency):
+        calls.append((n, vs_currency))
+        return [coin('a', updated=f't{len(calls)}')]
+
+    monkeypatch.setattr(screener, 'fetch_top_coins', fake_fetch)
+    market = Screener(size=5, refresh_seconds=60)
+    assert list(market.query()['Coin']) == ['a']
+    market.query()
+    assert calls == [(5, 'usd')]
+    assert market.stats['added'] == 1
+
+    market.refresh(force=True)
+    assert len(calls) == 2
+    assert market.stats['changed'] == 1
+
+
+def test_fetch_top_coins_with_no_coins_requested():
+    assert fetch_top_coins(0) == []
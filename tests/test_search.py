@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.synthetic import make_candles
+from indicators import calculate_indicators
+from model import train_model
+from search import (MAX_WINDOW, _nest, best_params, default_space, grid_candidates, random_candidates,
+                    run_search)
+
+SPACE = {'indicators.sma': [3, 5, 10], 'indicators.atr': [7, 14], 'sr_window': [10, 20],
+         'model.C': [0.1, 1.0]}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "search.sqlite")
+
+
+def test_candidates_skip_invalid_and_unservable_windows():
+    space = {'indicators.macd_fast': [8, 21], 'indicators.macd_slow': [21, 26],
+             'indicators.fibo_lookback': [30, MAX_WINDOW + 1]}
+    assert grid_candidates(space) == [
+        {'indicators.macd_fast': 8, 'indicators.macd_slow': 21, 'indicators.fibo_lookback': 30},
+        {'indicators.macd_fast': 8, 'indicators.macd_slow': 26, 'indicators.fibo_lookback': 30},
+        {'indicators.macd_fast': 21, 'indicators.macd_slow': 26, 'indicators.fibo_lookback': 30},
+    ]
+    assert all(value <= MAX_WINDOW for name, values in default_space().items()
+               if not name.startswith('model.') for value in values)
+    candidates = random_candidates(SPACE, 10, seed=1)
+    assert len(candidates) == 10 and len({tuple(c.values()) for c in candidates}) == 10
+
+
+def test_nest_groups_params():
+    assert _nest({'indicators.sma': 5, 'sr_window': 10, 'model.C': 1.0}) == {
+        'indicators': {'sma': 5}, 'sr_window': 10, 'model': {'C': 1.0}}
+
+
+def test_default_space_configs_train_on_the_serving_frame():
+    # The longest windows the search can pick must still leave rows to train on
+    longest = {name.partition('.')[2]: max(values) for name, values in default_space('logistic').items() if name.startswith('indicators.')}
+    model, scaler = train_model(calculate_indicators(make_candles(100), longest), backend='logistic')
+    assert model is not None
+
+
+def test_successive_halving_rescores_the_best_on_more_rows(db_path):
+    df = make_candles(600, freq="1h")
+    table = run_search('coin', '1h', df, 'halving', SPACE, backend='logistic', n_candidates=9, eta=3,
+                       min_rows=200, processes=1, db_path=db_path)
+
+    connection = sqlite3.connect(db_path)
+    rungs = connection.execute("SELECT rows, COUNT(*) FROM results GROUP BY rows ORDER BY rows").fetchall()
+    connection.close()
+    # 9 candidates on the latest 200 rows, the best third on all 600
+    assert rungs == [(200, 9), (600, 3)]
+    assert len(table) == 3
+    assert list(table['score']) == sorted(table['score'], reverse=True)
+
+    best = best_params('coin', '1h', db_path)
+    assert best['backend'] == 'logistic'
+    assert best == {'backend': 'logistic', **_nest({k: table.iloc[0][k] for k in SPACE})}
+    assert best_params('coin', '4h', db_path) is None
+
+
+def test_best_params_without_a_db(tmp_path):
+    assert best_params('coin', '1h', str(tmp_path / "missing.sqlite")) is None
+
+
+def test_unknown_strategy_is_rejected(db_path):
+    with pytest.raises(ValueError):
+        run_search('coin', '1h', make_candles(300), 'annealing', SPACE, db_path=db_path)
+
+
+def test_short_frames_do_not_train():
+    assert train_model(calculate_indicators(make_candles(100), {'fibo_lookback': 100}),
+                       backend='logistic')[0] is not None
+    assert train_model(calculate_indicators(make_candles(40)), backend='logistic') == (None, None)
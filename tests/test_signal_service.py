@@ -0,0 +1,116 @@
+import asyncio
+import json
+import threading
+
+import pandas as pd
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import cache
+import coingecko_client
+import config
+import data_fetcher
+import model_store
+import signal_service
+from benchmarks import stub_coingecko
+from benchmarks.stub_coingecko import StubCoinGecko, serve, use_stub
+from signal_service import SignalService
+
+
+@pytest.fixture
+def isolated(monkeypatch, tmp_path):
+    """Every global use_stub rebinds, restored after the test, with its stores under tmp_path."""
+    monkeypatch.setattr(stub_coingecko.tempfile, 'mkdtemp', lambda prefix: str(tmp_path))
+    for module, name in [(coingecko_client, '_shared'), (data_fetcher, 'candle_store'), (cache, '_shared'),
+                         (model_store, '_default_store'), (config, 'MODEL_STORE_DIR')]:
+        monkeypatch.setattr(module, name, getattr(module, name))
+    monkeypatch.setattr(data_fetcher, '_resampled', {})
+    monkeypatch.setattr(data_fetcher, '_last_checked', {})
+    monkeypatch.setattr(signal_service, 'best_params', lambda coin_id, interval: None)
+    monkeypatch.setattr(model_store, 'best_params', lambda coin_id, interval: None)
+    monkeypatch.setattr(model_store, 'backend_for_interval', lambda interval: 'logistic')
+
+
+def call(service, requests, stub=False):
+    """Issue (path, params) GETs concurrently against the service; returns [(status, body)]."""
+    async def main():
+        runner = None
+        if stub:
+            runner, port = await serve(StubCoinGecko(latency=0).app(), 0)
+            use_stub(port, prefix="signal-service-test-")
+        client = TestClient(TestServer(service.app()))
+        await client.start_server()
+        try:
+            async def get(path, params):
+                response = await client.get(path, params=params)
+                text = await response.text()
+                try:
+                    return response.status, json.loads(text)
+                except ValueError:
+                    return response.status, text
+            return await asyncio.gather(*(get(path, params) for path, params in requests))
+        finally:
+            await client.close()
+            if stub:
+                coingecko_client._shared.close()
+                await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_routes_against_the_stub(isolated):
+    service = SignalService(workers=2)
+    (status, signal), (candles_status, candles), (_, bare), (_, health) = call(service, [
+        ('/signal/bitcoin/1h', {'limit': '200'}),
+        ('/candles/ethereum/1h', {'limit': '50'}),
+        ('/candles/ethereum/15m', {'limit': '20', 'indicators': 'false'}),
+        ('/health', {}),
+    ], stub=True)
+    assert status == 200 and signal['coin'] == 'bitcoin'
+    assert signal['signal'] in ('Buy', 'Sell') and 0.5 <= signal['confidence'] <= 1
+    assert candles_status == 200 and len(candles) == 50 and 'SMA' in candles[0]
+    assert len(bare) == 20 and 'SMA' not in bare[0]
+    assert health['status'] == 'ok' and health['errors'] == 0
+
+
+@pytest.mark.parametrize("path, params", [
+    ('/signal/bitcoin/2h', {}),
+    ('/signal/bitcoin/1h', {'limit': 'many'}),
+    ('/signal/bitcoin/1h', {'limit': '0'}),
+    ('/candles/bitcoin/1h', {'limit': '-5'}),
+])
+def test_bad_requests_are_rejected(monkeypatch, path, params):
+    monkeypatch.setattr(signal_service, 'compute_signal', lambda *args: pytest.fail("computed"))
+    monkeypatch.setattr(signal_service, 'compute_candles', lambda *args: pytest.fail("computed"))
+    [(status, body)] = call(SignalService(workers=1), [(path, params)])
+    assert status == 400 and 'error' in body
+
+
+def test_missing_candles_are_404(monkeypatch):
+    monkeypatch.setattr(signal_service, 'fetch_crypto_data', lambda *args, **kwargs: pd.DataFrame())
+    monkeypatch.setattr(signal_service, 'best_params', lambda coin_id, interval: None)
+    service = SignalService(workers=1)
+    [(status, body)] = call(service, [('/candles/nothing/1h', {})])
+    assert status == 404 and 'nothing' in body['error']
+    assert service.stats['errors'] == 1
+
+
+def test_identical_requests_share_one_computation(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def slow_signal(coin_id, interval, limit, mtf):
+        calls.append((coin_id, interval, limit, mtf))
+        release.wait(5)
+        return {'coin': coin_id, 'limit': limit}
+
+    monkeypatch.setattr(signal_service, 'compute_signal', slow_signal)
+    service = SignalService(workers=4)
+    threading.Timer(0.3, release.set).start()
+    responses = call(service, [('/signal/bitcoin/1h', {'limit': '100'})] * 5 + [('/signal/bitcoin/1h', {'limit': '50'})])
+
+    assert [status for status, _ in responses] == [200] * 6
+    assert all(body == {'coin': 'bitcoin', 'limit': 100} for _, body in responses[:5])
+    assert sorted(calls) == [('bitcoin', '1h', 50, False), ('bitcoin', '1h', 100, False)]
+    assert service.stats == {'requests': 6, 'computed': 2, 'deduplicated': 4, 'errors': 0}
+    assert not service._inflight
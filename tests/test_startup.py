@@ -0,0 +1,14 @@
+from benchmarks.startup import PAGE_MODULES, PREDICTION_MODULES, page_imports
+
+
+def test_page_modules_follow_the_home_page_imports():
+    assert {'screener', 'utils', 'data_fetcher', 'service_client'} <= set(PAGE_MODULES)
+    assert {'model', 'model_store', 'live_stream', 'chart_render'} <= set(PREDICTION_MODULES)
+    assert not set(PAGE_MODULES) & set(PREDICTION_MODULES)
+    assert not any(name.startswith('streamlit') for name in PAGE_MODULES + PREDICTION_MODULES)
+
+
+def test_function_level_imports_are_deferred(tmp_path):
+    page = tmp_path / "page.py"
+    page.write_text("import os\nfrom json import dumps\n\ndef run():\n    import csv\n    from os import path\n")
+    assert page_imports(str(page)) == (['os', 'json'], ['csv'])
@@ -1,9 +1,15 @@
 import streamlit as st
 import base64
+from functools import lru_cache
+
+# Static assets are encoded once per process, not on every script rerun
+@lru_cache(maxsize=None)
+def encode_image(image_path):
+    with open(image_path, "rb") as image_file:
+        return base64.b64encode(image_file.read()).decode()
 
 def display_header(title, logo_path):
-    with open(logo_path, "rb") as image_file:
-        logo_base64 = base64.b64encode(image_file.read()).decode()
+    logo_base64 = encode_image(logo_path)
 
     st.markdown(
         f"""
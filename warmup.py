@@ -0,0 +1,50 @@
+import threading
+import time
+
+from config import DEFAULT_LIMIT, WARMUP_PAIRS
+from data_fetcher import fetch_crypto_data
+from screener import get_screener
+
+
+# Prefetch the screener snapshot (the page's coin list) plus candles and a fitted model per pair; returns per-step seconds
+def warm_up(pairs=WARMUP_PAIRS, limit=DEFAULT_LIMIT):
+    timings = {}
+
+    start = time.perf_counter()
+    get_screener().refresh()
+    timings['screener'] = time.perf_counter() - start
+
+    # Importing these pulls in scikit-learn, the slowest part of a cold prediction
+    start = time.perf_counter()
+    from indicators import calculate_indicators
+    from model_store import get_model
+    from search import best_params
+    timings['imports'] = time.perf_counter() - start
+
+    for coin_id, interval in pairs:
+        start = time.perf_counter()
+        df = fetch_crypto_data(coin_id, interval, limit=limit)
+        if not df.empty:
+            tuned = best_params(coin_id, interval) or {}
+            get_model(coin_id, interval, calculate_indicators(df, tuned.get('indicators')))
+        timings[f'{coin_id}/{interval}'] = time.perf_counter() - start
+    return timings
+
+
+def start_warm_up(pairs=WARMUP_PAIRS, limit=DEFAULT_LIMIT):
+    """Run warm_up() on a daemon thread so the caller can keep serving."""
+    def run():
+        try:
+            warm_up(pairs, limit)
+        except Exception as e:
+            print("❌ Warm-up failed:", e)
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    # Run before `streamlit run` to bake the disk caches (candle store, model store)
+    for step, seconds in warm_up().items():
+        print(f"{step:<20} {seconds * 1000:10.1f} ms")